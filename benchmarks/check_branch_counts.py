@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Regression check for branch tracing in the Code to Flowchart tool.
+Traces a small script whose branches start with loops and checks the counts on the branch and loop edges.
+
+Run from the repository root:
+
+    python -m benchmarks.check_branch_counts
+"""
+
+import os
+import sys
+import tempfile
+
+from parsers.python_parser import PythonParser
+from utils.branch_tracer import BranchTracer, run_command, apply_branch_counts
+
+
+SCRIPT = """\
+def work(flag):
+    total = 0
+    if flag:
+        for i in range(10):
+            total += i
+    else:
+        while total < 4:
+            total += 1
+    return total
+
+
+for flag in (True, True, True, False, False):
+    work(flag)
+"""
+
+# (source type, source line, edge type or None for a loop body edge, expected count)
+EXPECTED = [
+    ("if", 3, "true", 3),
+    ("if", 3, "false", 2),
+    ("for", 4, None, 30),
+    ("while", 7, None, 8),
+    ("for", 12, None, 5),
+]
+
+
+def edge_counts(graph: dict) -> dict:
+    """Map (source type, source line, edge type) to the count of every counted edge."""
+    nodes = {node["id"]: node for node in graph["nodes"]}
+    counts = {}
+    for edge in graph["edges"]:
+        if "count" in edge:
+            source = nodes[edge["from"]]
+            edge_type = edge["type"] if edge["type"] in ("true", "false", "exception") else None
+            counts[(source["type"], source["lineno"], edge_type)] = edge["count"]
+    return counts
+
+
+def check(backend: str, script_path: str) -> int:
+    """Trace the script with one tracer backend and report mismatching counts."""
+    tracer = BranchTracer([script_path])
+    tracer.backend = backend
+    with tracer:
+        run_command([script_path])
+    graph = PythonParser().parse(SCRIPT)
+    apply_branch_counts(graph, tracer.counts_for(script_path), tracer.arcs_for(script_path))
+    counts = edge_counts(graph)
+
+    failures = 0
+    for source_type, line, edge_type, expected in EXPECTED:
+        actual = counts.get((source_type, line, edge_type))
+        status = "ok" if actual == expected else "FAIL"
+        failures += actual != expected
+        print(f"{backend:>10}  {source_type} line {line} {edge_type or 'body'}: {actual} (expected {expected}) {status}")
+    return failures
+
+
+def main():
+    """Run the check with every tracer backend available on this Python."""
+    backends = ["settrace"] + (["monitoring"] if hasattr(sys, "monitoring") else [])
+    with tempfile.TemporaryDirectory() as directory:
+        script_path = os.path.join(directory, "branches.py")
+        with open(script_path, "w", encoding="utf-8") as file:
+            file.write(SCRIPT)
+        failures = sum(check(backend, script_path) for backend in backends)
+    if failures:
+        print(f"FAIL: {failures} wrong counts")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
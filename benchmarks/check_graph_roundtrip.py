@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Round-trip check for graph files in the Code to Flowchart tool.
+Profiles a small script, saves its heat-colored chart with -f graph and checks that rendering the file keeps the overlay.
+
+Run from the repository root:
+
+    python -m benchmarks.check_graph_roundtrip
+"""
+
+import cProfile
+import json
+import os
+import re
+import sys
+import tempfile
+
+from code_to_flowchart import parse_source_file, render_outputs, write_parsed_graph
+from utils.graph_io import read_graph
+from utils.profile_overlay import ProfileData, apply_heat_overlay
+
+
+SCRIPT = """\
+def slow(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+def fast():
+    return 1
+
+
+for _ in range(20):
+    slow(20000)
+    fast()
+"""
+
+
+def page_data(html_path: str) -> dict:
+    """Read the outline data embedded in an HTML page."""
+    with open(html_path, encoding="utf-8") as file:
+        match = re.search(r'<script type="application/json" id="outline">(.*?)</script>', file.read(), re.DOTALL)
+    return json.loads(match.group(1).replace("<\\/", "</"))
+
+
+def main():
+    """Run the round trip and report every difference."""
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        script_path = os.path.join(directory, "heat.py")
+        with open(script_path, "w", encoding="utf-8") as file:
+            file.write(SCRIPT)
+        profile_path = os.path.join(directory, "heat.prof")
+        with open(script_path, encoding="utf-8") as file:
+            cProfile.run(compile(file.read(), script_path, "exec"), profile_path)
+
+        parsed_code = parse_source_file(script_path)
+        colored = apply_heat_overlay(parsed_code, ProfileData.load(profile_path).entries_for(script_path))
+        graph_path = os.path.join(directory, "heat.graph")
+        write_parsed_graph(parsed_code, graph_path)
+        loaded = read_graph(graph_path)
+
+        if not colored:
+            failures.append("the profile colored no nodes")
+        if loaded.get("legend") != parsed_code.get("legend"):
+            failures.append(f"legend {loaded.get('legend')} != {parsed_code.get('legend')}")
+        heat_nodes = {node["id"]: (node.get("heat"), node.get("color")) for node in parsed_code["nodes"] if "heat" in node}
+        loaded_heat = {node["id"]: (node.get("heat"), node.get("color")) for node in loaded["nodes"] if "heat" in node}
+        if loaded_heat != heat_nodes:
+            failures.append(f"{len(loaded_heat)} of {len(heat_nodes)} heat nodes survived")
+
+        # The reference has the file's rounded coordinates but the original legend, so the
+        # PNGs differ exactly when the colorbar was lost
+        reference = {"nodes": loaded["nodes"], "edges": loaded["edges"], "legend": parsed_code.get("legend")}
+        outputs = {}
+        for name, graph in (("direct", reference), ("loaded", loaded)):
+            outputs[name] = [(None, os.path.join(directory, f"{name}.png"), "png"),
+                             (None, os.path.join(directory, f"{name}.html"), "html")]
+            render_outputs(graph, outputs[name], backend="matplotlib", layout="grid")
+
+        with open(outputs["direct"][0][1], "rb") as direct, open(outputs["loaded"][0][1], "rb") as loaded_png:
+            if direct.read() != loaded_png.read():
+                failures.append("the PNG rendered from the graph file has no colorbar")
+        data = page_data(outputs["loaded"][1][1])
+        if data["legend"] != parsed_code.get("legend"):
+            failures.append(f"the HTML page has legend {data['legend']}")
+
+    print(f"{colored} heat nodes checked")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
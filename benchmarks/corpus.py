@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Synthetic code corpus for the Code to Flowchart benchmarks.
+Generates Python modules with a controlled number of statements, nesting depth,
+branch density and literal size.
+
+Run from the repository root:
+
+    python -m benchmarks.corpus --statements 10000 -o /tmp/corpus_10k.py
+"""
+
+import sys
+import random
+import argparse
+from typing import List
+
+
+class CorpusGenerator:
+    """Generator for deterministic synthetic Python modules."""
+
+    # Compound statements to pick from when a branch is generated
+    COMPOUNDS = ["if", "if_else", "for", "while", "try"]
+
+    def __init__(self, statements: int = 1000, max_depth: int = 4, branch_density: float = 0.2,
+                 literal_size: int = 16, function_size: int = 50, seed: int = 0):
+        """
+        Initialize the corpus generator.
+
+        Args:
+            statements: Approximate number of statements in the module
+            max_depth: Maximum nesting depth of compound statements inside a function
+            branch_density: Probability (0-1) that a statement opens a compound block
+            literal_size: Length of generated string literals
+            function_size: Approximate number of statements per function
+            seed: Random seed, so the same settings always produce the same module
+        """
+        self.statements = statements
+        self.max_depth = max_depth
+        self.branch_density = branch_density
+        self.literal_size = literal_size
+        self.function_size = function_size
+        self.random = random.Random(seed)
+        self._remaining = 0
+        self._names = 0
+
+    def generate(self) -> str:
+        """
+        Generate the module source.
+
+        Returns:
+            The Python source code as a string
+        """
+        lines = ['"""Synthetic benchmark module."""', "", "import os", "import sys", ""]
+        self._remaining = self.statements - 2
+        function_index = 0
+
+        while self._remaining > 0:
+            budget = min(self.function_size, self._remaining)
+            lines.append(f"def function_{function_index}(value, items):")
+            self._remaining -= 1
+            body_end = self._remaining - budget
+            while self._remaining > max(body_end, 0):
+                self._emit_statement(lines, 1, 0)
+            lines.append(f"    return value")
+            lines.append("")
+            function_index += 1
+
+        return "\n".join(lines) + "\n"
+
+    def _emit_statement(self, lines: List[str], indent: int, depth: int) -> None:
+        """
+        Append one statement (possibly compound) to the module.
+
+        Args:
+            lines: Output lines
+            indent: Current indentation level
+            depth: Current nesting depth of compound statements
+        """
+        pad = "    " * indent
+        self._remaining -= 1
+
+        if depth < self.max_depth and self._remaining > 2 and self.random.random() < self.branch_density:
+            kind = self.random.choice(self.COMPOUNDS)
+            if kind in ("if", "if_else"):
+                lines.append(f"{pad}if value > {self.random.randint(0, 100)}:")
+                self._emit_block(lines, indent + 1, depth + 1)
+                if kind == "if_else":
+                    lines.append(f"{pad}else:")
+                    self._emit_block(lines, indent + 1, depth + 1)
+            elif kind == "for":
+                lines.append(f"{pad}for item in items:")
+                self._emit_block(lines, indent + 1, depth + 1)
+            elif kind == "while":
+                lines.append(f"{pad}while value < {self.random.randint(100, 1000)}:")
+                self._emit_block(lines, indent + 1, depth + 1)
+            else:
+                lines.append(f"{pad}try:")
+                self._emit_block(lines, indent + 1, depth + 1)
+                lines.append(f"{pad}except ValueError as error:")
+                self._emit_block(lines, indent + 1, depth + 1)
+            return
+
+        choice = self.random.random()
+        if choice < 0.5:
+            self._names += 1
+            lines.append(f"{pad}name_{self._names} = {self._literal()}")
+        elif choice < 0.8:
+            lines.append(f"{pad}value = value + {self.random.randint(1, 9)}")
+        else:
+            lines.append(f"{pad}print({self._literal()}, value)")
+
+    def _emit_block(self, lines: List[str], indent: int, depth: int) -> None:
+        """
+        Append the body of a compound statement.
+
+        Args:
+            lines: Output lines
+            indent: Indentation level of the body
+            depth: Nesting depth of the body
+        """
+        for _ in range(self.random.randint(1, 3)):
+            self._emit_statement(lines, indent, depth)
+
+    def _literal(self) -> str:
+        """Return a string literal of the configured size."""
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        return repr("".join(self.random.choice(letters) for _ in range(self.literal_size)))
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic Python module for benchmarking",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("-o", "--output", help="Output file path (default: stdout)", default=None)
+    parser.add_argument("--statements", type=int, default=1000, help="Approximate number of statements")
+    parser.add_argument("--depth", type=int, default=4, help="Maximum nesting depth")
+    parser.add_argument("--branch-density", type=float, default=0.2, help="Probability of a compound statement")
+    parser.add_argument("--literal-size", type=int, default=16, help="Length of string literals")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args()
+
+
+def main():
+    """Write a synthetic module."""
+    args = parse_arguments()
+    source = CorpusGenerator(
+        statements=args.statements,
+        max_depth=args.depth,
+        branch_density=args.branch_density,
+        literal_size=args.literal_size,
+        seed=args.seed
+    ).generate()
+
+    if args.output is None:
+        sys.stdout.write(source)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(source)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmarks for the Code to Flowchart tool.
+Times every phase of a conversion on synthetic modules and compares runs.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --sizes 1000,10000 -o results.json
+    python -m benchmarks.run_benchmarks --compare baseline.json results.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from typing import Dict, List, Any, Callable
+
+import matplotlib
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.corpus import CorpusGenerator
+from code_to_flowchart import convert_parsed_code, apply_grid_layout, parse_source
+from generators.simple_flowchart_generator import SimpleFlowchartGenerator
+from utils.file_utils import SourceFile
+
+console = Console()
+
+RESULTS_VERSION = 1
+
+PHASES = ["read_file", "parse", "adapt", "layout", "draw", "save"]
+
+
+def run_phases(path: str, output_format: str, render: bool, measure: Callable) -> Dict[str, Any]:
+    """
+    Run one conversion, measuring each phase.
+
+    Args:
+        path: Path to the source file
+        output_format: Format to encode (png, svg, pdf)
+        render: Whether to run the draw and save phases
+        measure: Function (phase_name, callable) -> result that records the phase
+
+    Returns:
+        Node and edge counts plus the encoded output size
+    """
+    source = measure("read_file", lambda: SourceFile(path))
+    with source:
+        parsed_code = measure("parse", lambda: parse_source(source))
+    flowchart = measure("adapt", lambda: convert_parsed_code(parsed_code))
+    measure("layout", lambda: apply_grid_layout(flowchart["nodes"]))
+
+    result = {"nodes": len(parsed_code["nodes"]), "edges": len(parsed_code["edges"]), "output_bytes": None}
+    if not render:
+        return result
+
+    generator = SimpleFlowchartGenerator()
+    generator.node_count = len(flowchart["nodes"])
+    generator.is_complex = generator._determine_complexity(flowchart)
+    with generator._figure() as fig:
+        measure("draw", lambda: generator._draw_flowchart(flowchart, fig))
+        buffer = io.BytesIO()
+        measure("save", lambda: generator._save_figure(fig, buffer, output_format))
+    result["output_bytes"] = buffer.tell()
+    return result
+
+
+def benchmark_case(path: str, output_format: str, render: bool, repeat: int, memory: bool) -> Dict[str, Any]:
+    """
+    Benchmark one source file.
+
+    Timings are the best of `repeat` runs. Peak memory is measured in a
+    separate run under tracemalloc, so it does not distort the timings.
+
+    Args:
+        path: Path to the source file
+        output_format: Format to encode (png, svg, pdf)
+        render: Whether to run the draw and save phases
+        repeat: Number of timed runs
+        memory: Whether to measure per-phase peak memory
+
+    Returns:
+        Per-phase timings, peak memory and graph counts
+    """
+    timings: Dict[str, float] = {}
+
+    def timed(phase, function):
+        start = time.perf_counter()
+        value = function()
+        elapsed = time.perf_counter() - start
+        timings[phase] = min(elapsed, timings.get(phase, elapsed))
+        return value
+
+    for _ in range(repeat):
+        result = run_phases(path, output_format, render, timed)
+
+    peaks: Dict[str, int] = {}
+    if memory:
+        def traced(phase, function):
+            tracemalloc.reset_peak()
+            value = function()
+            peaks[phase] = tracemalloc.get_traced_memory()[1]
+            return value
+
+        tracemalloc.start()
+        try:
+            run_phases(path, output_format, render, traced)
+        finally:
+            tracemalloc.stop()
+
+    result["phases"] = {phase: {"wall": timings[phase]} for phase in PHASES if phase in timings}
+    for phase, peak in peaks.items():
+        result["phases"][phase]["peak_memory"] = peak
+    result["total_wall"] = sum(timings.values())
+    return result
+
+
+def run_suite(args) -> Dict[str, Any]:
+    """
+    Generate the corpus and benchmark every case.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        The results document
+    """
+    cases = []
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        for statements in args.sizes:
+            name = f"s{statements}_d{args.depth}_b{args.branch_density}_l{args.literal_size}"
+            path = os.path.join(corpus_dir, f"{name}.py")
+            source = CorpusGenerator(
+                statements=statements,
+                max_depth=args.depth,
+                branch_density=args.branch_density,
+                literal_size=args.literal_size,
+                seed=args.seed
+            ).generate()
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(source)
+
+            render = statements <= args.render_limit
+            console.print(f"Benchmarking [cyan]{name}[/cyan]" + ("" if render else " (parse only)"))
+            case = benchmark_case(path, args.format, render, args.repeat, not args.no_memory)
+            case.update({
+                "name": name,
+                "statements": statements,
+                "depth": args.depth,
+                "branch_density": args.branch_density,
+                "literal_size": args.literal_size,
+                "source_bytes": len(source.encode("utf-8"))
+            })
+            cases.append(case)
+
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "format": args.format,
+        "cases": cases
+    }
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print a results document as a table."""
+    table = Table(title="Benchmark results (seconds)")
+    table.add_column("Case")
+    table.add_column("Nodes", justify="right")
+    for phase in PHASES:
+        table.add_column(phase, justify="right")
+    table.add_column("Peak MB", justify="right")
+
+    for case in results["cases"]:
+        phases = case["phases"]
+        peak = max((phase.get("peak_memory", 0) for phase in phases.values()), default=0)
+        table.add_row(
+            case["name"],
+            str(case["nodes"]),
+            *[f"{phases[phase]['wall']:.4f}" if phase in phases else "-" for phase in PHASES],
+            f"{peak / (1024 * 1024):.1f}" if peak else "-"
+        )
+    console.print(table)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare two results documents and print the per-phase change.
+
+    Args:
+        baseline: Results of the reference run
+        current: Results of the run under test
+        threshold: Relative slowdown (or memory growth) that counts as a regression
+
+    Returns:
+        Descriptions of every regression found
+    """
+    table = Table(title="Benchmark comparison")
+    table.add_column("Case")
+    table.add_column("Phase")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right")
+
+    regressions = []
+    baseline_cases = {case["name"]: case for case in baseline["cases"]}
+    for case in current["cases"]:
+        reference = baseline_cases.get(case["name"])
+        if reference is None:
+            continue
+        for phase in PHASES:
+            if phase not in case["phases"] or phase not in reference["phases"]:
+                continue
+            for metric in ("wall", "peak_memory"):
+                old = reference["phases"][phase].get(metric)
+                new = case["phases"][phase].get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                label = phase if metric == "wall" else f"{phase} (memory)"
+                style = "red" if change > threshold else "green" if change < -threshold else ""
+                table.add_row(case["name"], label, f"{old:.4g}", f"{new:.4g}",
+                              f"[{style}]{change:+.1%}[/{style}]" if style else f"{change:+.1%}")
+                if change > threshold:
+                    regressions.append(f"{case['name']} {label}: {change:+.1%}")
+
+    console.print(table)
+    return regressions
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Code to Flowchart pipeline on synthetic modules",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file", default=None)
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")],
+                        default=[1000, 10000], help="Comma-separated statement counts")
+    parser.add_argument("--depth", type=int, default=4, help="Maximum nesting depth")
+    parser.add_argument("--branch-density", type=float, default=0.2, help="Probability of a compound statement")
+    parser.add_argument("--literal-size", type=int, default=16, help="Length of string literals")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the corpus")
+    parser.add_argument("-f", "--format", choices=["png", "svg", "pdf"], default="png", help="Output format")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    parser.add_argument("--render-limit", type=int, default=10000,
+                        help="Skip the draw and save phases for cases with more statements")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two results files instead of running the suite")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative change that counts as a regression")
+    return parser.parse_args()
+
+
+def main():
+    """Run the benchmark suite or compare two results files."""
+    args = parse_arguments()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as file:
+            baseline = json.load(file)
+        with open(args.compare[1], encoding="utf-8") as file:
+            current = json.load(file)
+        regressions = compare_results(baseline, current, args.threshold)
+        for regression in regressions:
+            console.print(f"[bold red]Regression:[/bold red] {regression}")
+        return 1 if regressions else 0
+
+    results = run_suite(args)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        console.print(f"Results saved to: [cyan]{args.output}[/cyan]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Soak test for the Code to Flowchart renderer.
+Renders many charts from a thread pool sharing a FigurePool and checks that memory stays flat.
+
+Run from the repository root:
+
+    python -m benchmarks.soak_renderer --count 10000 --threads 4
+"""
+
+import os
+import sys
+import argparse
+import resource
+from concurrent.futures import ThreadPoolExecutor
+
+from generators.figure_pool import FigurePool
+from generators.simple_flowchart_generator import SimpleFlowchartGenerator
+
+
+FLOWCHART = {
+    "nodes": [
+        {"id": 0, "type": "start_end", "text": "Start", "x": 0.5, "y": 0.95},
+        {"id": 1, "type": "input_output", "text": "Input a", "x": 0.5, "y": 0.80},
+        {"id": 2, "type": "process", "text": "c = 1", "x": 0.5, "y": 0.65},
+        {"id": 3, "type": "decision", "text": "c < 5", "x": 0.5, "y": 0.50},
+        {"id": 4, "type": "process", "text": "Print a", "x": 0.7, "y": 0.50},
+        {"id": 5, "type": "process", "text": "c = c + 1", "x": 0.7, "y": 0.35},
+        {"id": 6, "type": "start_end", "text": "Stop", "x": 0.3, "y": 0.50}
+    ],
+    "edges": [
+        {"from": 0, "to": 1, "text": ""},
+        {"from": 1, "to": 2, "text": ""},
+        {"from": 2, "to": 3, "text": ""},
+        {"from": 3, "to": 4, "text": "Yes"},
+        {"from": 3, "to": 6, "text": "No"},
+        {"from": 4, "to": 5, "text": ""},
+        {"from": 5, "to": 3, "text": ""}
+    ]
+}
+
+
+def current_rss_mb() -> float:
+    """Return the current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Render many flowcharts concurrently and check that RSS stays flat",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--count", type=int, default=10000, help="Number of charts to render")
+    parser.add_argument("--threads", type=int, default=4, help="Number of rendering threads")
+    parser.add_argument("--pool-size", type=int, default=4, help="Maximum number of pooled figures")
+    parser.add_argument("--format", choices=["png", "svg", "pdf"], default="svg", help="Output format")
+    parser.add_argument("--warmup", type=int, default=200, help="Charts rendered before the baseline RSS is taken")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative RSS growth after warmup")
+    return parser.parse_args()
+
+
+def main():
+    """Run the soak test."""
+    args = parse_arguments()
+    pool = FigurePool(max_size=args.pool_size)
+
+    def render(index):
+        generator = SimpleFlowchartGenerator(color_scheme="standard", figure_pool=pool)
+        generator.generate_from_structure(FLOWCHART, os.devnull, args.format)
+
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        list(executor.map(render, range(args.warmup)))
+        baseline = current_rss_mb()
+        print(f"Baseline RSS after {args.warmup} charts: {baseline:.1f} MB")
+
+        done = args.warmup
+        step = max(1, (args.count - args.warmup) // 10)
+        while done < args.count:
+            batch = min(step, args.count - done)
+            list(executor.map(render, range(done, done + batch)))
+            done += batch
+            print(f"{done:>7} charts  RSS {current_rss_mb():.1f} MB")
+
+    growth = (current_rss_mb() - baseline) / baseline
+    print(f"RSS growth after warmup: {growth:+.1%}")
+    if growth > args.tolerance:
+        print("FAIL: memory grew beyond the allowed tolerance")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
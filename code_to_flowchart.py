@@ -8,19 +8,50 @@ import os
 import sys
 import ast
 import argparse
+import json
+import shlex
+import shutil
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Set, Tuple
 from rich.console import Console
 from rich.panel import Panel
 from rich import print as rprint
 
-from parsers.python_parser import PythonParser
+from parsers.python_parser import PythonParser, SPAN_KEYS
+from parsers.outline_scanner import OutlineScanner
 from generators.simple_flowchart_generator import SimpleFlowchartGenerator
-from utils.file_utils import read_file, ensure_dir_exists
+from generators.graphviz_generator import GraphvizGenerator
+from generators.tile_generator import TileGenerator
+from generators.paged_pdf_generator import PagedPdfGenerator
+from generators.html_generator import HtmlGenerator
+from utils.file_utils import read_file, decode_source, ensure_dir_exists, is_python_file, SourceFile
+from utils.graph_io import GraphWriter, read_graph
+from utils.profiling import PhaseProfiler, NULL_PROFILER
+from utils.graph_stats import compute_graph_stats, choose_render_strategy, write_stats, FUNCTION_TYPES
+from utils.graph_partition import function_clusters, extract_subtree, touched_symbols
+from utils.profile_overlay import ProfileData, apply_heat_overlay, HEAT_METRICS
+from utils.branch_tracer import BranchTracer, run_command, apply_branch_counts
+from utils.coverage_overlay import CoverageData, apply_coverage_overlay
+from utils.graph_diff import diff_graphs
+from utils.graph_dedupe import collapse_repeats
+from utils.detail_charts import DetailCharts
+from utils.archive_utils import (is_archive, is_tar_archive, archive_stem, split_member_path, member_path,
+                                 list_python_members, iter_python_members)
+from utils.chart_archive import ChartArchiveWriter
+from utils.build_manifest import BuildManifest, MANIFEST_NAME
+from utils.git_utils import changed_hunks, read_revision_files, repository_root, split_revision_range
 
 console = Console()
 
 def adapt_parsed_code_for_simple_flowchart(parsed_code):
     """
     Adapt the output from PythonParser to be compatible with SimpleFlowchartGenerator.
+
+    Nodes that already carry "x"/"y" coordinates (for example from a graph
+    file) keep them; the others are placed on a grid.
     
     Args:
         parsed_code: The parsed code structure from PythonParser
@@ -28,44 +59,97 @@ def adapt_parsed_code_for_simple_flowchart(parsed_code):
     Returns:
         A dictionary with the structure expected by SimpleFlowchartGenerator
     """
+    flowchart = convert_parsed_code(parsed_code)
+    apply_grid_layout(flowchart["nodes"])
+    return flowchart
+
+def convert_parsed_code(parsed_code):
+    """
+    Convert PythonParser nodes and edges to the SimpleFlowchartGenerator vocabulary.
+
+    Existing "x"/"y" coordinates, source spans, color overrides and the
+    legend are carried over, and execution counts and repeat badges are
+    shown in the node and edge labels; no layout is computed.
+
+    Args:
+        parsed_code: The parsed code structure from PythonParser
+
+    Returns:
+        A dictionary with "nodes" and "edges" lists
+    """
     adapted_nodes = []
     adapted_edges = []
-    
-    # Calculate node positions
-    node_count = len(parsed_code["nodes"])
-    
-    # Simple layout algorithm - place nodes in a grid
-    cols = max(1, min(5, node_count // 5 + 1))  # Up to 5 columns
-    row_height = 0.8 / (node_count // cols + 1)
-    
-    for i, node in enumerate(parsed_code["nodes"]):
-        col = i % cols
-        row = i // cols
-        
-        x = 0.1 + (col * (0.8 / cols))
-        y = 0.9 - (row * row_height)
-        
-        # Convert label to text and add coordinates
-        adapted_nodes.append({
+
+    for node in parsed_code["nodes"]:
+        # Convert label to text
+        adapted_node = {
             "id": node["id"],
             "type": map_node_type(node["type"]),
-            "text": node["label"],
-            "x": x,
-            "y": y
-        })
+            "text": node["label"] if "count" not in node else f"{node['label']}\n×{node['count']}"
+        }
+        if "repeat" in node:
+            adapted_node["text"] += f"\n(×{node['repeat']})"
+        if "x" in node and "y" in node:
+            adapted_node["x"] = node["x"]
+            adapted_node["y"] = node["y"]
+        for key in SPAN_KEYS + ("color", "heat"):
+            if key in node:
+                adapted_node[key] = node[key]
+        adapted_nodes.append(adapted_node)
     
     # Convert edges
     for edge in parsed_code["edges"]:
-        adapted_edges.append({
+        adapted_edge = {
             "from": edge["from"],
             "to": edge["to"],
             "text": edge["type"] if edge["type"] in ["true", "false"] else ""
-        })
+        }
+        if "count" in edge:
+            adapted_edge["text"] = f"{adapted_edge['text']} ×{edge['count']}".strip()
+            adapted_edge["width"] = edge["width"]
+        if "color" in edge:
+            adapted_edge["color"] = edge["color"]
+        adapted_edges.append(adapted_edge)
     
-    return {
+    adapted_code = {
         "nodes": adapted_nodes,
         "edges": adapted_edges
     }
+    if parsed_code.get("legend"):
+        adapted_code["legend"] = parsed_code["legend"]
+    return adapted_code
+
+def grid_position(index: int, node_count: int) -> Tuple[float, float]:
+    """
+    Get the grid position of the node at an index.
+
+    Args:
+        index: Position of the node in the node list
+        node_count: Number of nodes in the list
+
+    Returns:
+        The (x, y) coordinates
+    """
+    # Simple layout algorithm - place nodes in a grid
+    cols = max(1, min(5, node_count // 5 + 1))  # Up to 5 columns
+    row_height = 0.8 / (node_count // cols + 1)
+
+    col = index % cols
+    row = index // cols
+    return 0.1 + (col * (0.8 / cols)), 0.9 - (row * row_height)
+
+def apply_grid_layout(nodes):
+    """
+    Place nodes without coordinates on a grid, in order.
+
+    Args:
+        nodes: Flowchart nodes; "x"/"y" are added in place where missing
+    """
+    node_count = len(nodes)
+    for i, node in enumerate(nodes):
+        if "x" in node and "y" in node:
+            continue
+        node["x"], node["y"] = grid_position(i, node_count)
 
 def map_node_type(parser_type):
     """
@@ -99,6 +183,36 @@ def map_node_type(parser_type):
     
     return type_mapping.get(parser_type, "process")
 
+THEMES = ["standard", "pastel", "monochrome", "colorful"]
+
+def comma_list(choices: List[str]):
+    """
+    Build an argparse type that accepts a comma-separated list of choices.
+
+    Args:
+        choices: The allowed values; "all" expands to every choice
+
+    Returns:
+        A function converting the argument string to a list
+    """
+    def parse(value: str) -> List[str]:
+        items = []
+        for item in value.split(","):
+            item = item.strip()
+            if item == "all":
+                items.extend(choice for choice in choices if choice not in items)
+            elif item in choices:
+                if item not in items:
+                    items.append(item)
+            elif item:
+                raise argparse.ArgumentTypeError(
+                    f"invalid choice: '{item}' (choose from {', '.join(choices)})"
+                )
+        if not items:
+            raise argparse.ArgumentTypeError("expected at least one value")
+        return items
+    return parse
+
 def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
@@ -107,28 +221,166 @@ def parse_arguments():
     )
 
     parser.add_argument(
-        "source_file",
-        help="Path to the source code file"
+        "source_files",
+        metavar="source_file",
+        nargs="*",
+        help="Path to the source code file (several files or directories enable project mode; "
+             "with --git-range, optional paths to limit the diff to)"
     )
 
     parser.add_argument(
         "-o", "--output",
-        help="Output file path (default: source_file_name.png)",
+        help="Output file path, or output directory in project and git-range mode (default: source_file_name.png)",
         default=None
     )
 
     parser.add_argument(
         "-f", "--format",
-        help="Output format (png, svg, pdf)",
-        choices=["png", "svg", "pdf"],
-        default="png"
+        help="Comma-separated output formats (png, svg, pdf, pages for a multi-page PDF, "
+             "tiles for a zoomable tile pyramid, html for an interactive page, or graph for a parsed graph file)",
+        type=comma_list(["png", "svg", "pdf", "pages", "tiles", "html", "graph"]),
+        default=["png"]
     )
 
     parser.add_argument(
         "-t", "--theme",
-        help="Flowchart color scheme",
-        choices=["standard", "pastel", "monochrome", "colorful"],
-        default="standard"
+        help="Comma-separated flowchart color schemes (standard, pastel, monochrome, colorful or all)",
+        type=comma_list(THEMES),
+        default=["standard"]
+    )
+
+    parser.add_argument(
+        "-b", "--backend",
+        help="Rendering backend (auto picks Graphviz for charts too large for matplotlib)",
+        choices=["auto", "matplotlib", "graphviz"],
+        default="auto"
+    )
+
+    parser.add_argument(
+        "--layout",
+        help="Layout algorithm for the matplotlib backend (auto uses Graphviz for large or cyclic graphs)",
+        choices=["auto", "grid", "dot", "sfdp"],
+        default="auto"
+    )
+
+    parser.add_argument(
+        "-j", "--jobs",
+        help="Number of parallel workers in project and git-range mode (default: CPU count)",
+        type=int,
+        default=None
+    )
+
+    parser.add_argument(
+        "--timeout",
+        help="Seconds before a Graphviz layout is killed",
+        type=float,
+        default=GraphvizGenerator.DEFAULT_TIMEOUT
+    )
+
+    parser.add_argument(
+        "--stats",
+        help="Write per-function graph statistics next to each output as <name>.stats.json",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--profile",
+        help="Print wall/CPU time, peak memory and graph metrics per phase",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--profile-dump",
+        help="With --profile, also write cProfile stats per phase into this directory",
+        metavar="DIR",
+        default=None
+    )
+
+    parser.add_argument(
+        "--heat-profile",
+        help="Color nodes by timings from a cProfile/pstats dump of the charted code (e.g. python -m cProfile -o FILE)",
+        metavar="FILE",
+        default=None
+    )
+
+    parser.add_argument(
+        "--heat-metric",
+        help="Profile metric for --heat-profile: cumulative time, own (total) time or call count",
+        choices=list(HEAT_METRICS),
+        default="cumulative"
+    )
+
+    parser.add_argument(
+        "--trace",
+        help="Run a command in-process (\"script.py args\" or \"-m module args\", e.g. \"-m pytest tests\") "
+             "and annotate branches with execution counts; without a command the source file itself is run",
+        metavar="COMMAND",
+        nargs="?",
+        const="",
+        default=None
+    )
+
+    parser.add_argument(
+        "--coverage-data",
+        help="Gray out nodes and branches that never ran, according to a coverage.py data file",
+        metavar="FILE",
+        nargs="?",
+        const=".coverage",
+        default=None
+    )
+
+    parser.add_argument(
+        "--fast-outline",
+        help="Chart only the def/class/if/for/while/try/with structure, scanned without building an AST "
+             "(much faster and smaller for huge files)",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--details",
+        help="Chart a module-level outline first, then one detail chart per function in parallel, "
+             "cached in this directory by function hash so unchanged functions are not rendered again",
+        metavar="CACHE_DIR",
+        nargs="?",
+        const=".flowchart_cache",
+        default=None
+    )
+
+    parser.add_argument(
+        "--dedupe",
+        help="Collapse runs of identical sibling subtrees into one node with a ×N badge "
+             "(exact, or shape to also ignore string and number literals)",
+        nargs="?",
+        choices=["exact", "shape"],
+        const="exact",
+        default=None
+    )
+
+    parser.add_argument(
+        "--git-range",
+        help="Chart only the functions and classes changed between two revisions of the local git "
+             "repository (\"A..B\", \"A...B\", or \"A\" to compare with the working tree)",
+        metavar="RANGE",
+        default=None
+    )
+
+    parser.add_argument(
+        "--manifest",
+        help="In project mode, record what every output was rendered from in this JSON file and skip "
+             "outputs whose source, parser version, theme, format and options are unchanged "
+             f"(without FILE: {MANIFEST_NAME} in the output directory)",
+        metavar="FILE",
+        nargs="?",
+        const="",
+        default=None
+    )
+
+    parser.add_argument(
+        "--output-archive",
+        help="Write every chart into this one zip or tar file (.tar, .tar.gz, ...) with an index.json of "
+             "sources, symbols and hashes, instead of separate files (implies project mode)",
+        metavar="FILE",
+        default=None
     )
 
     parser.add_argument(
@@ -137,10 +389,900 @@ def parse_arguments():
         action="store_true"
     )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.source_files and args.git_range is None:
+        parser.error("the following arguments are required: source_file")
+    return args
+
+def parse_render_arguments(argv: List[str]):
+    """Parse command line arguments for the render subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="code_to_flowchart.py render",
+        description="Render a graph file written with --format graph",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    parser.add_argument(
+        "graph_file",
+        help="Path to the graph file"
+    )
+
+    parser.add_argument(
+        "-o", "--output",
+        help="Output file path (default: graph_file_name.png)",
+        default=None
+    )
+
+    parser.add_argument(
+        "-f", "--format",
+        help="Comma-separated output formats (png, svg, pdf, pages, tiles, html)",
+        type=comma_list(["png", "svg", "pdf", "pages", "tiles", "html"]),
+        default=["png"]
+    )
+
+    parser.add_argument(
+        "-t", "--theme",
+        help="Comma-separated flowchart color schemes (standard, pastel, monochrome, colorful or all)",
+        type=comma_list(THEMES),
+        default=["standard"]
+    )
+
+    parser.add_argument(
+        "-b", "--backend",
+        help="Rendering backend (auto picks Graphviz for charts too large for matplotlib)",
+        choices=["auto", "matplotlib", "graphviz"],
+        default="auto"
+    )
+
+    parser.add_argument(
+        "--layout",
+        help="Layout algorithm for the matplotlib backend (auto uses Graphviz for large or cyclic graphs)",
+        choices=["auto", "grid", "dot", "sfdp"],
+        default="auto"
+    )
+
+    parser.add_argument(
+        "--timeout",
+        help="Seconds before a Graphviz layout is killed",
+        type=float,
+        default=GraphvizGenerator.DEFAULT_TIMEOUT
+    )
+
+    return parser.parse_args(argv)
+
+def parse_diff_arguments(argv: List[str]):
+    """Parse command line arguments for the diff subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="code_to_flowchart.py diff",
+        description="Chart the structural differences between two versions of a file",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    parser.add_argument(
+        "old_file",
+        help="Old version: a source file or a graph file written with --format graph"
+    )
+
+    parser.add_argument(
+        "new_file",
+        help="New version: a source file or a graph file written with --format graph"
+    )
+
+    parser.add_argument(
+        "-o", "--output",
+        help="Output file path (default: new_file_name_diff.png)",
+        default=None
+    )
+
+    parser.add_argument(
+        "-f", "--format",
+        help="Comma-separated output formats (png, svg, pdf, pages, tiles, html, graph)",
+        type=comma_list(["png", "svg", "pdf", "pages", "tiles", "html", "graph"]),
+        default=["png"]
+    )
+
+    parser.add_argument(
+        "-t", "--theme",
+        help="Comma-separated flowchart color schemes (standard, pastel, monochrome, colorful or all)",
+        type=comma_list(THEMES),
+        default=["standard"]
+    )
+
+    parser.add_argument(
+        "-b", "--backend",
+        help="Rendering backend (auto picks Graphviz for charts too large for matplotlib)",
+        choices=["auto", "matplotlib", "graphviz"],
+        default="auto"
+    )
+
+    parser.add_argument(
+        "--layout",
+        help="Layout algorithm for the matplotlib backend (auto uses Graphviz for large or cyclic graphs)",
+        choices=["auto", "grid", "dot", "sfdp"],
+        default="auto"
+    )
+
+    parser.add_argument(
+        "--timeout",
+        help="Seconds before a Graphviz layout is killed",
+        type=float,
+        default=GraphvizGenerator.DEFAULT_TIMEOUT
+    )
+
+    return parser.parse_args(argv)
+
+def collect_source_files(paths: List[str]) -> List[str]:
+    """
+    Expand the command line source paths into a list of Python files.
+
+    Archives (zip, wheel, sdist) expand to "archive!/member" selectors for
+    their Python files, which are read without extracting anything.
+
+    Args:
+        paths: Files, directories, archives or "archive!/member" selectors given on the command line
+
+    Returns:
+        The source files, with directories and archives expanded recursively
+
+    Raises:
+        FileNotFoundError: If a path does not exist
+    """
+    source_files = []
+    for path in paths:
+        archive, member = split_member_path(path)
+        if member is not None:
+            if not is_archive(archive):
+                raise FileNotFoundError(f"Archive '{archive}' not found")
+            source_files.append(path)
+        elif is_archive(path):
+            source_files.extend(member_path(path, name) for name in list_python_members(path))
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+                source_files.extend(
+                    os.path.join(root, name) for name in sorted(files) if is_python_file(name)
+                )
+        elif os.path.exists(path):
+            source_files.append(path)
+        else:
+            raise FileNotFoundError(f"Source file '{path}' not found")
+    return source_files
+
+def default_output_base(source_file: str, output_dir: Optional[str] = None) -> str:
+    """
+    Build the default output path, without extension, for a source file.
+
+    Archive members are charted into a directory named after the archive,
+    mirroring their path inside it.
+
+    Args:
+        source_file: Path to the source code file, or an "archive!/member" selector
+        output_dir: Directory for the output, defaults to the source file's (or archive's) directory
+
+    Returns:
+        The output path without extension
+    """
+    archive, member = split_member_path(source_file)
+    if member is not None:
+        if output_dir is None:
+            output_dir = os.path.dirname(archive)
+        output_dir = os.path.join(output_dir, archive_stem(archive), *os.path.dirname(member).split("/"))
+        source_file = member
+    base_name = os.path.splitext(os.path.basename(source_file))[0]
+    if output_dir is None:
+        output_dir = os.path.dirname(source_file)
+    return os.path.join(output_dir, f"{base_name}_flowchart")
+
+def project_output_base(source_file: str, root: str) -> str:
+    """
+    Build the output path, without extension, of a source file in a project output directory or archive.
+
+    Plain files mirror their path below root, so files of the same name in
+    different packages (every __init__.py) get separate charts.
+
+    Args:
+        source_file: Path to the source code file, or an "archive!/member" selector
+        root: Absolute directory that plain source files are made relative to, from common_source_root
+
+    Returns:
+        A relative path mirroring the source file's path below root, or inside its archive
+    """
+    _, member = split_member_path(source_file)
+    if member is not None:
+        return default_output_base(source_file, "")
+    relative = os.path.relpath(os.path.splitext(os.path.abspath(source_file))[0], root)
+    return f"{relative}_flowchart"
+
+def common_source_root(source_files: List[str]) -> str:
+    """
+    Find the deepest directory containing every plain source file.
+
+    Args:
+        source_files: Paths to source files or "archive!/member" selectors
+
+    Returns:
+        The absolute directory, or the current directory if there are only archive members
+    """
+    directories = [os.path.dirname(os.path.abspath(source_file)) for source_file in source_files
+                   if split_member_path(source_file)[1] is None]
+    return os.path.commonpath(directories) if directories else os.path.abspath(os.curdir)
+
+def plan_outputs(output_base: str, themes: List[str], formats: List[str]) -> List[Tuple[Optional[str], str, str]]:
+    """
+    List every output file for a set of themes and formats.
+
+    The theme is appended to the file name when more than one is requested.
+    Graph files do not depend on the theme and are written once. Tile
+    pyramids are written to a "_tiles" directory and multi-page PDFs to
+    a "_pages.pdf" file.
+
+    Args:
+        output_base: Output path without extension
+        themes: The color schemes to render
+        formats: The output formats to render
+
+    Returns:
+        List of (theme, output_path, output_format) tuples
+    """
+    outputs = []
+    for output_format in formats:
+        if output_format == "graph":
+            outputs.append((None, f"{output_base}.graph", output_format))
+            continue
+        for theme in themes:
+            suffix = f"_{theme}" if len(themes) > 1 else ""
+            if output_format == "tiles":
+                outputs.append((theme, f"{output_base}{suffix}_tiles", output_format))
+            elif output_format == "pages":
+                outputs.append((theme, f"{output_base}{suffix}_pages.pdf", output_format))
+            else:
+                outputs.append((theme, f"{output_base}{suffix}.{output_format}", output_format))
+    return outputs
+
+def parse_source_file(source_file: str, outline: bool = False, data: Optional[bytes] = None) -> dict:
+    """
+    Read and parse a source file.
+
+    Args:
+        source_file: Path to the source code file, or an "archive!/member" selector
+        outline: Only scan the block outline with OutlineScanner
+        data: The file contents if already read
+
+    Returns:
+        The parsed code structure from PythonParser
+    """
+    with SourceFile(source_file, data) as source:
+        return parse_source(source, outline)
+
+def parse_source(source: SourceFile, outline: bool = False) -> dict:
+    """
+    Parse source contents read with SourceFile.
+
+    The raw buffer goes straight to ast.parse, which decodes it according
+    to its coding cookie; only files that are not valid in their declared
+    encoding are decoded first, as latin-1.
+
+    Args:
+        source: The source file contents
+        outline: Only scan the block outline with OutlineScanner
+
+    Returns:
+        The parsed code structure from PythonParser
+    """
+    if outline:
+        return OutlineScanner().scan(source.text())
+    try:
+        return PythonParser().parse(source.data)
+    except ValueError:
+        if source.is_decodable():
+            raise
+        return PythonParser().parse(source.text())
+
+def build_flowchart(source_file: str) -> dict:
+    """
+    Read, parse and adapt a source file into a flowchart structure.
+
+    Args:
+        source_file: Path to the source code file
+
+    Returns:
+        The flowchart structure expected by the generators
+    """
+    return adapt_parsed_code_for_simple_flowchart(parse_source_file(source_file))
+
+def write_parsed_graph(parsed_code: dict, output_path: str) -> None:
+    """
+    Write a parsed graph file including the grid layout coordinates.
+
+    Args:
+        parsed_code: The parsed code structure from PythonParser
+        output_path: Path to the graph file (gzip-compressed if it ends in .gz)
+    """
+    node_count = len(parsed_code["nodes"])
+    with GraphWriter(output_path, parsed_code.get("legend")) as writer:
+        # Positions are computed one node at a time, so the graph is never copied
+        for index, node in enumerate(parsed_code["nodes"]):
+            if "x" in node and "y" in node:
+                x, y = node["x"], node["y"]
+            else:
+                x, y = grid_position(index, node_count)
+            writer.write_node(dict(node, x=round(x, 6), y=round(y, 6)))
+        for edge in parsed_code["edges"]:
+            writer.write_edge(edge)
+
+def render_outputs(parsed_code: dict, outputs: List[Tuple[Optional[str], str, str]],
+                   backend: str = "auto", layout: str = "auto", timeout: Optional[float] = None,
+                   profiler=NULL_PROFILER, stats_path: Optional[str] = None) -> None:
+    """
+    Write every requested output for one parsed graph.
+
+    The graph is analyzed, adapted and laid out once. With the matplotlib
+    backend the figure is also drawn once and recolored for each theme.
+    Tile pyramids, multi-page PDFs and HTML pages do not depend on the backend.
+
+    Args:
+        parsed_code: The parsed code structure from PythonParser
+        outputs: List of (theme, output_path, output_format) tuples from plan_outputs
+        backend: Rendering backend (auto, matplotlib or graphviz)
+        layout: Layout algorithm for the matplotlib backend (auto, grid, dot or sfdp)
+        timeout: Seconds before a Graphviz layout is killed
+        profiler: Profiler recording the pipeline phases
+        stats_path: Where to write the graph statistics as JSON, if anywhere
+    """
+    with profiler.phase("analyze"):
+        stats = compute_graph_stats(parsed_code)
+    if stats_path is not None:
+        ensure_dir_exists(os.path.dirname(stats_path))
+        write_stats(stats, stats_path)
+
+    strategy = choose_render_strategy(stats, GraphvizGenerator.is_available(), GraphvizGenerator.SFDP_THRESHOLD)
+    if backend == "auto":
+        backend = strategy["backend"]
+    if layout == "auto":
+        layout = strategy["layout"]
+
+    image_outputs = []
+    layout_outputs = []
+    for theme, output_path, output_format in outputs:
+        ensure_dir_exists(os.path.dirname(output_path))
+        if output_format == "graph":
+            with profiler.phase("write_graph"):
+                write_parsed_graph(parsed_code, output_path)
+        elif output_format in ("tiles", "pages", "html"):
+            layout_outputs.append((theme, output_path, output_format))
+        else:
+            image_outputs.append((theme, output_path, output_format))
+
+    if not image_outputs and not layout_outputs:
+        return
+
+    with profiler.phase("adapt"):
+        adapted_code = convert_parsed_code(parsed_code)
+
+    if backend == "graphviz":
+        for theme, output_path, output_format in image_outputs:
+            generator = GraphvizGenerator(color_scheme=theme)
+            with profiler.phase("graphviz"):
+                generator.generate_from_structure(adapted_code, output_path, output_format, timeout=timeout)
+        if not layout_outputs:
+            return
+        image_outputs = []
+
+    with profiler.phase("layout"):
+        if layout != "grid":
+            positions = GraphvizGenerator().compute_layout(adapted_code, timeout=timeout, engine=layout)
+            for node in adapted_code["nodes"]:
+                if "x" not in node and node["id"] in positions:
+                    node["x"], node["y"] = positions[node["id"]]
+        apply_grid_layout(adapted_code["nodes"])
+
+    for theme, output_path, output_format in layout_outputs:
+        with profiler.phase(output_format):
+            if output_format == "tiles":
+                TileGenerator(color_scheme=theme).generate_from_structure(adapted_code, output_path)
+            elif output_format == "html":
+                HtmlGenerator(color_scheme=theme).generate_from_structure(
+                    adapted_code, output_path, function_clusters(parsed_code),
+                    title=os.path.splitext(os.path.basename(output_path))[0]
+                )
+            else:
+                PagedPdfGenerator(color_scheme=theme).generate_from_structure(
+                    adapted_code, output_path, function_clusters(parsed_code)
+                )
+
+    if image_outputs:
+        SimpleFlowchartGenerator(profiler=profiler).generate_variants(adapted_code, image_outputs)
+
+def stats_output_path(output_base: str) -> str:
+    """Return the statistics JSON path for an output path without extension."""
+    return f"{output_base}.stats.json"
+
+def render_source_file(source_file: str, outputs: List[Tuple[Optional[str], str, str]],
+                       backend: str = "auto", layout: str = "auto", timeout: Optional[float] = None,
+                       stats_path: Optional[str] = None, heat_entries: Optional[List[dict]] = None,
+                       heat_metric: str = "cumulative",
+                       branch_counts: Optional[Tuple[Dict[int, int], Dict[Tuple[int, int], int]]] = None,
+                       coverage: Optional[Tuple[List[int], Optional[Set[Tuple[int, int]]]]] = None,
+                       dedupe: Optional[str] = None, outline: bool = False,
+                       source_data: Optional[bytes] = None) -> List[str]:
+    """
+    Convert one source file to flowcharts.
+
+    This is a module-level function so it can run in a worker process.
+
+    Args:
+        source_file: Path to the source code file
+        outputs: List of (theme, output_path, output_format) tuples from plan_outputs
+        backend: Rendering backend (auto, matplotlib or graphviz)
+        layout: Layout algorithm for the matplotlib backend
+        timeout: Seconds before a Graphviz layout is killed
+        stats_path: Where to write the graph statistics as JSON, if anywhere
+        heat_entries: Profile entries for this file to color nodes by, if any
+        heat_metric: The profile metric to color by
+        branch_counts: Traced line and line transition counts for this file, if any
+        coverage: Executed lines and arcs for this file, from CoverageData.lines_for, if any
+        dedupe: Collapse repeated subtrees ("exact", or "shape" to ignore literals), if set
+        outline: Only chart the block outline, from OutlineScanner
+        source_data: The file contents if already read, e.g. from a tar archive
+
+    Returns:
+        The output paths
+    """
+    parsed_code = parse_source_file(source_file, outline, source_data)
+    if dedupe is not None:
+        collapse_repeats(parsed_code, ignore_literals=dedupe == "shape")
+    if heat_entries:
+        apply_heat_overlay(parsed_code, heat_entries, heat_metric)
+    if branch_counts is not None:
+        apply_branch_counts(parsed_code, *branch_counts)
+    if coverage is not None:
+        apply_coverage_overlay(parsed_code, *coverage)
+    render_outputs(parsed_code, outputs, backend, layout, timeout, stats_path=stats_path)
+    return [output_path for _, output_path, _ in outputs]
+
+def run_project(args, source_files: List[str]) -> int:
+    """
+    Convert many source files in parallel.
+
+    With -o the charts mirror the source tree below the files' common
+    directory. With --output-archive the charts are rendered into a staging directory
+    and moved into the archive as each file finishes. With --manifest only
+    outputs whose inputs changed since the last run are rendered.
+
+    Args:
+        args: Parsed command line arguments
+        source_files: The source files to convert
+
+    Returns:
+        Process exit code
+    """
+    if args.output_archive:
+        root = common_source_root(source_files)
+        bases = [project_output_base(source_file, root) for source_file in source_files]
+    elif args.output is not None:
+        root = common_source_root(source_files)
+        bases = [os.path.join(args.output, project_output_base(source_file, root)) for source_file in source_files]
+        ensure_dir_exists(args.output)
+    else:
+        bases = [default_output_base(source_file) for source_file in source_files]
+
+    # Two sources writing the same chart would silently overwrite each other
+    owners: Dict[str, str] = {}
+    for source_file, base in zip(source_files, bases):
+        other = owners.setdefault(os.path.normcase(os.path.normpath(base)), source_file)
+        if other != source_file:
+            raise ValueError(f"{other} and {source_file} would both be charted to {base}")
+
+    console.print(f"Generating flowcharts for {len(source_files)} files "
+                  f"({', '.join(args.format)}) with the [green]{args.backend}[/green] backend...")
+    start_time = time.perf_counter()
+
+    # The profile is loaded once; each file only receives its own entries
+    heat_entries = [None] * len(source_files)
+    if args.heat_profile:
+        profile_data = ProfileData.load(args.heat_profile)
+        heat_entries = [profile_data.entries_for(source_file) for source_file in source_files]
+
+    # The command is traced once for all files, before any worker starts
+    branch_counts = [None] * len(source_files)
+    if args.trace is not None:
+        if not args.trace:
+            raise ValueError("--trace needs a command in project mode")
+        console.print(f"Tracing: [cyan]{args.trace}[/cyan]")
+        with BranchTracer(source_files) as tracer:
+            run_command(shlex.split(args.trace))
+        branch_counts = [(tracer.counts_for(source_file), tracer.arcs_for(source_file))
+                         for source_file in source_files]
+
+    # Members of tar archives can only be read in order, so each archive is streamed once
+    # here; zip members are read by the workers themselves
+    source_data = [None] * len(source_files)
+    tar_members = {}
+    for index, source_file in enumerate(source_files):
+        archive, member = split_member_path(source_file)
+        if member is not None and is_tar_archive(archive):
+            tar_members.setdefault(archive, {})[member] = index
+    for archive, members in tar_members.items():
+        for member, data in iter_python_members(archive):
+            if member in members:
+                source_data[members[member]] = data
+
+    # One database connection and one query per file for the whole project
+    coverage = [None] * len(source_files)
+    if args.coverage_data is not None:
+        with CoverageData(args.coverage_data) as coverage_data:
+            coverage = [coverage_data.lines_for(source_file) for source_file in source_files]
+
+    errors = [None] * len(source_files)
+    writer, staging_dir = None, None
+    if args.output_archive:
+        ensure_dir_exists(os.path.dirname(args.output_archive))
+        writer = ChartArchiveWriter(args.output_archive)
+        staging_dir = tempfile.mkdtemp(prefix="flowcharts-")
+        bases = [os.path.join(staging_dir, base) for base in bases]
+    plans = [plan_outputs(base, args.theme, args.format) for base in bases]
+
+    # Outputs recorded in the manifest with unchanged inputs and contents are skipped, and each
+    # file renders only its stale outputs; overlay data is not tracked, so those files always render
+    manifest, pending, tracked = None, list(range(len(source_files))), {}
+    if args.manifest is not None and writer is not None:
+        console.print("[bold yellow]Warning:[/bold yellow] --manifest is not used with --output-archive")
+    elif args.manifest is not None:
+        # By default the manifest lives with the outputs it describes
+        manifest_path = args.manifest or os.path.join(args.output or common_source_root(source_files), MANIFEST_NAME)
+        manifest = BuildManifest(manifest_path)
+        # Whether Graphviz is installed decides the auto backend and layout and the svg/pdf renderer
+        options = {"backend": args.backend, "layout": args.layout, "dedupe": args.dedupe,
+                   "fast_outline": args.fast_outline, "graphviz": GraphvizGenerator.is_available()}
+        pending = []
+        for index, source_file in enumerate(source_files):
+            if heat_entries[index] or branch_counts[index] is not None or coverage[index] is not None:
+                pending.append(index)
+                continue
+            checks = plans[index] + ([(None, stats_output_path(bases[index]), "stats")] if args.stats else [])
+            try:
+                source_hash = manifest.source_hash(source_file, source_data[index])
+            except Exception as e:
+                errors[index] = e
+                continue
+            inputs = {path: manifest.inputs(source_file, source_hash, theme, output_format, options)
+                      for theme, path, output_format in checks}
+            stale = [output for output in checks if not manifest.is_up_to_date(output[1], inputs[output[1]])]
+            if stale:
+                plans[index] = [output for output in stale if output[2] != "stats"]
+                # Statistics are rewritten whenever the file is rendered
+                tracked[index] = {output[1]: inputs[output[1]] for output in checks
+                                  if output[2] == "stats" or output in stale}
+                pending.append(index)
+        console.print(f"[cyan]{len(source_files) - len(pending)}[/cyan] files up to date "
+                      f"according to [cyan]{manifest_path}[/cyan]")
+
+    def finish_file(index: int) -> None:
+        """Move the charts of one finished file into the archive, or record them in the manifest."""
+        if errors[index] is not None:
+            return
+        if manifest is not None:
+            for path, inputs in tracked.get(index, {}).items():
+                manifest.record(path, inputs)
+        if writer is None:
+            return
+        outputs = plans[index] + ([(None, stats_output_path(bases[index]), "stats")] if args.stats else [])
+        try:
+            with SourceFile(source_files[index], source_data[index]) as source:
+                source_hash = source.digest()
+            writer.add_outputs(outputs, staging_dir, source_files[index], source_hash=source_hash)
+        except Exception as e:
+            errors[index] = e
+
+    try:
+        if args.backend == "graphviz":
+            generator = GraphvizGenerator()
+            jobs, owners = [], []
+            for index in pending:
+                source_file, outputs = source_files[index], plans[index]
+                try:
+                    parsed_code = parse_source_file(source_file, args.fast_outline, source_data[index])
+                    if args.dedupe is not None:
+                        collapse_repeats(parsed_code, ignore_literals=args.dedupe == "shape")
+                    if heat_entries[index]:
+                        apply_heat_overlay(parsed_code, heat_entries[index], args.heat_metric)
+                    if branch_counts[index] is not None:
+                        apply_branch_counts(parsed_code, *branch_counts[index])
+                    if coverage[index] is not None:
+                        apply_coverage_overlay(parsed_code, *coverage[index])
+                    render_outputs(parsed_code, [output for output in outputs if output[2] == "graph"],
+                                   stats_path=stats_output_path(bases[index]) if args.stats else None)
+                    flowchart = adapt_parsed_code_for_simple_flowchart(parsed_code)
+                except Exception as e:
+                    errors[index] = e
+                    continue
+                for theme, output_path, output_format in outputs:
+                    if output_format != "graph":
+                        jobs.append((flowchart, output_path, output_format, theme))
+                        owners.append(index)
+            for index, error in zip(owners, generator.render_many(jobs, max_workers=args.jobs, timeout=args.timeout)):
+                errors[index] = errors[index] or error
+            for index in pending:
+                finish_file(index)
+        else:
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                futures = {
+                    executor.submit(render_source_file, source_files[index], plans[index], args.backend, args.layout,
+                                    args.timeout, stats_output_path(bases[index]) if args.stats else None,
+                                    heat_entries[index], args.heat_metric, branch_counts[index], coverage[index],
+                                    args.dedupe, args.fast_outline, source_data[index]): index
+                    for index in pending
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors[index] = e
+                    finish_file(index)
+    finally:
+        if writer is not None:
+            writer.close()
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        if manifest is not None:
+            manifest.save()
+
+    failures = 0
+    for source_file, error in zip(source_files, errors):
+        if error is not None:
+            failures += 1
+            console.print(f"[bold red]Error:[/bold red] {source_file}: {str(error)}", style="red")
+
+    converted = sum(1 for index in pending if errors[index] is None)
+    rendered = set(pending)
+    up_to_date = sum(1 for index, error in enumerate(errors) if index not in rendered and error is None)
+    summary = f"{converted} converted, {up_to_date} up to date" if manifest is not None else f"{converted} converted"
+    console.print(f"[bold green]Done![/bold green] {len(source_files)} files: {summary} "
+                  f"in {time.perf_counter() - start_time:.2f}s")
+    if writer is not None:
+        console.print(f"{len(writer.entries)} charts written to [cyan]{args.output_archive}[/cyan]")
+    return 1 if failures else 0
+
+def parse_touched_symbols(source: bytes, line_ranges: List[Tuple[int, int]],
+                          dedupe: Optional[str] = None) -> List[Tuple[str, dict]]:
+    """
+    Parse one changed file and cut out the definitions enclosing its changes.
+
+    This is a module-level function so it can run in a worker process.
+
+    Args:
+        source: The file contents at the new revision
+        line_ranges: Changed (first, last) line ranges, from changed_hunks
+        dedupe: Collapse repeated subtrees ("exact", or "shape" to ignore literals), if set
+
+    Returns:
+        (qualified name, parsed subgraph) pairs; the module-level chart keeps
+        functions and classes as single nodes
+    """
+    parsed_code = PythonParser().parse(decode_source(source))
+    definition_types = tuple(FUNCTION_TYPES | {"class"})
+    symbols = []
+    for qualname, node_id in touched_symbols(parsed_code, line_ranges):
+        subgraph = extract_subtree(parsed_code, node_id, definition_types if qualname == "<module>" else ())
+        if dedupe is not None:
+            collapse_repeats(subgraph, ignore_literals=dedupe == "shape")
+        symbols.append((qualname, subgraph))
+    return symbols
+
+def run_git_range(args) -> int:
+    """
+    Chart only the definitions touched between two revisions.
+
+    Changed files and hunks come from one `git diff -U0` and the new file
+    contents from one `git cat-file --batch`. Files are parsed and the
+    touched definitions rendered in parallel, one chart per definition,
+    named after the file's module path and the definition's qualified name.
+    With --output-archive the charts go into the archive as they finish.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Process exit code
+    """
+    if args.heat_profile or args.trace is not None or args.coverage_data is not None:
+        console.print("[bold yellow]Warning:[/bold yellow] overlays are not applied with --git-range")
+
+    _, new_revision = split_revision_range(args.git_range)
+    root = repository_root()
+    hunks = changed_hunks(args.git_range, args.source_files)
+    console.print(f"[cyan]{len(hunks)}[/cyan] changed Python files in [cyan]{args.git_range}[/cyan]")
+    if not hunks:
+        return 0
+
+    paths = sorted(hunks)
+    sources = read_revision_files(paths, new_revision, root)
+    writer = None
+    if args.output_archive:
+        ensure_dir_exists(os.path.dirname(args.output_archive))
+        writer = ChartArchiveWriter(args.output_archive)
+        output_dir = tempfile.mkdtemp(prefix="flowcharts-")
+    else:
+        output_dir = args.output or os.curdir
+        ensure_dir_exists(output_dir)
+    start_time = time.perf_counter()
+
+    failures, charted = 0, 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            parse_futures = [executor.submit(parse_touched_symbols, sources[path], hunks[path], args.dedupe)
+                             for path in paths]
+            render_futures = []
+            for path, future in zip(paths, parse_futures):
+                try:
+                    symbols = future.result()
+                except Exception as e:
+                    failures += 1
+                    console.print(f"[bold red]Error:[/bold red] {path}: {str(e)}", style="red")
+                    continue
+                module = os.path.splitext(path)[0].replace("/", ".")
+                for qualname, subgraph in symbols:
+                    base = os.path.join(output_dir, f"{module}.{'module' if qualname == '<module>' else qualname}")
+                    outputs = plan_outputs(base, args.theme, args.format)
+                    stats_path = stats_output_path(base) if args.stats else None
+                    future = executor.submit(render_outputs, subgraph, outputs, args.backend, args.layout,
+                                             args.timeout, stats_path=stats_path)
+                    if stats_path is not None:
+                        outputs = outputs + [(None, stats_path, "stats")]
+                    render_futures.append((path, qualname, outputs, future))
+            for path, qualname, outputs, future in render_futures:
+                try:
+                    future.result()
+                    if writer is not None:
+                        writer.add_outputs(outputs, output_dir, path, qualname,
+                                           SourceFile(path, sources[path]).digest())
+                    charted += 1
+                    console.print(f"Charted [cyan]{path}: {qualname}[/cyan]")
+                except Exception as e:
+                    failures += 1
+                    console.print(f"[bold red]Error:[/bold red] {path}: {qualname}: {str(e)}", style="red")
+    finally:
+        if writer is not None:
+            writer.close()
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    console.print(f"[bold green]Done![/bold green] {charted} changed definitions charted into "
+                  f"[cyan]{args.output_archive or output_dir}[/cyan] in {time.perf_counter() - start_time:.2f}s")
+    return 1 if failures else 0
+
+def run_outline_details(args, source_file: str, outputs: List[Tuple[Optional[str], str, str]],
+                        output_base: str) -> int:
+    """
+    Chart a module as an outline right away and its functions in the background.
+
+    The outline goes to the normal outputs. Detail charts go to the cache
+    directory, and an index of them to `<output>_details.json`.
+
+    Args:
+        args: Parsed command line arguments
+        source_file: Path to the source code file
+        outputs: List of (theme, output_path, output_format) tuples for the outline
+        output_base: Output path without extension
+
+    Returns:
+        Process exit code
+    """
+    console.print(f"Scanning outline: [cyan]{source_file}[/cyan]")
+    charts = DetailCharts(read_file(source_file), args.details, render_outputs, args.theme, args.format,
+                          {"backend": args.backend, "layout": args.layout, "timeout": args.timeout})
+    render_outputs(charts.outline_chart(), outputs, args.backend, args.layout, args.timeout)
+    for _, output_path, _ in outputs:
+        console.print(f"[bold green]Success![/bold green] Outline saved to: [cyan]{output_path}[/cyan]")
+
+    cached = sum(1 for qualname in charts.functions if charts.is_cached(qualname))
+    console.print(f"Rendering detail charts for {len(charts.functions) - cached} of {len(charts.functions)} "
+                  f"functions ({cached} cached) into [cyan]{args.details}[/cyan]...")
+    start_time = time.perf_counter()
+    paths, errors = charts.chart_all(args.jobs)
+    for qualname, error in errors.items():
+        console.print(f"[bold red]Error:[/bold red] {qualname}: {str(error)}", style="red")
+
+    index_path = f"{output_base}_details.json"
+    index = {
+        qualname: {"lineno": node["lineno"], "end_lineno": node["end_lineno"], "outputs": paths[qualname]}
+        for qualname, node in charts.functions.items() if qualname not in errors
+    }
+    with open(index_path, "w", encoding="utf-8") as file:
+        json.dump(index, file, indent=2)
+    console.print(f"[bold green]Done![/bold green] Detail chart index saved to: [cyan]{index_path}[/cyan] "
+                  f"({time.perf_counter() - start_time:.2f}s)")
+    return 1 if errors else 0
+
+def render_main(argv: List[str]) -> int:
+    """Render a graph file without touching the original source."""
+    args = parse_render_arguments(argv)
+
+    try:
+        if not os.path.exists(args.graph_file):
+            console.print(f"[bold red]Error:[/bold red] Graph file '{args.graph_file}' not found", style="red")
+            return 1
+
+        outputs = plan_outputs("", args.theme, args.format)
+        if args.output is not None and len(outputs) == 1:
+            outputs = [(outputs[0][0], args.output, outputs[0][2])]
+        else:
+            base_name = args.graph_file if args.output is None else os.path.splitext(args.output)[0]
+            for suffix in (".gz", ".graph"):
+                if base_name.endswith(suffix):
+                    base_name = base_name[:-len(suffix)]
+            outputs = plan_outputs(base_name, args.theme, args.format)
+
+        console.print(f"Reading graph file: [cyan]{args.graph_file}[/cyan]")
+        parsed_code = read_graph(args.graph_file)
+
+        console.print(f"Generating {len(outputs)} flowchart(s) with [green]{', '.join(args.theme)}[/green] "
+                      f"color scheme...")
+        start_time = time.perf_counter()
+        render_outputs(parsed_code, outputs, args.backend, args.layout, args.timeout)
+
+        for _, output_path, _ in outputs:
+            console.print(f"[bold green]Success![/bold green] Flowchart saved to: [cyan]{output_path}[/cyan]")
+        console.print(f"Rendered in {time.perf_counter() - start_time:.2f}s")
+        return 0
+
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}", style="red")
+        return 1
+
+def load_version(path: str) -> dict:
+    """
+    Load one version of a file for diffing.
+
+    Args:
+        path: A source file, or a graph file written with --format graph
+
+    Returns:
+        The parsed code structure
+    """
+    if path.endswith((".graph", ".graph.gz")):
+        return read_graph(path)
+    return parse_source_file(path)
+
+def diff_main(argv: List[str]) -> int:
+    """Chart what changed between two versions of a file."""
+    args = parse_diff_arguments(argv)
+
+    try:
+        for path in (args.old_file, args.new_file):
+            if not os.path.exists(path):
+                console.print(f"[bold red]Error:[/bold red] File '{path}' not found", style="red")
+                return 1
+
+        output_base = os.path.splitext(args.output)[0] if args.output else f"{os.path.splitext(args.new_file)[0]}_diff"
+        outputs = plan_outputs(output_base, args.theme, args.format)
+        if args.output is not None and len(outputs) == 1:
+            outputs = [(outputs[0][0], args.output, outputs[0][2])]
+
+        console.print(f"Comparing [cyan]{args.old_file}[/cyan] with [cyan]{args.new_file}[/cyan]")
+        diff = diff_graphs(load_version(args.old_file), load_version(args.new_file))
+        summary = diff["summary"]
+        console.print(f"[green]{summary['added']} added[/green], [red]{summary['removed']} removed[/red], "
+                      f"[yellow]{summary['modified']} modified[/yellow], {summary['unchanged']} unchanged nodes")
+
+        start_time = time.perf_counter()
+        render_outputs(diff, outputs, args.backend, args.layout, args.timeout)
+
+        for _, output_path, _ in outputs:
+            console.print(f"[bold green]Success![/bold green] Diff chart saved to: [cyan]{output_path}[/cyan]")
+        console.print(f"Rendered in {time.perf_counter() - start_time:.2f}s")
+        return 0
+
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}", style="red")
+        return 1
 
 def main():
     """Main function to convert code to flowchart."""
+    if sys.argv[1:2] == ["render"]:
+        return render_main(sys.argv[2:])
+    if sys.argv[1:2] == ["diff"]:
+        return diff_main(sys.argv[2:])
+
     args = parse_arguments()
 
     try:
@@ -152,47 +1294,114 @@ def main():
             )
         )
 
-        if not os.path.exists(args.source_file):
-            console.print(f"[bold red]Error:[/bold red] Source file '{args.source_file}' not found", style="red")
+        if args.git_range is not None:
+            return run_git_range(args)
+
+        try:
+            source_files = collect_source_files(args.source_files)
+        except FileNotFoundError as e:
+            console.print(f"[bold red]Error:[/bold red] {str(e)}", style="red")
             return 1
 
-        # Determine output file path
-        if args.output is None:
-            base_name = os.path.splitext(os.path.basename(args.source_file))[0]
-            output_dir = os.path.dirname(args.source_file)
-            args.output = os.path.join(output_dir, f"{base_name}_flowchart.{args.format}")
+        if (len(args.source_files) > 1 or os.path.isdir(args.source_files[0]) or is_archive(args.source_files[0])
+                or args.output_archive):
+            return run_project(args, source_files)
+
+        source_file = source_files[0]
 
-        # Ensure output directory exists
-        ensure_dir_exists(os.path.dirname(args.output))
+        # Determine output file paths
+        output_base = default_output_base(source_file)
+        outputs = plan_outputs(output_base, args.theme, args.format)
+        if args.output is not None:
+            output_base = os.path.splitext(args.output)[0]
+            if len(outputs) == 1:
+                outputs = [(outputs[0][0], args.output, outputs[0][2])]
+            else:
+                outputs = plan_outputs(output_base, args.theme, args.format)
+
+        if args.details is not None:
+            return run_outline_details(args, source_file, outputs, output_base)
+
+        profiler = NULL_PROFILER
+        if args.profile:
+            profiler = PhaseProfiler(cprofile_dir=args.profile_dump)
+            tracemalloc.start()
 
         # Read source code
-        console.print(f"Reading source file: [cyan]{args.source_file}[/cyan]")
-        source_code = read_file(args.source_file)
+        console.print(f"Reading source file: [cyan]{source_file}[/cyan]")
+        with profiler.phase("read_file"):
+            source = SourceFile(source_file)
 
         # Parse the code
-        console.print("Parsing code...")
-        parser = PythonParser()
-        parsed_code = parser.parse(source_code)
-        
-        # Adapt the parsed code for SimpleFlowchartGenerator
-        adapted_code = adapt_parsed_code_for_simple_flowchart(parsed_code)
+        console.print("Scanning outline..." if args.fast_outline else "Parsing code...")
+        with source, profiler.phase("parse"):
+            parsed_code = parse_source(source, args.fast_outline)
+
+        if args.dedupe is not None:
+            with profiler.phase("dedupe"):
+                removed = collapse_repeats(parsed_code, ignore_literals=args.dedupe == "shape")
+            console.print(f"Collapsed [cyan]{removed}[/cyan] repeated nodes")
+
+        if args.heat_profile:
+            console.print(f"Joining profile data: [cyan]{args.heat_profile}[/cyan]")
+            with profiler.phase("heat_overlay"):
+                profile_data = ProfileData.load(args.heat_profile)
+                colored = apply_heat_overlay(parsed_code, profile_data.entries_for(source_file), args.heat_metric)
+            if not colored:
+                console.print("[bold yellow]Warning:[/bold yellow] the profile has no timings for this file")
+
+        if args.trace is not None:
+            command = shlex.split(args.trace) or [source_file]
+            console.print(f"Tracing: [cyan]{' '.join(command)}[/cyan]")
+            with profiler.phase("trace"):
+                with BranchTracer([source_file]) as tracer:
+                    status = run_command(command)
+                apply_branch_counts(parsed_code, tracer.counts_for(source_file), tracer.arcs_for(source_file))
+            if status:
+                console.print(f"[bold yellow]Warning:[/bold yellow] the traced command exited with status {status}")
+
+        if args.coverage_data is not None:
+            console.print(f"Joining coverage data: [cyan]{args.coverage_data}[/cyan]")
+            with profiler.phase("coverage_overlay"):
+                with CoverageData(args.coverage_data) as coverage_data:
+                    coverage = coverage_data.lines_for(source_file)
+                if coverage is not None:
+                    apply_coverage_overlay(parsed_code, *coverage)
+            if coverage is None:
+                console.print("[bold yellow]Warning:[/bold yellow] the coverage data does not include this file")
+
+        # Generate flowcharts
+        console.print(f"Generating {', '.join(fmt.upper() for fmt in args.format)} flowchart with "
+                      f"[green]{', '.join(args.theme)}[/green] color scheme...")
+        start_time = time.perf_counter()
+        render_outputs(parsed_code, outputs, args.backend, args.layout, args.timeout, profiler,
+                       stats_output_path(output_base) if args.stats else None)
 
-        # Generate flowchart
-        console.print(f"Generating {args.format.upper()} flowchart with [green]{args.theme}[/green] color scheme...")
-        generator = SimpleFlowchartGenerator(color_scheme=args.theme)
-        generator.generate_from_structure(adapted_code, args.output, args.format)
+        if args.profile:
+            tracemalloc.stop()
+            profiler.add_metric("nodes", len(parsed_code["nodes"]))
+            profiler.add_metric("edges", len(parsed_code["edges"]))
+            profiler.add_metric("output bytes", sum(os.path.getsize(path) for _, path, _ in outputs
+                                                     if os.path.isfile(path)))
+            console.print(profiler.report_table())
+            for path in profiler.dump_cprofile_stats():
+                console.print(f"cProfile stats saved to: [cyan]{path}[/cyan]")
 
-        console.print(f"[bold green]Success![/bold green] Flowchart saved to: [cyan]{args.output}[/cyan]")
+        for _, output_path, _ in outputs:
+            console.print(f"[bold green]Success![/bold green] Flowchart saved to: [cyan]{output_path}[/cyan]")
+        if len(outputs) > 1:
+            console.print(f"Rendered {len(outputs)} outputs in {time.perf_counter() - start_time:.2f}s")
 
         # Show the flowchart if requested
         if args.show:
+            output_path = outputs[0][1]
             console.print("Opening flowchart...")
             if sys.platform == "darwin":  # macOS
-                os.system(f"open {args.output}")
+                os.system(f"open {output_path}")
             elif sys.platform == "win32":  # Windows
-                os.system(f"start {args.output}")
+                os.system(f"start {output_path}")
             else:  # Linux
-                os.system(f"xdg-open {args.output}")
+                os.system(f"xdg-open {output_path}")
 
         return 0
 
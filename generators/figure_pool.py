@@ -0,0 +1,82 @@
+"""
+Figure pool for the Code to Flowchart tool.
+Keeps a bounded set of reusable matplotlib figures for long-running, multi-threaded renderers.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+from matplotlib import rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+def new_figure(figsize: Tuple[float, float] = (10, 12)) -> Figure:
+    """
+    Create a figure with its own Agg canvas, outside of the pyplot state machine.
+
+    Args:
+        figsize: Figure size in inches
+
+    Returns:
+        The new figure
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+class FigurePool:
+    """Thread-safe pool of figures that are cleared and reused between renders."""
+
+    def __init__(self, max_size: int = 4, figsize: Tuple[float, float] = (10, 12)):
+        """
+        Initialize the pool.
+
+        Args:
+            max_size: Maximum number of figures alive at once; more callers block
+            figsize: Figure size in inches
+        """
+        self.max_size = max_size
+        self.figsize = figsize
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle: List[Figure] = []
+
+    @contextmanager
+    def figure(self) -> Iterator[Figure]:
+        """
+        Borrow a blank figure for the duration of a render.
+
+        The figure is cleared and returned to the pool even if drawing raises.
+
+        Yields:
+            A blank figure with an Agg canvas
+        """
+        self._slots.acquire()
+        try:
+            with self._lock:
+                fig = self._idle.pop() if self._idle else None
+            if fig is None:
+                fig = new_figure(self.figsize)
+
+            try:
+                yield fig
+            finally:
+                fig.clear()
+                fig.set_size_inches(self.figsize)
+                # Undo the margins left behind by tight_layout
+                fig.subplots_adjust(**{
+                    key: rcParams[f"figure.subplot.{key}"]
+                    for key in ("left", "right", "bottom", "top", "wspace", "hspace")
+                })
+                with self._lock:
+                    self._idle.append(fig)
+        finally:
+            self._slots.release()
+
+    def clear(self) -> None:
+        """Drop all idle figures."""
+        with self._lock:
+            self._idle.clear()
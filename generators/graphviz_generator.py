@@ -0,0 +1,252 @@
+"""
+Graphviz generator for the Code to Flowchart tool.
+Serializes flowchart structures to DOT and lays them out with the Graphviz binaries.
+"""
+
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Tuple, Optional
+
+from generators.simple_flowchart_generator import SimpleFlowchartGenerator
+
+
+class GraphvizGenerator:
+    """Generator that renders flowcharts through local Graphviz processes."""
+
+    # Graphviz shapes for the shapes used by SimpleFlowchartGenerator
+    DOT_SHAPES = {
+        "ellipse": "ellipse",
+        "rectangle": "box",
+        "diamond": "diamond",
+        "parallelogram": "parallelogram",
+        "offpage": "invhouse"
+    }
+
+    # Graphs larger than this are laid out with sfdp instead of dot
+    SFDP_THRESHOLD = 2000
+
+    # Seconds a single layout may run before it is killed
+    DEFAULT_TIMEOUT = 60
+
+    def __init__(self, color_scheme: str = "standard"):
+        """
+        Initialize the Graphviz generator.
+
+        Args:
+            color_scheme: The color scheme to use (standard, pastel, monochrome, colorful)
+        """
+        self.colors = SimpleFlowchartGenerator.COLOR_SCHEMES.get(
+            color_scheme, SimpleFlowchartGenerator.COLOR_SCHEMES["standard"]
+        )
+
+    @staticmethod
+    def is_available(engine: str = "dot") -> bool:
+        """
+        Check whether a Graphviz layout engine is installed.
+
+        Args:
+            engine: Name of the Graphviz binary (dot, sfdp, ...)
+
+        Returns:
+            True if the binary can be found on PATH, False otherwise
+        """
+        return shutil.which(engine) is not None
+
+    def select_engine(self, flowchart: Dict[str, Any]) -> str:
+        """
+        Pick the layout engine for a flowchart based on its size.
+
+        Args:
+            flowchart: The flowchart structure
+
+        Returns:
+            "sfdp" for very large graphs, "dot" otherwise
+        """
+        if len(flowchart.get("nodes", [])) > self.SFDP_THRESHOLD:
+            return "sfdp"
+        return "dot"
+
+    def to_dot(self, flowchart: Dict[str, Any]) -> str:
+        """
+        Serialize a flowchart structure to DOT source.
+
+        Args:
+            flowchart: The flowchart structure
+
+        Returns:
+            The DOT source as a string
+        """
+        lines = [
+            "digraph flowchart {",
+            f'  graph [bgcolor="{self.colors["background"]}", rankdir=TB, overlap=false];',
+            f'  node [style=filled, fontcolor="{self.colors["text"]}", fontsize=10];',
+            f'  edge [color="{self.colors["arrow"]}", fontsize=9];'
+        ]
+
+        for node in flowchart["nodes"]:
+            node_type = node["type"]
+            shape = SimpleFlowchartGenerator.SHAPES.get(node_type, "rectangle")
+            color = node.get("color") or self.colors.get(node_type, self.colors["process"])
+            lines.append(
+                f'  n{node["id"]} [label="{self._escape(node["text"])}", '
+                f'shape={self.DOT_SHAPES[shape]}, fillcolor="{color}"];'
+            )
+
+        for edge in flowchart["edges"]:
+            attributes = []
+            if edge.get("text"):
+                attributes.append(f'label="{self._escape(edge["text"])}"')
+            if edge.get("width"):
+                attributes.append(f'penwidth={edge["width"]}')
+            if edge.get("color"):
+                attributes.append(f'color="{edge["color"]}"')
+            attributes = f' [{", ".join(attributes)}]' if attributes else ""
+            lines.append(f'  n{edge["from"]} -> n{edge["to"]}{attributes};')
+
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def generate_from_structure(self, flowchart: Dict[str, Any], output_path: str,
+                                output_format: str = "png", timeout: Optional[float] = None) -> None:
+        """
+        Generate a flowchart from a predefined structure.
+
+        Args:
+            flowchart: The flowchart structure
+            output_path: Path to save the generated flowchart
+            output_format: Format of the output file (png, svg, pdf)
+            timeout: Seconds before the layout process is killed
+        """
+        self._run(self.to_dot(flowchart), self.select_engine(flowchart),
+                  ["-T" + output_format, "-o", output_path], timeout)
+
+    def render_to_bytes(self, flowchart: Dict[str, Any], output_format: str = "png",
+                        timeout: Optional[float] = None) -> bytes:
+        """
+        Render a flowchart and return the encoded output without touching the filesystem.
+
+        Args:
+            flowchart: The flowchart structure
+            output_format: Format of the output (png, svg, pdf)
+            timeout: Seconds before the layout process is killed
+
+        Returns:
+            The encoded image
+        """
+        return self._run(self.to_dot(flowchart), self.select_engine(flowchart), ["-T" + output_format], timeout)
+
+    def compute_layout(self, flowchart: Dict[str, Any], timeout: Optional[float] = None,
+                       engine: Optional[str] = None) -> Dict[Any, Tuple[float, float]]:
+        """
+        Lay out a flowchart with Graphviz and return normalized node positions.
+
+        The coordinates are scaled into the 0.05-0.95 range so they can be used
+        as "x"/"y" values by SimpleFlowchartGenerator.
+
+        Args:
+            flowchart: The flowchart structure
+            timeout: Seconds before the layout process is killed
+            engine: Layout engine to use, picked from the graph size by default
+
+        Returns:
+            Mapping of node id to an (x, y) position
+        """
+        output = self._run(self.to_dot(flowchart), engine or self.select_engine(flowchart), ["-Tplain"], timeout)
+
+        positions = {}
+        for line in output.decode("utf-8", "replace").splitlines():
+            parts = line.split()
+            if len(parts) > 3 and parts[0] == "node":
+                positions[parts[1]] = (float(parts[2]), float(parts[3]))
+
+        if not positions:
+            return {}
+
+        xs = [p[0] for p in positions.values()]
+        ys = [p[1] for p in positions.values()]
+        span_x = (max(xs) - min(xs)) or 1.0
+        span_y = (max(ys) - min(ys)) or 1.0
+
+        layout = {}
+        for node in flowchart["nodes"]:
+            x, y = positions.get(f'n{node["id"]}', (min(xs), min(ys)))
+            layout[node["id"]] = (
+                0.05 + 0.9 * (x - min(xs)) / span_x,
+                0.05 + 0.9 * (y - min(ys)) / span_y
+            )
+        return layout
+
+    def render_many(self, jobs: List[Tuple], max_workers: Optional[int] = None,
+                    timeout: Optional[float] = None) -> List[Optional[Exception]]:
+        """
+        Render several flowcharts concurrently, one Graphviz process per job.
+
+        Args:
+            jobs: List of (flowchart, output_path, output_format) tuples, optionally
+                  followed by a color scheme overriding this generator's colors
+            max_workers: Maximum number of concurrent Graphviz processes
+            timeout: Seconds before a single layout process is killed
+
+        Returns:
+            One entry per job: None on success, or the exception that was raised
+        """
+        def run_job(job):
+            flowchart, output_path, output_format = job[:3]
+            generator = GraphvizGenerator(job[3]) if len(job) > 3 else self
+            try:
+                generator.generate_from_structure(flowchart, output_path, output_format, timeout)
+                return None
+            except Exception as e:
+                return e
+
+        # The work happens in the child processes, so threads are enough to keep them all busy
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run_job, jobs))
+
+    def _run(self, dot_source: str, engine: str, extra_args: List[str], timeout: Optional[float]) -> bytes:
+        """
+        Run a Graphviz binary on DOT source.
+
+        Args:
+            dot_source: The DOT source to feed on stdin
+            engine: Name of the Graphviz binary
+            extra_args: Additional command line arguments
+            timeout: Seconds before the process is killed
+
+        Returns:
+            The process stdout
+
+        Raises:
+            RuntimeError: If the binary is missing, times out or fails
+        """
+        if not self.is_available(engine):
+            raise RuntimeError(f"Graphviz '{engine}' binary not found; see install.sh")
+
+        try:
+            result = subprocess.run(
+                [engine] + extra_args,
+                input=dot_source.encode("utf-8"),
+                capture_output=True,
+                timeout=timeout if timeout is not None else self.DEFAULT_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Graphviz '{engine}' layout timed out")
+
+        if result.returncode != 0:
+            message = result.stderr.decode("utf-8", "replace").strip()
+            raise RuntimeError(f"Graphviz '{engine}' failed: {message}")
+
+        return result.stdout
+
+    def _escape(self, text: str) -> str:
+        """
+        Escape text for use inside a quoted DOT string.
+
+        Args:
+            text: The text to escape
+
+        Returns:
+            The escaped text
+        """
+        return str(text).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
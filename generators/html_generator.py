@@ -0,0 +1,399 @@
+"""
+Interactive HTML generator for the Code to Flowchart tool.
+Writes one self-contained page that draws the flowchart on a canvas and loads function bodies on demand.
+
+The page embeds the outline (module-level nodes, with every function
+collapsed into a single node) and one compact JSON chunk per function.
+Chunks are stored as inert script blocks and only parsed when their
+function is expanded, and the canvas only draws what is in the viewport,
+so the page opens quickly even for modules with tens of thousands of nodes.
+"""
+
+import json
+import html
+from typing import Dict, List, Any, Optional
+
+from generators.simple_flowchart_generator import SimpleFlowchartGenerator
+from utils.graph_partition import spanning_forest
+
+
+class HtmlGenerator(SimpleFlowchartGenerator):
+    """Generator for self-contained interactive HTML flowcharts."""
+
+    def __init__(self, color_scheme: str = "standard"):
+        """
+        Initialize the HTML generator.
+
+        Args:
+            color_scheme: The color scheme to use (standard, pastel, monochrome, colorful)
+        """
+        super().__init__(color_scheme)
+
+    def generate_from_structure(self, flowchart: Dict[str, Any], output_path: str,
+                                clusters: Optional[Dict[Any, Any]] = None, title: str = "Flowchart") -> None:
+        """
+        Write a flowchart as an interactive HTML page.
+
+        Args:
+            flowchart: The flowchart structure
+            output_path: Path of the HTML file
+            clusters: Optional node id to function mapping (see utils.graph_partition.function_clusters);
+                      without it the whole chart is one outline
+            title: Page title
+        """
+        with open(output_path, "w", encoding="utf-8") as file:
+            file.write(self.render_html(flowchart, clusters, title))
+
+    def render_html(self, flowchart: Dict[str, Any], clusters: Optional[Dict[Any, Any]] = None,
+                    title: str = "Flowchart") -> str:
+        """
+        Build the HTML page for a flowchart.
+
+        Args:
+            flowchart: The flowchart structure
+            clusters: Optional node id to function mapping
+            title: Page title
+
+        Returns:
+            The HTML document
+        """
+        outline, chunks = self.build_chunks(flowchart, clusters or {})
+        data = {
+            "title": title,
+            "colors": self.colors,
+            "chunkSizes": [len(chunk["nodes"]) for chunk in chunks],
+            "legend": flowchart.get("legend"),
+            "outline": outline
+        }
+
+        scripts = [_json_script("outline", data)]
+        scripts.extend(_json_script(f"chunk-{index}", chunk) for index, chunk in enumerate(chunks))
+        return (_TEMPLATE
+                .replace("{{title}}", html.escape(title))
+                .replace("{{background}}", self.colors["background"])
+                .replace("{{data}}", "\n".join(scripts)))
+
+    def build_chunks(self, flowchart: Dict[str, Any], clusters: Dict[Any, Any]) -> tuple:
+        """
+        Split a flowchart into the outline and one chunk per function.
+
+        A function node lives in the chunk of the code around it and opens
+        its own chunk; edges from a function node to its body belong to the
+        function's chunk.
+
+        Nodes are stored as [id, type, text, first line, last line, chunk,
+        color, heat] arrays and edges as [from, to, text] arrays; chunk is
+        -1 for nodes that cannot be expanded, and color (an overlay fill)
+        and heat (the profile value shown in the tooltip) are null when not
+        set.
+
+        Args:
+            flowchart: The flowchart structure
+            clusters: Node id to function id mapping
+
+        Returns:
+            Tuple of (outline, list of chunks), each {"nodes": [...], "edges": [...]}
+        """
+        _, parent = spanning_forest(flowchart)
+        chunk_index: Dict[Any, int] = {}
+        for node in flowchart["nodes"]:
+            if clusters.get(node["id"]) == node["id"]:
+                chunk_index[node["id"]] = len(chunk_index)
+
+        outline = {"nodes": [], "edges": []}
+        chunks: List[Dict[str, list]] = [{"nodes": [], "edges": []} for _ in chunk_index]
+
+        def home(node_id):
+            cluster = clusters.get(node_id)
+            if cluster == node_id:
+                above = parent.get(node_id)
+                cluster = clusters.get(above) if above is not None else None
+            return outline if cluster not in chunk_index else chunks[chunk_index[cluster]]
+
+        for node in flowchart["nodes"]:
+            home(node["id"])["nodes"].append([
+                node["id"],
+                node.get("type", "process"),
+                node.get("text", ""),
+                node.get("lineno"),
+                node.get("end_lineno"),
+                chunk_index.get(node["id"], -1),
+                node.get("color"),
+                node.get("heat")
+            ])
+
+        for edge in flowchart["edges"]:
+            source = edge["from"]
+            target = chunks[chunk_index[source]] if source in chunk_index else home(source)
+            target["edges"].append([source, edge["to"], edge.get("text", "")])
+
+        return outline, chunks
+
+
+def _json_script(element_id: str, value: Any) -> str:
+    """Embed a value as an inert JSON script block; the browser does not parse it until asked."""
+    text = json.dumps(value, separators=(",", ":"), ensure_ascii=False).replace("</", "<\\/")
+    return f'<script type="application/json" id="{element_id}">{text}</script>'
+
+
+_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{{title}}</title>
+<style>
+  html, body { margin: 0; height: 100%; overflow: hidden; background: {{background}}; font-family: sans-serif; }
+  canvas { display: block; cursor: grab; }
+  #bar { position: fixed; top: 8px; left: 8px; display: flex; gap: 6px; font-size: 13px; }
+  #bar button { padding: 3px 8px; }
+  #legend { position: fixed; bottom: 8px; left: 8px; display: none; font-size: 12px; }
+  #legend div { width: 160px; height: 10px; margin: 2px 0; }
+  #tip { position: fixed; display: none; max-width: 420px; padding: 4px 8px; background: #263238; color: white;
+         font-size: 12px; border-radius: 3px; white-space: pre-wrap; pointer-events: none; }
+</style>
+</head>
+<body>
+<canvas id="chart"></canvas>
+<div id="bar"><button id="fit">Fit</button><button id="collapse">Collapse all</button><span id="status"></span></div>
+<div id="legend"><span></span><div></div><span></span></div>
+<div id="tip"></div>
+{{data}}
+<script>
+"use strict";
+const DATA = JSON.parse(document.getElementById("outline").textContent);
+const COLORS = DATA.colors;
+const W = 170, H = 56, COL = 200, ROW = 100, CELL = 1024;
+const chunks = {};
+const expanded = new Set();
+const canvas = document.getElementById("chart"), ctx = canvas.getContext("2d");
+const tip = document.getElementById("tip");
+let view = {x: 0, y: 0, scale: 1}, graph = null, dirty = true;
+
+function chunk(index) {
+  // Function bodies are parsed the first time they are opened
+  if (!(index in chunks)) chunks[index] = JSON.parse(document.getElementById("chunk-" + index).textContent);
+  return chunks[index];
+}
+
+function wrap(text) {
+  const lines = [];
+  for (const part of String(text).split("\\n")) {
+    let line = "";
+    for (const word of part.split(" ")) {
+      if (line && (line + " " + word).length > 24) { lines.push(line); line = word; }
+      else line = line ? line + " " + word : word;
+    }
+    lines.push(line);
+  }
+  if (lines.length > 2) { lines.length = 2; lines[1] = lines[1].slice(0, 23) + "\\u2026"; }
+  return lines.map(l => l.length > 26 ? l.slice(0, 25) + "\\u2026" : l);
+}
+
+function layout() {
+  // Collect the outline plus every expanded chunk
+  const nodes = [], byId = new Map(), edges = [];
+  const add = part => {
+    for (const [id, type, text, first, last, index, color, heat] of part.nodes) {
+      const node = {id, type, text, first, last, index, color, heat, lines: wrap(text), kids: [], x: 0, y: 0};
+      nodes.push(node); byId.set(id, node);
+    }
+    for (const edge of part.edges) edges.push(edge);
+    for (const [, , , , , index] of part.nodes) if (index >= 0 && expanded.has(index)) add(chunk(index));
+  };
+  add(DATA.outline);
+
+  const hasParent = new Set();
+  for (const [from, to] of edges) {
+    const source = byId.get(from), target = byId.get(to);
+    if (source && target && !hasParent.has(to)) { source.kids.push(target); hasParent.add(to); }
+  }
+
+  // Tidy tree: leaves left to right, parents centered above their children
+  let next = 0;
+  const seen = new Set();
+  for (const root of nodes.filter(node => !hasParent.has(node.id)).concat(nodes)) {
+    if (seen.has(root.id)) continue;
+    seen.add(root.id);
+    const stack = [[root, 0, 0]];
+    while (stack.length) {
+      const top = stack[stack.length - 1];
+      const [node, depth, child] = top;
+      if (child < node.kids.length) {
+        top[2]++;
+        const kid = node.kids[child];
+        if (!seen.has(kid.id)) { seen.add(kid.id); kid.tree = node; stack.push([kid, depth + 1, 0]); }
+        continue;
+      }
+      stack.pop();
+      const placed = node.kids.filter(kid => kid.tree === node);
+      node.x = placed.length ? (placed[0].x + placed[placed.length - 1].x) / 2 : (next++) * COL;
+      node.y = depth * ROW;
+    }
+  }
+
+  // Spatial index for culling and hit testing
+  const grid = new Map();
+  for (const node of nodes) {
+    const key = Math.floor(node.x / CELL) + "," + Math.floor(node.y / CELL);
+    if (!grid.has(key)) grid.set(key, []);
+    grid.get(key).push(node);
+  }
+  graph = {nodes, byId, edges, grid};
+  document.getElementById("status").textContent =
+    nodes.length + " nodes shown, " + expanded.size + " of " + DATA.chunkSizes.length + " functions open";
+  dirty = true;
+}
+
+function visibleNodes(x0, y0, x1, y1) {
+  const found = [];
+  for (let gx = Math.floor((x0 - W) / CELL); gx <= Math.floor((x1 + W) / CELL); gx++)
+    for (let gy = Math.floor((y0 - H) / CELL); gy <= Math.floor((y1 + H) / CELL); gy++)
+      for (const node of graph.grid.get(gx + "," + gy) || [])
+        if (node.x + W / 2 >= x0 && node.x - W / 2 <= x1 && node.y + H / 2 >= y0 && node.y - H / 2 <= y1)
+          found.push(node);
+  return found;
+}
+
+function shapePath(node) {
+  const x = node.x, y = node.y, w = W / 2, h = H / 2;
+  ctx.beginPath();
+  if (node.type === "start_end") ctx.ellipse(x, y, w, h, 0, 0, 2 * Math.PI);
+  else if (node.type === "decision") { ctx.moveTo(x, y - h - 8); ctx.lineTo(x + w, y); ctx.lineTo(x, y + h + 8); ctx.lineTo(x - w, y); }
+  else if (node.type === "input_output") { ctx.moveTo(x - w + 15, y - h); ctx.lineTo(x + w, y - h); ctx.lineTo(x + w - 15, y + h); ctx.lineTo(x - w, y + h); }
+  else ctx.rect(x - w, y - h, W, H);
+  ctx.closePath();
+}
+
+function draw() {
+  dirty = false;
+  const ratio = window.devicePixelRatio || 1;
+  ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+  ctx.fillStyle = COLORS.background;
+  ctx.fillRect(0, 0, canvas.width, canvas.height);
+  ctx.setTransform(ratio * view.scale, 0, 0, ratio * view.scale, ratio * view.x, ratio * view.y);
+
+  const x0 = -view.x / view.scale, y0 = -view.y / view.scale;
+  const x1 = x0 + innerWidth / view.scale, y1 = y0 + innerHeight / view.scale;
+
+  ctx.strokeStyle = COLORS.arrow;
+  ctx.lineWidth = 1.2;
+  ctx.beginPath();
+  for (const [from, to] of graph.edges) {
+    const a = graph.byId.get(from), b = graph.byId.get(to);
+    if (!a || !b) continue;
+    if (Math.max(a.x, b.x) < x0 || Math.min(a.x, b.x) > x1 || Math.max(a.y, b.y) < y0 || Math.min(a.y, b.y) > y1) continue;
+    ctx.moveTo(a.x, a.y + H / 2);
+    ctx.lineTo(b.x, b.y - H / 2);
+  }
+  ctx.stroke();
+
+  const showText = view.scale > 0.35;
+  ctx.font = "12px sans-serif";
+  ctx.textAlign = "center";
+  ctx.textBaseline = "middle";
+  for (const node of visibleNodes(x0, y0, x1, y1)) {
+    shapePath(node);
+    ctx.fillStyle = node.color || COLORS[node.type] || COLORS.process;
+    ctx.fill();
+    if (!showText) continue;
+    ctx.lineWidth = node.index >= 0 && !expanded.has(node.index) ? 3 : 1;
+    ctx.strokeStyle = "black";
+    ctx.stroke();
+    ctx.fillStyle = COLORS.text;
+    node.lines.forEach((line, i) => ctx.fillText(line, node.x, node.y + (i - (node.lines.length - 1) / 2) * 14));
+    if (node.index >= 0) {
+      ctx.fillText(expanded.has(node.index) ? "\\u2212" : "+" + DATA.chunkSizes[node.index], node.x + W / 2 - 16, node.y - H / 2 + 10);
+    }
+  }
+}
+
+function frame() { if (dirty) draw(); requestAnimationFrame(frame); }
+
+function resize() {
+  const ratio = window.devicePixelRatio || 1;
+  canvas.width = innerWidth * ratio; canvas.height = innerHeight * ratio;
+  canvas.style.width = innerWidth + "px"; canvas.style.height = innerHeight + "px";
+  dirty = true;
+}
+
+function fit() {
+  let x0 = Infinity, y0 = Infinity, x1 = -Infinity, y1 = -Infinity;
+  for (const node of graph.nodes) {
+    x0 = Math.min(x0, node.x - W); y0 = Math.min(y0, node.y - H); x1 = Math.max(x1, node.x + W); y1 = Math.max(y1, node.y + H);
+  }
+  if (x0 === Infinity) return;
+  view.scale = Math.min(1, innerWidth / (x1 - x0), innerHeight / (y1 - y0));
+  view.x = (innerWidth - (x1 + x0) * view.scale) / 2;
+  view.y = 40 - y0 * view.scale;
+  dirty = true;
+}
+
+function nodeAt(clientX, clientY) {
+  const x = (clientX - view.x) / view.scale, y = (clientY - view.y) / view.scale;
+  return visibleNodes(x, y, x, y)[0];
+}
+
+let drag = null;
+canvas.addEventListener("mousedown", e => { drag = {x: e.clientX, y: e.clientY, moved: false}; });
+addEventListener("mouseup", e => {
+  if (drag && !drag.moved) {
+    const node = nodeAt(e.clientX, e.clientY);
+    if (node && node.index >= 0) {
+      // Keep the clicked node where it is on screen
+      const screenX = node.x * view.scale + view.x, screenY = node.y * view.scale + view.y;
+      if (expanded.has(node.index)) expanded.delete(node.index); else expanded.add(node.index);
+      layout();
+      const moved = graph.byId.get(node.id);
+      view.x = screenX - moved.x * view.scale; view.y = screenY - moved.y * view.scale;
+    }
+  }
+  drag = null;
+});
+addEventListener("mousemove", e => {
+  if (drag) {
+    if (Math.abs(e.clientX - drag.x) + Math.abs(e.clientY - drag.y) > 2) drag.moved = true;
+    view.x += e.clientX - drag.x; view.y += e.clientY - drag.y;
+    drag.x = e.clientX; drag.y = e.clientY; dirty = true;
+    tip.style.display = "none";
+    return;
+  }
+  const node = nodeAt(e.clientX, e.clientY);
+  if (!node) { tip.style.display = "none"; return; }
+  let text = node.text;
+  if (node.first != null) text += "\\nLines " + node.first + (node.last != null && node.last !== node.first ? "\\u2013" + node.last : "");
+  if (node.heat != null && DATA.legend) text += "\\n" + DATA.legend.label + ": " + formatHeat(node.heat);
+  tip.textContent = text;
+  tip.style.left = e.clientX + 14 + "px"; tip.style.top = e.clientY + 14 + "px"; tip.style.display = "block";
+});
+canvas.addEventListener("wheel", e => {
+  e.preventDefault();
+  const factor = Math.exp(-e.deltaY * 0.0015);
+  view.x = e.clientX - (e.clientX - view.x) * factor;
+  view.y = e.clientY - (e.clientY - view.y) * factor;
+  view.scale *= factor; dirty = true;
+}, {passive: false});
+document.getElementById("fit").onclick = fit;
+document.getElementById("collapse").onclick = () => { expanded.clear(); layout(); fit(); };
+addEventListener("resize", resize);
+
+function formatHeat(value) { return Number(value.toPrecision(3)).toString(); }
+
+if (DATA.legend) {
+  // Heat legend: label, gradient from the sampled colormap, and the range
+  const legend = document.getElementById("legend");
+  const [label, bar, range] = legend.children;
+  label.textContent = DATA.legend.label;
+  bar.style.background = "linear-gradient(to right, " + DATA.legend.stops.join(", ") + ")";
+  range.textContent = formatHeat(DATA.legend.min) + " \\u2013 " + formatHeat(DATA.legend.max) + (DATA.legend.log ? " (log)" : "");
+  legend.style.color = COLORS.text;
+  legend.style.display = "block";
+}
+
+resize();
+layout();
+fit();
+frame();
+</script>
+</body>
+</html>
+"""
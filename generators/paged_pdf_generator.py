@@ -0,0 +1,191 @@
+"""
+Multi-page PDF generator for the Code to Flowchart tool.
+Splits large flowcharts over several pages joined by off-page connectors.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from generators.figure_pool import new_figure
+from generators.simple_flowchart_generator import SimpleFlowchartGenerator
+from utils.graph_partition import partition_graph
+
+
+class PagedPdfGenerator(SimpleFlowchartGenerator):
+    """Generator for paginated PDF flowcharts."""
+
+    # Nodes per page, not counting off-page connectors
+    PAGE_NODES = 40
+
+    # Horizontal band for the page's own nodes; connectors go to the right of it
+    NODE_AREA = (0.1, 0.78)
+    CONNECTOR_X = 0.92
+
+    # Vertical range for connector centers, and the gap between connectors of one node
+    CONNECTOR_AREA = (0.05, 0.95)
+    CONNECTOR_STEP = 0.07
+
+    def __init__(self, color_scheme: str = "standard", page_nodes: int = PAGE_NODES,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize the paged PDF generator.
+
+        Args:
+            color_scheme: The color scheme to use (standard, pastel, monochrome, colorful)
+            page_nodes: Maximum number of nodes per page
+            max_workers: Number of threads drawing pages (default: CPU count)
+        """
+        super().__init__(color_scheme)
+        self.color_scheme = color_scheme
+        self.page_nodes = page_nodes
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def generate_from_structure(self, flowchart: Dict[str, Any], output_path: str,
+                                clusters: Optional[Dict[Any, Any]] = None) -> int:
+        """
+        Write a flowchart as a multi-page PDF.
+
+        Pages are drawn concurrently, a few pages ahead of the writer, and
+        appended to the PDF in order, so only a bounded number of figures are
+        alive at once.
+
+        Args:
+            flowchart: The flowchart structure, with "x"/"y" on every node
+            output_path: Path of the PDF file
+            clusters: Optional node id to function mapping (see utils.graph_partition.function_clusters)
+                      used to keep functions on one page
+
+        Returns:
+            The number of pages written
+        """
+        pages = self.build_pages(flowchart, clusters)
+
+        window = 2 * self.max_workers
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, PdfPages(output_path) as pdf:
+            pending = deque()
+            for number, page in enumerate(pages, 1):
+                pending.append(executor.submit(self._draw_page, page, number, len(pages)))
+                if len(pending) >= window:
+                    self._write_page(pdf, pending.popleft().result())
+            while pending:
+                self._write_page(pdf, pending.popleft().result())
+
+        return len(pages)
+
+    def build_pages(self, flowchart: Dict[str, Any],
+                    clusters: Optional[Dict[Any, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Partition a flowchart into per-page flowcharts with off-page connectors.
+
+        Every edge between pages becomes an edge to a "To p. N" connector on
+        the source page and an edge from a "From p. N" connector on the target
+        page.
+
+        Args:
+            flowchart: The flowchart structure
+            clusters: Optional node id to function mapping
+
+        Returns:
+            One flowchart structure per page
+        """
+        node_ids = partition_graph(flowchart, self.page_nodes, clusters)
+        nodes = {node["id"]: node for node in flowchart["nodes"]}
+        page_of = {node_id: index for index, page in enumerate(node_ids) for node_id in page}
+
+        pages = [{"nodes": [dict(nodes[node_id]) for node_id in page], "edges": []} for page in node_ids]
+        for page in pages:
+            self._place_page_nodes(page["nodes"])
+        placed = {node["id"]: node for page in pages for node in page["nodes"]}
+
+        connectors_at: Dict[Any, int] = {}
+        for edge in flowchart["edges"]:
+            if edge["from"] not in page_of or edge["to"] not in page_of:
+                continue
+            source_page, target_page = page_of[edge["from"]], page_of[edge["to"]]
+            if source_page == target_page:
+                pages[source_page]["edges"].append(edge)
+                continue
+
+            outgoing = self._connector(placed[edge["from"]], f"To p. {target_page + 1}", connectors_at)
+            pages[source_page]["nodes"].append(outgoing)
+            pages[source_page]["edges"].append({"from": edge["from"], "to": outgoing["id"], "text": edge["text"],
+                                                "width": edge.get("width", 1.0), "color": edge.get("color")})
+
+            incoming = self._connector(placed[edge["to"]], f"From p. {source_page + 1}", connectors_at)
+            pages[target_page]["nodes"].append(incoming)
+            pages[target_page]["edges"].append({"from": incoming["id"], "to": edge["to"], "text": ""})
+
+        return pages
+
+    def _place_page_nodes(self, nodes: List[Dict[str, Any]]) -> None:
+        """
+        Spread a page's nodes over the page, keeping their relative order.
+
+        Distinct x and y positions are replaced by their rank, so nodes that
+        were far apart in the whole chart close up on their page.
+
+        Args:
+            nodes: The page's nodes; "x"/"y" are replaced in place
+        """
+        left, right = self.NODE_AREA
+        for axis, low, high in (("x", left, right), ("y", 0.08, 0.92)):
+            values = sorted({node[axis] for node in nodes})
+            rank = {value: index for index, value in enumerate(values)}
+            step = (high - low) / max(1, len(values) - 1)
+            for node in nodes:
+                node[axis] = low + rank[node[axis]] * step if len(values) > 1 else (low + high) / 2
+
+    def _connector(self, node: Dict[str, Any], text: str, connectors_at: Dict[Any, int]) -> Dict[str, Any]:
+        """
+        Create an off-page connector in the right margin, level with the node it belongs to.
+
+        Further connectors of the same node stack downwards, and continue
+        above the node once there is no room left below it on the page.
+        """
+        index = connectors_at.get(node["id"], 0)
+        connectors_at[node["id"]] = index + 1
+        bottom, top = self.CONNECTOR_AREA
+        room_below = max(0, int((node["y"] - bottom) / self.CONNECTOR_STEP))
+        if index <= room_below:
+            y = node["y"] - self.CONNECTOR_STEP * index
+        else:
+            y = node["y"] + self.CONNECTOR_STEP * (index - room_below)
+        return {
+            "id": ("connector", node["id"], index),
+            "type": "connector",
+            "text": text,
+            "x": self.CONNECTOR_X,
+            "y": min(max(y, bottom), top)
+        }
+
+    def _draw_page(self, page: Dict[str, Any], number: int, page_count: int) -> Figure:
+        """
+        Draw one page on its own figure. Runs in a worker thread.
+
+        Args:
+            page: The page's flowchart structure
+            number: Page number, starting at 1
+            page_count: Total number of pages
+
+        Returns:
+            The drawn figure
+        """
+        generator = SimpleFlowchartGenerator(self.color_scheme)
+        generator.node_count = len(page["nodes"])
+        generator.is_complex = generator._determine_complexity(page)
+
+        fig = new_figure((10, 12))
+        generator._draw_flowchart(page, fig)
+        fig.text(0.5, 0.01, f"Page {number} of {page_count}", ha="center", va="bottom",
+                 fontsize=9, color=generator.colors.get("arrow", "black"))
+        return fig
+
+    def _write_page(self, pdf: PdfPages, fig: Figure) -> None:
+        """Append a drawn page to the PDF and release the figure."""
+        pdf.savefig(fig)
+        fig.clear()
@@ -3,21 +3,44 @@ Simple Flowchart generator for the Code to Flowchart tool.
 Creates traditional flowcharts with standard shapes and connections.
 """
 
+import io
 import os
-import matplotlib.pyplot as plt
+from contextlib import contextmanager
 import matplotlib.patches as patches
 import numpy as np
-from typing import Dict, List, Any, Tuple, Optional
+from matplotlib.axes import Axes
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import LogNorm, Normalize
+from matplotlib.figure import Figure
+from typing import Dict, List, Any, Tuple, Optional, Iterator, BinaryIO, Union
+
+from generators.figure_pool import FigurePool, new_figure
+from utils.graph_stats import compute_graph_stats, is_complex_graph
+from utils.profiling import NULL_PROFILER
+from utils.text_layout import get_text_measurer
 
 class SimpleFlowchartGenerator:
     """Generator for creating simple, traditional flowcharts."""
 
+    # Share of a shape's width that a label may use
+    TEXT_WIDTH_FRACTION = {
+        "ellipse": 0.7,
+        "rectangle": 0.9,
+        "diamond": 0.5,
+        "parallelogram": 0.75,
+        "offpage": 0.5
+    }
+
+    # Labels longer than this are ellipsized
+    MAX_LABEL_LINES = 3
+
     # Shape definitions
     SHAPES = {
         "start_end": "ellipse",
         "process": "rectangle",
         "decision": "diamond",
-        "input_output": "parallelogram"
+        "input_output": "parallelogram",
+        "connector": "offpage"
     }
 
     # Color schemes
@@ -64,16 +87,28 @@ class SimpleFlowchartGenerator:
         }
     }
 
-    def __init__(self, color_scheme: str = "standard"):
+    def __init__(self, color_scheme: str = "standard", figure_pool: Optional[FigurePool] = None,
+                 profiler: Any = NULL_PROFILER):
         """
         Initialize the flowchart generator.
 
+        The generator never touches the global pyplot state, so separate
+        instances can render concurrently from threads. An instance itself
+        holds per-render state and should only be used by one thread at a time.
+
         Args:
             color_scheme: The color scheme to use (standard, pastel, monochrome, colorful)
+            figure_pool: Optional shared pool of reusable figures
+            profiler: Profiler recording the "draw" and "save" phases
         """
+        self.figure_pool = figure_pool
+        self.profiler = profiler
         self.colors = self.COLOR_SCHEMES.get(color_scheme, self.COLOR_SCHEMES["standard"])
         self.is_complex = False
         self.node_count = 0
+        self.stats = None
+        self._points_per_unit = (720.0, 864.0)
+        self._themed_artists = {"nodes": [], "texts": [], "arrows": [], "legends": []}
 
     def generate_from_code(self, code: str, output_path: str, output_format: str = "png") -> None:
         """
@@ -105,6 +140,54 @@ class SimpleFlowchartGenerator:
 
         self._generate_flowchart(flowchart, output_path, output_format)
 
+    def render_to_buffer(self, flowchart: Dict[str, Any], buffer: BinaryIO, output_format: str = "png") -> None:
+        """
+        Render a flowchart into a caller-supplied binary buffer.
+
+        Nothing is written to the filesystem.
+
+        Args:
+            flowchart: The flowchart structure
+            buffer: Writable binary file object
+            output_format: Format of the output (png, svg, pdf)
+        """
+        self.generate_variants(flowchart, [(None, buffer, output_format)])
+
+    def render_to_bytes(self, flowchart: Dict[str, Any], output_format: str = "png") -> bytes:
+        """
+        Render a flowchart and return the encoded output.
+
+        Args:
+            flowchart: The flowchart structure
+            output_format: Format of the output (png, svg, pdf)
+
+        Returns:
+            The encoded image
+        """
+        buffer = io.BytesIO()
+        self.render_to_buffer(flowchart, buffer, output_format)
+        return buffer.getvalue()
+
+    def render_variants_to_bytes(self, flowchart: Dict[str, Any],
+                                 variants: List[Tuple[str, str]]) -> Dict[Tuple[str, str], memoryview]:
+        """
+        Render several themed variants of a flowchart in memory from a single drawing.
+
+        Args:
+            flowchart: The flowchart structure
+            variants: List of (color_scheme, output_format) tuples
+
+        Returns:
+            Mapping of (color_scheme, output_format) to a view of the encoded image
+        """
+        buffers = {variant: io.BytesIO() for variant in variants}
+        self.generate_variants(
+            flowchart,
+            [(color_scheme, buffers[(color_scheme, output_format)], output_format)
+             for color_scheme, output_format in buffers]
+        )
+        return {variant: buffer.getbuffer() for variant, buffer in buffers.items()}
+
     def _parse_code(self, code: str) -> Dict[str, Any]:
         """
         Parse code into a flowchart structure.
@@ -140,6 +223,44 @@ class SimpleFlowchartGenerator:
             ]
         }
 
+    def generate_variants(self, flowchart: Dict[str, Any],
+                          outputs: List[Tuple[Optional[str], Union[str, BinaryIO], str]]) -> None:
+        """
+        Generate several themed variants of one flowchart from a single drawing.
+
+        The figure is drawn once; for each color scheme the existing artists
+        are recolored in place and every requested format is saved from the
+        same canvas.
+
+        Args:
+            flowchart: The flowchart structure
+            outputs: List of (color_scheme, target, output_format) tuples, where the
+                     target is a file path or a writable binary buffer and a color
+                     scheme of None keeps the generator's own colors
+        """
+        self.node_count = len(flowchart.get("nodes", []))
+        self.is_complex = self._determine_complexity(flowchart)
+
+        schemes = []
+        for color_scheme, _, _ in outputs:
+            if color_scheme not in schemes:
+                schemes.append(color_scheme)
+
+        with self._figure() as fig:
+            with self.profiler.phase("draw"):
+                self._draw_flowchart(flowchart, fig)
+
+                # Recoloring does not move anything, so the tight bounding box is measured once
+                bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(0.1)
+
+            for color_scheme in schemes:
+                if color_scheme is not None:
+                    self._apply_color_scheme(fig, color_scheme)
+                for scheme, target, output_format in outputs:
+                    if scheme == color_scheme:
+                        with self.profiler.phase("save"):
+                            self._save_figure(fig, target, output_format, bbox)
+
     def _generate_flowchart(self, flowchart: Dict[str, Any], output_path: str, output_format: str = "png") -> None:
         """
         Generate a flowchart visualization.
@@ -149,10 +270,66 @@ class SimpleFlowchartGenerator:
             output_path: Path to save the generated flowchart
             output_format: Format of the output file (png, svg, pdf)
         """
-        fig, ax = plt.subplots(figsize=(10, 12), facecolor=self.colors["background"])
+        with self._figure() as fig:
+            with self.profiler.phase("draw"):
+                self._draw_flowchart(flowchart, fig)
+            with self.profiler.phase("save"):
+                self._save_figure(fig, output_path, output_format)
+
+    @contextmanager
+    def _figure(self) -> Iterator[Figure]:
+        """
+        Provide a blank figure for one render and release it afterwards.
+
+        The figure comes from the figure pool when one is configured. Either
+        way it is cleared when the render finishes or fails.
+
+        Yields:
+            A blank figure with an Agg canvas
+        """
+        try:
+            if self.figure_pool is not None:
+                with self.figure_pool.figure() as fig:
+                    yield fig
+            else:
+                fig = new_figure((10, 12))
+                try:
+                    yield fig
+                finally:
+                    fig.clear()
+        finally:
+            self._themed_artists = {"nodes": [], "texts": [], "arrows": [], "legends": []}
+
+    def _draw_flowchart(self, flowchart: Dict[str, Any], fig: Figure) -> Figure:
+        """
+        Draw a flowchart onto a blank figure.
+
+        The themed artists are remembered so they can be recolored later.
+
+        Args:
+            flowchart: The flowchart structure
+            fig: The blank figure to draw on
+
+        Returns:
+            The drawn figure
+        """
+        fig.set_facecolor(self.colors["background"])
+        ax = fig.add_subplot()
 
         ax.grid(False)
 
+        self._themed_artists = {"nodes": [], "texts": [], "arrows": [], "legends": []}
+
+        if flowchart.get("legend"):
+            self._draw_legend(fig, ax, flowchart["legend"])
+
+        # Size of one axes unit in points, used to fit labels into shapes
+        position = ax.get_position()
+        self._points_per_unit = (
+            fig.get_figwidth() * 72 * position.width,
+            fig.get_figheight() * 72 * position.height
+        )
+
         # Draw nodes
         node_patches = {}
         node_centers = {}
@@ -165,13 +342,17 @@ class SimpleFlowchartGenerator:
 
             node_centers[node_id] = (x, y)
 
-            shape = self._create_shape(node_type, x, y)
+            node_text, line_count = self._layout_label(node_type, node_text)
+            shape = self._create_shape(node_type, x, y, line_count)
             node_shapes[node_id] = shape
 
-            color = self.colors.get(node_type, self.colors["process"])
+            # A "color" override (e.g. a profile heat color) survives theme changes
+            color = node.get("color") or self.colors.get(node_type, self.colors["process"])
 
             patch = self._add_shape_to_plot(ax, shape, color)
             node_patches[node_id] = (patch, x, y, node_type)
+            if not node.get("color"):
+                self._themed_artists["nodes"].append((patch, node_type))
 
             self._add_text_to_shape(ax, node_type, x, y, node_text)
 
@@ -186,27 +367,119 @@ class SimpleFlowchartGenerator:
             target_shape = node_shapes[to_id]
 
             # Draw arrow
-            self._draw_arrow(ax, source, target, source_shape, target_shape, edge_text)
+            self._draw_arrow(ax, source, target, source_shape, target_shape, edge_text,
+                             edge.get("width", 1.0), edge.get("color"))
 
         ax.set_xlim(0, 1)
         ax.set_ylim(0, 1)
         ax.axis('off')
 
-        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        fig.tight_layout()
+
+        return fig
+
+    def _draw_legend(self, fig: Figure, ax: Axes, legend: Dict[str, Any]) -> None:
+        """
+        Draw a color bar explaining node color overrides.
+
+        Args:
+            fig: The figure being drawn
+            ax: The flowchart axes; the color bar takes space from its right side
+            legend: Dictionary with "label", "colormap", "min", "max" and "log",
+                    as produced by utils.profile_overlay.apply_heat_overlay
+        """
+        norm_type = LogNorm if legend.get("log") else Normalize
+        mappable = ScalarMappable(norm=norm_type(vmin=legend["min"], vmax=legend["max"]),
+                                  cmap=legend["colormap"])
+        colorbar = fig.colorbar(mappable, ax=ax, fraction=0.03, pad=0.02, shrink=0.5)
+        colorbar.set_label(legend["label"], color=self.colors.get("text", "black"))
+        colorbar.ax.tick_params(colors=self.colors.get("text", "black"), labelsize=8)
+        self._themed_artists["texts"].append(colorbar.ax.yaxis.label)
+        self._themed_artists["legends"].append(colorbar.ax)
+
+    def _apply_color_scheme(self, fig: Figure, color_scheme: str) -> None:
+        """
+        Recolor an already drawn figure with another color scheme.
+
+        Args:
+            fig: Figure returned by _draw_flowchart
+            color_scheme: The color scheme to apply
+        """
+        self.colors = self.COLOR_SCHEMES.get(color_scheme, self.COLOR_SCHEMES["standard"])
+
+        fig.set_facecolor(self.colors["background"])
+        for patch, node_type in self._themed_artists["nodes"]:
+            patch.set_facecolor(self.colors.get(node_type, self.colors["process"]))
+        for text in self._themed_artists["texts"]:
+            text.set_color(self.colors.get("text", "black"))
+        for artist in self._themed_artists["arrows"]:
+            artist.set_color(self.colors.get("arrow", "black"))
+        for legend_ax in self._themed_artists["legends"]:
+            legend_ax.tick_params(colors=self.colors.get("text", "black"))
+
+    def _save_figure(self, fig: Figure, target: Union[str, BinaryIO], output_format: str = "png",
+                     bbox_inches: Any = 'tight') -> None:
+        """
+        Save a drawn figure to a file or a binary buffer.
 
-        # Save the plot
-        plt.tight_layout()
+        Args:
+            fig: Figure returned by _draw_flowchart
+            target: Path to save the generated flowchart, or a writable binary buffer
+            output_format: Format of the output (png, svg, pdf)
+            bbox_inches: Bounding box to save, 'tight' to measure it while saving
+        """
+        if isinstance(target, str):
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            with open(target, "wb") as output_file:
+                self._save_figure(fig, output_file, output_format, bbox_inches)
+            return
 
         if output_format == "svg":
-            plt.savefig(output_path, format='svg', bbox_inches='tight', dpi=300)
+            fig.savefig(target, format='svg', bbox_inches=bbox_inches, dpi=300)
         elif output_format == "pdf":
-            plt.savefig(output_path, format='pdf', bbox_inches='tight', dpi=300)
+            fig.savefig(target, format='pdf', bbox_inches=bbox_inches, dpi=300)
         else:
-            plt.savefig(output_path, format='png', bbox_inches='tight', dpi=300)
+            fig.savefig(target, format='png', bbox_inches=bbox_inches, dpi=300)
 
-        plt.close()
+    def _base_shape_size(self) -> Tuple[float, float, float]:
+        """
+        Get the default shape dimensions for the current complexity.
 
-    def _create_shape(self, shape_type: str, x: float, y: float) -> Dict[str, Any]:
+        Returns:
+            Tuple of (width, height, diamond_size) in axes units
+        """
+        if self.is_complex:
+            return 0.12, 0.06, 0.06
+        # Normal sizes for simple flowcharts
+        return 0.16, 0.08, 0.08
+
+    def _label_font_size(self) -> int:
+        """Get the label font size for the current complexity."""
+        return 8 if self.is_complex else 10
+
+    def _layout_label(self, shape_type: str, text: str) -> Tuple[str, int]:
+        """
+        Pre-wrap a label so that it fits inside its shape.
+
+        Widths come from a cached glyph table, so matplotlib does not have to
+        re-measure and re-wrap the text on every draw.
+
+        Args:
+            shape_type: Type of shape the label goes into
+            text: The label text
+
+        Returns:
+            Tuple of (wrapped text, number of lines)
+        """
+        width, _, diamond_size = self._base_shape_size()
+        shape = self.SHAPES.get(shape_type, "rectangle")
+        shape_width = 2 * diamond_size if shape == "diamond" else width
+        max_width = shape_width * self.TEXT_WIDTH_FRACTION[shape] * self._points_per_unit[0]
+
+        lines = get_text_measurer().wrap(text, max_width, self._label_font_size(), self.MAX_LABEL_LINES)
+        return "\n".join(lines), len(lines)
+
+    def _create_shape(self, shape_type: str, x: float, y: float, lines: int = 1) -> Dict[str, Any]:
         """
         Create a shape definition based on the shape type.
 
@@ -214,20 +487,18 @@ class SimpleFlowchartGenerator:
             shape_type: Type of shape to create
             x: X-coordinate of the shape center
             y: Y-coordinate of the shape center
+            lines: Number of label lines; the shape grows to fit them
 
         Returns:
             Dictionary with shape properties
         """
         # Adjust dimensions based on complexity
-        if self.is_complex:
-            width = 0.12
-            height = 0.06
-            diamond_size = 0.06
-        else:
-            # Normal sizes for simple flowcharts
-            width = 0.16
-            height = 0.08
-            diamond_size = 0.08
+        width, height, diamond_size = self._base_shape_size()
+
+        if lines > 1:
+            text_height = lines * self._label_font_size() * 1.3 / self._points_per_unit[1]
+            height = max(height, text_height + 0.02)
+            diamond_size = max(diamond_size, text_height)
 
         if shape_type == "start_end":
             return {
@@ -263,6 +534,15 @@ class SimpleFlowchartGenerator:
                 "height": height,
                 "offset": width/6
             }
+        elif shape_type == "connector":
+            # Off-page connector, narrower than a process box
+            return {
+                "type": "offpage",
+                "x": x - width/3,
+                "y": y - height/2,
+                "width": 2 * width/3,
+                "height": height
+            }
         else:
             # Default to rectangle
             return {
@@ -273,7 +553,7 @@ class SimpleFlowchartGenerator:
                 "height": height
             }
 
-    def _add_shape_to_plot(self, ax: plt.Axes, shape: Dict[str, Any], color: str) -> patches.Patch:
+    def _add_shape_to_plot(self, ax: Axes, shape: Dict[str, Any], color: str) -> patches.Patch:
         """
         Add a shape to the plot.
 
@@ -354,6 +634,28 @@ class SimpleFlowchartGenerator:
             ax.add_patch(patch)
             return patch
 
+        elif shape["type"] == "offpage":
+            x, y = shape["x"], shape["y"]
+            width, height = shape["width"], shape["height"]
+
+            offpage_points = [
+                [x, y + height],  # top left
+                [x + width, y + height],  # top right
+                [x + width, y + height * 0.35],  # right shoulder
+                [x + width/2, y],  # bottom point
+                [x, y + height * 0.35]  # left shoulder
+            ]
+
+            patch = patches.Polygon(
+                offpage_points,
+                facecolor=color,
+                edgecolor='black',
+                linewidth=1.5,
+                alpha=0.9
+            )
+            ax.add_patch(patch)
+            return patch
+
         else:
             patch = patches.Rectangle(
                 (shape["x"], shape["y"]),
@@ -367,7 +669,7 @@ class SimpleFlowchartGenerator:
             ax.add_patch(patch)
             return patch
 
-    def _add_text_to_shape(self, ax: plt.Axes, shape_type: str, x: float, y: float, text: str) -> None:
+    def _add_text_to_shape(self, ax: Axes, shape_type: str, x: float, y: float, text: str) -> None:
         """
         Add text to a shape.
 
@@ -376,16 +678,17 @@ class SimpleFlowchartGenerator:
             shape_type: Type of shape
             x: X-coordinate of the shape center
             y: Y-coordinate of the shape center
-            text: Text to add
+            text: Text to add, already wrapped to fit the shape
         """
-        font_size = 8 if self.is_complex else 10
+        font_size = self._label_font_size()
 
         if shape_type == "decision":
-            ax.text(x, y, text, ha='center', va='center', wrap=True,
-                    fontsize=font_size, color=self.colors.get("text", "black"))
+            artist = ax.text(x, y, text, ha='center', va='center',
+                             fontsize=font_size, color=self.colors.get("text", "black"))
         else:
-            ax.text(x, y, text, ha='center', va='center', wrap=True,
-                    fontsize=font_size, color=self.colors.get("text", "black"))
+            artist = ax.text(x, y, text, ha='center', va='center',
+                             fontsize=font_size, color=self.colors.get("text", "black"))
+        self._themed_artists["texts"].append(artist)
 
     def _get_connection_points(self, source_type: str, target_type: str,
                               source_x: float, source_y: float,
@@ -513,10 +816,10 @@ class SimpleFlowchartGenerator:
             else:
                 return (source_x, source_y), (target_x, target_y)
 
-    def _draw_arrow(self, ax: plt.Axes, source: Tuple[patches.Patch, float, float, str],
+    def _draw_arrow(self, ax: Axes, source: Tuple[patches.Patch, float, float, str],
                    target: Tuple[patches.Patch, float, float, str],
                    source_shape: Dict[str, Any], target_shape: Dict[str, Any],
-                   text: str) -> None:
+                   text: str, width: float = 1.0, color: Optional[str] = None) -> None:
         """
         Draw an arrow between two shapes.
 
@@ -527,6 +830,8 @@ class SimpleFlowchartGenerator:
             source_shape: Source shape definition
             target_shape: Target shape definition
             text: Text to add to the arrow
+            width: Line width multiplier, e.g. for execution counts
+            color: Color override that survives theme changes, e.g. for uncovered edges
         """
         source_patch, source_x, source_y, source_type = source
         target_patch, target_x, target_y, target_type = target
@@ -535,21 +840,25 @@ class SimpleFlowchartGenerator:
             source_type, target_type, source_x, source_y, target_x, target_y
         )
 
-        arrow_color = self.colors.get("arrow", "black")
+        arrow_color = color or self.colors.get("arrow", "black")
+        linewidth = 1.5 * width
+        first_line, first_text = len(ax.lines), len(ax.texts)
+        # Edge label drawn in the arrow color, recolored with the arrow
+        arrow_label = None
 
         if source_x > 0.6 and target_x == 0.5 and source_y < target_y:
             ax.plot(
                 [start_point[0], start_point[0]],
                 [start_point[1], start_point[1] - 0.05],
                 color=arrow_color,
-                linewidth=1.5
+                linewidth=linewidth
             )
 
             ax.plot(
                 [start_point[0], target_x],
                 [start_point[1] - 0.05, start_point[1] - 0.05],
                 color=arrow_color,
-                linewidth=1.5
+                linewidth=linewidth
             )
 
             ax.annotate(
@@ -559,7 +868,7 @@ class SimpleFlowchartGenerator:
                 arrowprops=dict(
                     arrowstyle="->",
                     color=arrow_color,
-                    linewidth=1.5,
+                    linewidth=linewidth,
                     connectionstyle="arc3,rad=0"
                 )
             )
@@ -573,7 +882,7 @@ class SimpleFlowchartGenerator:
                     arrowprops=dict(
                         arrowstyle="->",
                         color=arrow_color,
-                        linewidth=1.5,
+                        linewidth=linewidth,
                         connectionstyle="arc3,rad=0"
                     )
                 )
@@ -601,7 +910,7 @@ class SimpleFlowchartGenerator:
                     arrowprops=dict(
                         arrowstyle="->",
                         color=arrow_color,
-                        linewidth=1.5,
+                        linewidth=linewidth,
                         connectionstyle="arc3,rad=0"
                     )
                 )
@@ -630,14 +939,40 @@ class SimpleFlowchartGenerator:
                 arrowprops=dict(
                     arrowstyle="->",
                     color=arrow_color,
-                    linewidth=1.5,
+                    linewidth=linewidth,
                     connectionstyle="arc3,rad=0"
                 )
             )
 
+            if text:
+                arrow_label = ax.text(
+                    (start_point[0] + end_point[0]) / 2,
+                    (start_point[1] + end_point[1]) / 2,
+                    text,
+                    horizontalalignment='center',
+                    verticalalignment='center',
+                    fontsize=8,
+                    color=arrow_color,
+                    bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=1)
+                )
+
+        # Remember the arrow artists so they can be recolored
+        if color:
+            return
+        self._themed_artists["arrows"].extend(ax.lines[first_line:])
+        self._themed_artists["arrows"].extend(
+            text.arrow_patch for text in ax.texts[first_text:]
+            if getattr(text, "arrow_patch", None) is not None
+        )
+        if arrow_label is not None:
+            self._themed_artists["arrows"].append(arrow_label)
+
     def _determine_complexity(self, flowchart: Dict[str, Any]) -> bool:
         """
-        Determine if the flowchart is complex based on various factors.
+        Determine if the flowchart is complex based on its graph statistics.
+
+        A flowchart is complex if it has more than 10 nodes, more than 3
+        decisions or more than one real loop (back edge).
 
         Args:
             flowchart: The flowchart structure
@@ -645,28 +980,5 @@ class SimpleFlowchartGenerator:
         Returns:
             True if the flowchart is complex, False otherwise
         """
-        nodes = flowchart.get("nodes", [])
-        edges = flowchart.get("edges", [])
-
-        # Consider a flowchart complex if it has more than 10 nodes
-        if len(nodes) > 10:
-            return True
-
-        # Count decision nodes (more decisions = more complex)
-        decision_count = sum(1 for node in nodes if node.get("type") == "decision")
-        if decision_count > 3:
-            return True
-
-        # Count loops (edges that point to previous nodes)
-        node_ids = {node["id"]: i for i, node in enumerate(nodes)}
-        loops = 0
-        for edge in edges:
-            from_idx = node_ids.get(edge["from"], 0)
-            to_idx = node_ids.get(edge["to"], 0)
-            if to_idx < from_idx:  # Edge points backward
-                loops += 1
-
-        if loops > 1:
-            return True
-
-        return False
+        self.stats = compute_graph_stats(flowchart)
+        return is_complex_graph(self.stats)
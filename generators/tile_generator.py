@@ -0,0 +1,420 @@
+"""
+Tiled image pyramid generator for the Code to Flowchart tool.
+Renders very large flowcharts as XYZ-style zoom levels of fixed-size PNG tiles.
+
+The output directory looks like this:
+
+    tiles.json              tile size, zoom range and world size
+    {z}/{x}/{y}.png         one tile; z = 0 shows the whole chart
+
+Only the deepest zoom level is drawn from the graph. Every tile there is
+rendered on its own figure with just the nodes and edges that intersect it,
+and each coarser level is built by downsampling four tiles of the level
+below, so memory per worker depends on the tile size, not the chart size.
+Tiles without any content are not written.
+"""
+
+import os
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Tuple, Optional, Set
+
+import numpy as np
+from matplotlib import image as mpimg
+from matplotlib.colors import to_rgba
+
+from generators.figure_pool import new_figure
+from generators.simple_flowchart_generator import SimpleFlowchartGenerator
+from utils.text_layout import get_text_measurer
+
+
+Tile = Tuple[int, int]
+
+
+class TileGenerator(SimpleFlowchartGenerator):
+    """Generator for zoomable tile pyramids of large flowcharts."""
+
+    TILE_SIZE = 256
+
+    # Sizes in pixels at the deepest zoom level
+    NODE_WIDTH = 160
+    NODE_HEIGHT = 64
+    DIAMOND_SIZE = 48
+    FONT_PIXELS = 12
+    NODE_SPACING = 1.5
+    MARGIN = 128
+
+    # Largest world edge in pixels, about 8000 tiles at the deepest level
+    MAX_WORLD_SIZE = 2 ** 21
+
+    # Deepest-level tiles handed to a worker at once
+    BATCH_SIZE = 16
+
+    DPI = 100
+
+    def __init__(self, color_scheme: str = "standard", tile_size: int = TILE_SIZE,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize the tile generator.
+
+        Args:
+            color_scheme: The color scheme to use (standard, pastel, monochrome, colorful)
+            tile_size: Edge length of a tile in pixels
+            max_workers: Number of worker processes (default: CPU count)
+        """
+        super().__init__(color_scheme)
+        self.color_scheme = color_scheme
+        self.tile_size = tile_size
+        self.max_workers = max_workers
+
+    def generate_from_structure(self, flowchart: Dict[str, Any], output_dir: str) -> Dict[str, Any]:
+        """
+        Render a laid-out flowchart into a tile pyramid.
+
+        Args:
+            flowchart: The flowchart structure, with "x"/"y" on every node
+            output_dir: Directory to write the tiles into
+
+        Returns:
+            The pyramid description that is also written to tiles.json
+        """
+        nodes, width, height = self._place_nodes(flowchart["nodes"])
+        max_zoom = max(0, math.ceil(math.log2(max(width, height) / self.tile_size)))
+
+        node_tiles, edge_tiles = self._index_tiles(nodes, flowchart["edges"])
+        tiles = sorted(set(node_tiles) | set(edge_tiles))
+
+        os.makedirs(output_dir, exist_ok=True)
+        batches = []
+        for start in range(0, len(tiles), self.BATCH_SIZE):
+            batches.append([
+                (tile, node_tiles.get(tile, []), edge_tiles.get(tile, []))
+                for tile in tiles[start:start + self.BATCH_SIZE]
+            ])
+
+        written = set(tiles)
+        with self._executor(len(batches)) as executor:
+            list(executor.map(_render_tile_batch, [
+                (self.color_scheme, self.tile_size, os.path.join(output_dir, str(max_zoom)), batch)
+                for batch in batches
+            ]))
+
+            background = to_rgba(self.colors["background"])
+            tile_count = len(written)
+            for zoom in range(max_zoom - 1, -1, -1):
+                parents = sorted({(x // 2, y // 2) for x, y in written})
+                jobs = []
+                for start in range(0, len(parents), self.BATCH_SIZE):
+                    batch = parents[start:start + self.BATCH_SIZE]
+                    children = {(2 * x + dx, 2 * y + dy) for x, y in batch for dx in (0, 1) for dy in (0, 1)}
+                    jobs.append((output_dir, zoom, self.tile_size, background, children & written, batch))
+                list(executor.map(_downsample_tile_batch, jobs))
+                written = set(parents)
+                tile_count += len(written)
+
+        metadata = {
+            "format": "xyz",
+            "tile_size": self.tile_size,
+            "min_zoom": 0,
+            "max_zoom": max_zoom,
+            "width": width,
+            "height": height,
+            "tiles": tile_count
+        }
+        with open(os.path.join(output_dir, "tiles.json"), "w", encoding="utf-8") as file:
+            json.dump(metadata, file, indent=2)
+        return metadata
+
+    def _executor(self, jobs: int):
+        """Return a process pool, or an in-process stand-in when parallelism would not pay off."""
+        if jobs <= 1 or self.max_workers == 1:
+            return _InlineExecutor()
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def _place_nodes(self, nodes: List[Dict[str, Any]]) -> Tuple[Dict[Any, Dict[str, Any]], int, int]:
+        """
+        Scale normalized node positions to world pixels at the deepest zoom level.
+
+        Each axis is stretched until the closest distinct positions are a node
+        size apart, so labels stay readable however dense the layout is.
+
+        Args:
+            nodes: Flowchart nodes with normalized "x"/"y" coordinates
+
+        Returns:
+            Tuple of (world nodes by id, world width, world height)
+        """
+        if not nodes:
+            return {}, self.tile_size, self.tile_size
+
+        xs = [node["x"] for node in nodes]
+        ys = [node["y"] for node in nodes]
+        scale_x = self._axis_scale(xs, self.NODE_WIDTH * self.NODE_SPACING)
+        scale_y = self._axis_scale(ys, 2 * self.DIAMOND_SIZE * self.NODE_SPACING)
+        min_x, max_y = min(xs), max(ys)
+
+        measurer = get_text_measurer()
+        world_nodes = {}
+        for node in nodes:
+            node_type = node.get("type", "process")
+            shape = self.SHAPES.get(node_type, "rectangle")
+            shape_width = 2 * self.DIAMOND_SIZE if shape == "diamond" else self.NODE_WIDTH
+            lines = measurer.wrap(node.get("text", ""), shape_width * self.TEXT_WIDTH_FRACTION[shape],
+                                  self.FONT_PIXELS, self.MAX_LABEL_LINES)
+            world_nodes[node["id"]] = {
+                "type": node_type,
+                "text": "\n".join(lines),
+                # World y grows downwards, like tile rows
+                "x": self.MARGIN + (node["x"] - min_x) * scale_x,
+                "y": self.MARGIN + (max_y - node["y"]) * scale_y
+            }
+
+        width = math.ceil(max(node["x"] for node in world_nodes.values()) + self.MARGIN)
+        height = math.ceil(max(node["y"] for node in world_nodes.values()) + self.MARGIN)
+        return world_nodes, width, height
+
+    def _axis_scale(self, values: List[float], spacing: float) -> float:
+        """Return pixels per layout unit so that neighbouring positions are `spacing` apart."""
+        distinct = sorted({round(value, 6) for value in values})
+        gaps = [b - a for a, b in zip(distinct, distinct[1:])]
+        if not gaps:
+            return 1.0
+        extent = distinct[-1] - distinct[0]
+        return min(spacing / min(gaps), (self.MAX_WORLD_SIZE - 2 * self.MARGIN) / extent)
+
+    def _index_tiles(self, nodes: Dict[Any, Dict[str, Any]],
+                     edges: List[Dict[str, Any]]) -> Tuple[Dict[Tile, list], Dict[Tile, list]]:
+        """
+        Assign nodes and edges to the deepest-level tiles they intersect.
+
+        Args:
+            nodes: World nodes by id
+            edges: Flowchart edges
+
+        Returns:
+            Tuple of (nodes per tile, edges per tile)
+        """
+        size = self.tile_size
+        half_width = self.NODE_WIDTH / 2 + 2
+        half_height = max(self.NODE_HEIGHT / 2, self.DIAMOND_SIZE) + 2
+
+        node_tiles: Dict[Tile, list] = {}
+        for node in nodes.values():
+            for tx in range(int((node["x"] - half_width) // size), int((node["x"] + half_width) // size) + 1):
+                for ty in range(int((node["y"] - half_height) // size), int((node["y"] + half_height) // size) + 1):
+                    node_tiles.setdefault((tx, ty), []).append(node)
+
+        edge_tiles: Dict[Tile, list] = {}
+        for edge in edges:
+            source, target = nodes.get(edge["from"]), nodes.get(edge["to"])
+            if source is None or target is None or source is target:
+                continue
+            record = (source, target, edge.get("text", ""))
+            for tile in _segment_tiles(source["x"], source["y"], target["x"], target["y"], size):
+                edge_tiles.setdefault(tile, []).append(record)
+
+        return node_tiles, edge_tiles
+
+    def _shape_extent(self, node_type: str) -> Tuple[str, float, float]:
+        """Return the shape and its half width and half height in world pixels."""
+        shape = self.SHAPES.get(node_type, "rectangle")
+        if shape == "diamond":
+            return shape, self.DIAMOND_SIZE, self.DIAMOND_SIZE
+        return shape, self.NODE_WIDTH / 2, self.NODE_HEIGHT / 2
+
+    def _boundary_point(self, node: Dict[str, Any], toward: Dict[str, Any]) -> Tuple[float, float]:
+        """Return where the line from a node's center toward another node leaves its shape."""
+        dx, dy = toward["x"] - node["x"], toward["y"] - node["y"]
+        shape, half_width, half_height = self._shape_extent(node["type"])
+        if shape == "diamond":
+            reach = abs(dx) / half_width + abs(dy) / half_height
+        elif shape == "ellipse":
+            reach = math.hypot(dx / half_width, dy / half_height)
+        else:
+            reach = max(abs(dx) / half_width, abs(dy) / half_height)
+        t = min(1.0, 1.0 / reach) if reach else 0.0
+        return node["x"] + dx * t, node["y"] + dy * t
+
+    def _tile_axes(self, fig):
+        """
+        Set up a tile-sized figure with one borderless axes.
+
+        The axes is kept for every tile of a batch; creating a new one per
+        tile would cost more than drawing most tiles.
+
+        Args:
+            fig: A tile-sized figure
+
+        Returns:
+            The axes
+        """
+        fig.set_facecolor(self.colors["background"])
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.axis("off")
+        return ax
+
+    def _draw_tile(self, ax, tile: Tile, nodes: List[Dict[str, Any]], edges: List[tuple]) -> None:
+        """
+        Draw the content of one deepest-level tile, replacing the previous one.
+
+        Args:
+            ax: Axes from _tile_axes
+            tile: (x, y) tile index
+            nodes: Nodes intersecting the tile, in world pixels
+            edges: (source, target, text) tuples whose line crosses the tile
+        """
+        for artist in ax.patches + ax.texts:
+            artist.remove()
+
+        size = self.tile_size
+        ax.set_xlim(tile[0] * size, (tile[0] + 1) * size)
+        ax.set_ylim((tile[1] + 1) * size, tile[1] * size)
+
+        arrow_color = self.colors.get("arrow", "black")
+        for source, target, text in edges:
+            start = self._boundary_point(source, target)
+            end = self._boundary_point(target, source)
+            ax.annotate(
+                "",
+                xy=end,
+                xytext=start,
+                annotation_clip=False,
+                arrowprops=dict(arrowstyle="->", color=arrow_color, linewidth=1.5, shrinkA=0, shrinkB=0)
+            )
+            if text:
+                ax.text(
+                    (start[0] + end[0]) / 2, (start[1] + end[1]) / 2 - 10,
+                    text,
+                    ha="center",
+                    va="center",
+                    fontsize=9,
+                    fontweight="bold",
+                    color="green" if text.startswith("true") else "red" if text.startswith("false") else arrow_color,
+                    bbox=dict(facecolor="white", alpha=0.7, edgecolor="none", pad=1)
+                )
+
+        font_size = self.FONT_PIXELS * 72 / self.DPI
+        for node in nodes:
+            shape, half_width, half_height = self._shape_extent(node["type"])
+            if shape == "diamond":
+                shape_def = {"type": shape, "x": node["x"], "y": node["y"], "size": half_width}
+            else:
+                shape_def = {
+                    "type": shape,
+                    "x": node["x"] - half_width,
+                    "y": node["y"] - half_height,
+                    "width": 2 * half_width,
+                    "height": 2 * half_height,
+                    "offset": -2 * half_width / 6
+                }
+            # Nodes go above the edges, which may pass behind them
+            color = node.get("color") or self.colors.get(node["type"], self.colors["process"])
+            patch = self._add_shape_to_plot(ax, shape_def, color)
+            patch.set_zorder(4)
+            ax.text(node["x"], node["y"], node["text"], ha="center", va="center", zorder=5,
+                    fontsize=font_size, color=self.colors.get("text", "black"))
+
+
+class _InlineExecutor:
+    """Runs executor.map calls in the current process."""
+
+    def __enter__(self) -> "_InlineExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+    def map(self, function, iterable):
+        return map(function, iterable)
+
+
+def _segment_tiles(x0: float, y0: float, x1: float, y1: float, size: int, pad: float = 8.0) -> Set[Tile]:
+    """
+    Return the tiles a line segment passes through.
+
+    The segment is traced three times, shifted by `pad` pixels to either
+    side, so lines running close to a tile border are drawn in both tiles.
+    """
+    length = math.hypot(x1 - x0, y1 - y0) or 1.0
+    normal_x, normal_y = -(y1 - y0) / length * pad, (x1 - x0) / length * pad
+
+    tiles: Set[Tile] = set()
+    for offset in (-1, 0, 1):
+        ax, ay = x0 + normal_x * offset, y0 + normal_y * offset
+        bx, by = x1 + normal_x * offset, y1 + normal_y * offset
+
+        # Grid traversal (Amanatides & Woo)
+        tx, ty = int(ax // size), int(ay // size)
+        end_x, end_y = int(bx // size), int(by // size)
+        step_x = 1 if bx > ax else -1
+        step_y = 1 if by > ay else -1
+        dx, dy = abs(bx - ax), abs(by - ay)
+        next_x = ((tx + (step_x > 0)) * size - ax) * step_x
+        next_y = ((ty + (step_y > 0)) * size - ay) * step_y
+        t_max_x = next_x / dx if dx else math.inf
+        t_max_y = next_y / dy if dy else math.inf
+        t_delta_x = size / dx if dx else math.inf
+        t_delta_y = size / dy if dy else math.inf
+
+        tiles.add((tx, ty))
+        while (tx, ty) != (end_x, end_y) and min(t_max_x, t_max_y) <= 1.0:
+            if t_max_x < t_max_y:
+                tx += step_x
+                t_max_x += t_delta_x
+            else:
+                ty += step_y
+                t_max_y += t_delta_y
+            tiles.add((tx, ty))
+    return tiles
+
+
+def _tile_path(level_dir: str, tile: Tile) -> str:
+    return os.path.join(level_dir, str(tile[0]), f"{tile[1]}.png")
+
+
+def _render_tile_batch(job: tuple) -> None:
+    """
+    Render a batch of deepest-level tiles. Runs in a worker process.
+
+    Args:
+        job: (color_scheme, tile_size, level_dir, [(tile, nodes, edges), ...])
+    """
+    color_scheme, tile_size, level_dir, batch = job
+    generator = TileGenerator(color_scheme, tile_size, max_workers=1)
+    fig = new_figure((tile_size / TileGenerator.DPI, tile_size / TileGenerator.DPI))
+    ax = generator._tile_axes(fig)
+    for tile, nodes, edges in batch:
+        generator._draw_tile(ax, tile, nodes, edges)
+        path = _tile_path(level_dir, tile)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fig.savefig(path, format="png", dpi=TileGenerator.DPI, facecolor=fig.get_facecolor())
+
+
+def _downsample_tile_batch(job: tuple) -> None:
+    """
+    Build a batch of tiles from the four tiles below each. Runs in a worker process.
+
+    Args:
+        job: (output_dir, zoom, tile_size, background rgba, child tiles, parent tiles)
+    """
+    output_dir, zoom, tile_size, background, children, parents = job
+    child_dir = os.path.join(output_dir, str(zoom + 1))
+    level_dir = os.path.join(output_dir, str(zoom))
+
+    for x, y in parents:
+        canvas = np.empty((2 * tile_size, 2 * tile_size, 4), dtype=np.float32)
+        canvas[:] = background
+        for dx in (0, 1):
+            for dy in (0, 1):
+                child = (2 * x + dx, 2 * y + dy)
+                if child in children:
+                    image = mpimg.imread(_tile_path(child_dir, child))
+                    if image.shape[2] == 3:
+                        image = np.dstack([image, np.ones(image.shape[:2], dtype=image.dtype)])
+                    canvas[dy * tile_size:(dy + 1) * tile_size, dx * tile_size:(dx + 1) * tile_size] = image
+
+        tile = canvas.reshape(tile_size, 2, tile_size, 2, 4).mean(axis=(1, 3))
+        path = _tile_path(level_dir, (x, y))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        mpimg.imsave(path, np.clip(tile, 0.0, 1.0), format="png")
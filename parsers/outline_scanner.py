@@ -0,0 +1,285 @@
+"""
+Outline scanner for the Code to Flowchart tool.
+Extracts the block structure of Python code with line spans in one streaming pass, without building an AST.
+"""
+
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+from parsers.python_parser import PythonParser
+from parsers.tree_hash import tree_children
+
+# Indentation and, for block statements, the keyword at the start of a line
+_LINE_START = r"""
+    (?P<indent>[ \t\f]*)
+    (?: (?P<blank>(?=[#\r\n]|\Z))
+      | (?P<keyword>async[ \t]+(?:def|for|with)|def|class|if|elif|else|for|while|try|except|finally|with)\b )?
+"""
+
+# Everything that decides where logical lines start: newlines outside brackets (together with
+# the start of the next line), strings (which may contain newlines, brackets and "#"), comments,
+# brackets and line continuations. Each match first skips the plain text before it, so the
+# engine does not retry every position.
+_TOKEN = re.compile(r"""
+    [^\n#'"()\[\]{}\\]*
+  (?:
+    (?P<newline>\n""" + _LINE_START + r""")
+  | (?P<comment>\#[^\n]*)
+  | (?P<string>'''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''
+              | \"\"\"[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*\"\"\"
+              | '[^\n'\\]*(?:\\.[^\n'\\]*)*'
+              | "[^\n"\\]*(?:\\.[^\n"\\]*)*")
+  | (?P<open>[(\[{])
+  | (?P<close>[)\]}])
+  | (?P<continuation>\\\r?\n)
+  | (?P<unterminated>'''|\"\"\"|['"])
+  | (?P<backslash>\\)
+  )
+""", re.VERBOSE | re.DOTALL)
+
+_FIRST_LINE = re.compile(_LINE_START, re.VERBOSE)
+
+# Tokens of a block header that matter for finding the colon ending it
+_HEADER_TOKEN = re.compile(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|\#[^\n]*|[(\[{]|[)\]}]|:(?!=)""", re.DOTALL)
+
+_DEF_HEADER = re.compile(r"(?:async\s+)?def\s+(\w+)\s*\((.*)\)", re.DOTALL)
+_CLASS_HEADER = re.compile(r"class\s+(\w+)\s*(?:\((.*)\))?", re.DOTALL)
+
+# Clauses that continue the block statement at the same indentation
+_CLAUSES = {"elif", "else", "except", "finally"}
+
+# Node type and label prefix per block keyword, matching PythonParser
+_BLOCK_TYPES = {
+    "def": ("function", "Function"),
+    "async def": ("asyncfunctiondef", "Async function"),
+    "class": ("class", "Class"),
+    "if": ("if", "If"),
+    "for": ("for", "For"),
+    "async for": ("asyncfor", "AsyncFor"),
+    "while": ("while", "While"),
+    "try": ("try", "Try"),
+    "with": ("with", "With"),
+    "async with": ("asyncwith", "AsyncWith"),
+}
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split a parameter or base list at the commas outside brackets and strings."""
+    parts, depth, start = [], 0, 0
+    for match in re.finditer(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|[(\[{]|[)\]}]|,""", text):
+        token = match.group()
+        if token in "([{":
+            depth += 1
+        elif token in ")]}":
+            depth -= 1
+        elif token == "," and depth == 0:
+            parts.append(text[start:match.start()])
+            start = match.end()
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _header_text(text: str) -> str:
+    """Cut a block header at its colon and drop comments and line breaks."""
+    depth, end, pieces, start = 0, len(text), [], 0
+    for match in _HEADER_TOKEN.finditer(text):
+        token = match.group()
+        if token[0] == "#":
+            pieces.append(text[start:match.start()])
+            start = match.end()
+        elif token in "([{":
+            depth += 1
+        elif token in ")]}":
+            depth -= 1
+        elif token == ":" and depth == 0:
+            end = match.start()
+            break
+    pieces.append(text[start:end])
+    return " ".join("".join(pieces).replace("\\\n", " ").split())
+
+
+def _block_label(keyword: str, header: str) -> Tuple[str, Optional[str]]:
+    """Build the PythonParser-style label and the name of a block statement from its header."""
+    prefix = _BLOCK_TYPES[keyword][1]
+    if keyword in ("def", "async def"):
+        match = _DEF_HEADER.match(header)
+        if match is None:
+            return f"{prefix}: {header}", None
+        # Like PythonParser: plain parameters only, up to the first starred one
+        params = []
+        for param in _split_top_level(match.group(2)):
+            if param.startswith("*"):
+                break
+            if param != "/":
+                params.append(re.split(r"[:=]", param, maxsplit=1)[0].strip())
+        return f"{prefix}: {match.group(1)}({', '.join(params)})", match.group(1)
+    if keyword == "class":
+        match = _CLASS_HEADER.match(header)
+        if match is None:
+            return f"{prefix}: {header}", None
+        bases = [base for base in _split_top_level(match.group(2) or "") if "=" not in base]
+        return f"{prefix}: {match.group(1)}" + (f"({', '.join(bases)})" if bases else ""), match.group(1)
+    if keyword in ("if", "for", "while"):
+        return f"{prefix}: {header[len(keyword):].strip()}", None
+    return prefix, None
+
+
+class OutlineScanner:
+    """Scanner that turns Python code into the block outline of a PythonParser structure.
+
+    Nodes stand for the module and for every def, class, if, for, while,
+    try and with statement, nested as in the code and connected by
+    "normal" edges; elif/else/except/finally clauses belong to their
+    statement. Simple statements are left out. Nodes carry
+    "lineno"/"end_lineno" (1-based, inclusive) and "col_offset", and
+    functions and classes their "name", so the outline works with the line
+    index, the overlays and partial parsing through parse_symbol.
+
+    The scan is one pass of a single regular expression over the source.
+    It does not check the syntax; code that does not compile gives a
+    best-effort outline.
+    """
+
+    def scan(self, source_code: str) -> Dict[str, Any]:
+        """
+        Scan Python source code into an outline.
+
+        Args:
+            source_code: The Python source code as a string
+
+        Returns:
+            A dictionary with "nodes" and "edges", like PythonParser.parse
+
+        Raises:
+            ValueError: If a string is not terminated
+        """
+        nodes: List[Dict[str, Any]] = [{"id": 0, "type": "module", "label": "Module", "col_offset": 0}]
+        edges: List[Dict[str, Any]] = []
+        # Open blocks as (indentation, node), innermost last
+        open_blocks: List[Tuple[int, Dict[str, Any]]] = []
+        first_line: Optional[int] = None
+        last_line = 0
+        # The block whose header is still being read, with the position of its keyword
+        pending: Optional[Tuple[Dict[str, Any], str, int]] = None
+
+        def start_logical_line(match: "re.Match", line: int) -> bool:
+            nonlocal first_line, pending
+            if match.group("blank") is not None:
+                return False
+            indent_text = match.group("indent")
+            indent = len(indent_text.expandtabs(8)) if "\t" in indent_text else len(indent_text)
+            keyword = match.group("keyword")
+            if keyword is not None and keyword.startswith("async"):
+                keyword = "async " + keyword.split()[-1]
+
+            while open_blocks and open_blocks[-1][0] >= indent:
+                if keyword in _CLAUSES and open_blocks[-1][0] == indent:
+                    break
+                open_blocks.pop()[1]["end_lineno"] = last_line
+            if first_line is None:
+                first_line = line
+
+            if keyword in _BLOCK_TYPES:
+                node = {
+                    "id": len(nodes),
+                    "type": _BLOCK_TYPES[keyword][0],
+                    "label": "",
+                    "lineno": line,
+                    "end_lineno": line,
+                    "col_offset": indent
+                }
+                parent = open_blocks[-1][1] if open_blocks else nodes[0]
+                nodes.append(node)
+                edges.append({"from": parent["id"], "to": node["id"], "type": "normal"})
+                open_blocks.append((indent, node))
+                pending = (node, keyword, match.start("keyword"))
+            return True
+
+        def finish_header(end: int) -> None:
+            nonlocal pending
+            if pending is not None:
+                node, keyword, start = pending
+                node["label"], name = _block_label(keyword, _header_text(source_code[start:end]))
+                if name is not None:
+                    node["name"] = name
+                pending = None
+
+        depth = 0
+        line = 1
+        is_code = start_logical_line(_FIRST_LINE.match(source_code), line)
+        for match in _TOKEN.finditer(source_code):
+            kind = match.lastgroup
+            if kind == "newline":
+                if depth == 0:
+                    if is_code:
+                        last_line = line
+                    finish_header(match.start(kind))
+                    line += 1
+                    is_code = start_logical_line(match, line)
+                else:
+                    line += 1
+            elif kind == "string":
+                line += source_code.count("\n", match.start(kind), match.end())
+            elif kind == "open":
+                depth += 1
+            elif kind == "close":
+                depth = max(depth - 1, 0)
+            elif kind == "continuation":
+                line += 1
+            elif kind == "unterminated":
+                raise ValueError(f"Unterminated string in Python code (line {line})")
+
+        if is_code:
+            last_line = line
+        finish_header(len(source_code))
+        for _, node in open_blocks:
+            node["end_lineno"] = last_line
+        nodes[0]["lineno"] = first_line if first_line is not None else 1
+        nodes[0]["end_lineno"] = last_line if first_line is not None else 1
+        return {"nodes": nodes, "edges": edges}
+
+
+def parse_symbol(source_code: str, node: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fully parse only the code of one outline node.
+
+    The node's lines are parsed at their original line numbers (nested code
+    inside a dummy `if` block), so spans match the whole file.
+
+    Args:
+        source_code: The Python source code the outline was scanned from
+        node: A node from OutlineScanner.scan, usually a function or class
+
+    Returns:
+        The PythonParser structure of the node's statement, rooted at it
+    """
+    # Not splitlines(), which also splits at form feeds and other characters the tokenizer keeps
+    lines = source_code.split("\n")
+    first, last = node["lineno"], node["end_lineno"]
+    body = "\n".join(lines[first - 1:last])
+    if node.get("col_offset"):
+        padded = "\n" * (first - 2) + "if 1:\n" + body
+    else:
+        padded = "\n" * (first - 1) + body
+    parsed = PythonParser().parse(padded)
+
+    root = next(
+        (candidate["id"] for candidate in parsed["nodes"]
+         if candidate.get("lineno") == first and candidate["type"] not in ("module", "if_body")
+         and candidate.get("col_offset") == node.get("col_offset")),
+        None
+    )
+    if root is None:
+        return parsed
+    children = tree_children(parsed)
+    kept = {root}
+    stack = [root]
+    while stack:
+        for child, _ in children[stack.pop()]:
+            if child not in kept:
+                kept.add(child)
+                stack.append(child)
+    return {
+        "nodes": [candidate for candidate in parsed["nodes"] if candidate["id"] in kept],
+        "edges": [edge for edge in parsed["edges"] if edge["from"] in kept and edge["to"] in kept]
+    }
@@ -8,8 +8,21 @@ import json
 from typing import Dict, List, Any, Union, Optional
 
 
+# Source position attributes copied from the AST onto every node
+SPAN_KEYS = ("lineno", "end_lineno", "col_offset", "end_col_offset")
+
+# Bump when the same code parses into a different graph, so recorded build outputs go stale
+PARSER_VERSION = 1
+
+
 class PythonParser:
-    """Parser for Python code that converts it to a structured representation."""
+    """Parser for Python code that converts it to a structured representation.
+
+    Every node keeps the source span of the code it stands for as
+    "lineno"/"end_lineno" (1-based, inclusive) and "col_offset"/"end_col_offset".
+    Grouping nodes (module, if/else/try bodies) span their statements.
+    Function and class nodes also keep their bare "name".
+    """
 
     def __init__(self):
         self.node_counter = 0
@@ -17,12 +30,14 @@ class PythonParser:
         self.edges = []
         self.current_parent = None
 
-    def parse(self, source_code: str) -> Dict[str, Any]:
+    def parse(self, source_code: Union[str, bytes]) -> Dict[str, Any]:
         """
         Parse Python source code into a structured representation.
 
         Args:
-            source_code: The Python source code as a string
+            source_code: The Python source code as a string, or as bytes or
+                another buffer (e.g. an mmap), decoded by ast.parse according
+                to its coding cookie
 
         Returns:
             A dictionary containing the parsed code structure
@@ -60,6 +75,7 @@ class PythonParser:
         # Save the previous parent
         prev_parent = self.current_parent
         self.current_parent = node_id
+        node_index = len(self.nodes)
 
         # Connect to parent if exists
         if parent_id is not None:
@@ -74,7 +90,8 @@ class PythonParser:
             self.nodes.append({
                 "id": node_id,
                 "type": "module",
-                "label": "Module"
+                "label": "Module",
+                **self._body_span(node.body)
             })
             for child in node.body:
                 self._process_node(child, node_id)
@@ -84,7 +101,8 @@ class PythonParser:
             self.nodes.append({
                 "id": node_id,
                 "type": "function",
-                "label": f"Function: {node.name}({args_str})"
+                "label": f"Function: {node.name}({args_str})",
+                "name": node.name
             })
             for child in node.body:
                 self._process_node(child, node_id)
@@ -95,7 +113,8 @@ class PythonParser:
             self.nodes.append({
                 "id": node_id,
                 "type": "class",
-                "label": f"Class: {node.name}{base_str}"
+                "label": f"Class: {node.name}{base_str}",
+                "name": node.name
             })
             for child in node.body:
                 self._process_node(child, node_id)
@@ -114,7 +133,8 @@ class PythonParser:
             self.nodes.append({
                 "id": if_body_id,
                 "type": "if_body",
-                "label": "If body"
+                "label": "If body",
+                **self._body_span(node.body)
             })
             self.edges.append({
                 "from": node_id,
@@ -132,7 +152,8 @@ class PythonParser:
                 self.nodes.append({
                     "id": else_body_id,
                     "type": "else_body",
-                    "label": "Else body"
+                    "label": "Else body",
+                    **self._body_span(node.orelse)
                 })
                 self.edges.append({
                     "from": node_id,
@@ -181,7 +202,8 @@ class PythonParser:
             self.nodes.append({
                 "id": try_body_id,
                 "type": "try_body",
-                "label": "Try body"
+                "label": "Try body",
+                **self._body_span(node.body)
             })
             self.edges.append({
                 "from": node_id,
@@ -207,7 +229,8 @@ class PythonParser:
                 self.nodes.append({
                     "id": except_id,
                     "type": "except",
-                    "label": label
+                    "label": label,
+                    **self._span(handler)
                 })
                 self.edges.append({
                     "from": node_id,
@@ -267,12 +290,50 @@ class PythonParser:
                 "type": node.__class__.__name__.lower(),
                 "label": node.__class__.__name__
             })
+            if isinstance(getattr(node, "name", None), str):
+                # e.g. async functions, so they can be found by name
+                self.nodes[node_index]["name"] = node.name
+
+        if not isinstance(node, ast.Module):
+            self.nodes[node_index].update(self._span(node))
 
         # Restore the previous parent
         self.current_parent = prev_parent
 
         return node_id
 
+    def _span(self, node: ast.AST) -> Dict[str, int]:
+        """
+        Get the source span of an AST node.
+
+        Args:
+            node: The AST node
+
+        Returns:
+            Dictionary with whichever of SPAN_KEYS the node has
+        """
+        return {key: getattr(node, key) for key in SPAN_KEYS if getattr(node, key, None) is not None}
+
+    def _body_span(self, body: List[ast.stmt]) -> Dict[str, int]:
+        """
+        Get the source span covering a list of statements.
+
+        Args:
+            body: The statements
+
+        Returns:
+            Dictionary with the span keys, empty if there are no statements
+        """
+        if not body:
+            return {}
+        first, last = self._span(body[0]), self._span(body[-1])
+        return {
+            "lineno": first["lineno"],
+            "col_offset": first["col_offset"],
+            "end_lineno": last["end_lineno"],
+            "end_col_offset": last["end_col_offset"]
+        }
+
     def _expr_to_str(self, expr: Optional[ast.AST]) -> str:
         """
         Convert an expression AST node to a string representation.
@@ -0,0 +1,98 @@
+"""
+Subtree hashing for the Code to Flowchart tool.
+Computes Merkle-style hashes of every subtree of a parsed graph, so equal regions of two versions can be matched.
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Any, Tuple
+
+# String and number literals inside node labels
+_LITERAL = re.compile(r"""[rbuRBU]{0,2}'(?:[^'\\]|\\.)*'|[rbuRBU]{0,2}"(?:[^"\\]|\\.)*"|(?<![\w.])\d[\w.]*""")
+
+
+def mask_literals(label: str) -> str:
+    """
+    Replace the string and number literals in a node label with a placeholder.
+
+    Args:
+        label: The node label
+
+    Returns:
+        The label with every literal replaced by "…"
+    """
+    return _LITERAL.sub("…", label)
+
+
+def tree_children(graph: Dict[str, Any]) -> Dict[Any, List[Tuple[Any, str]]]:
+    """
+    List the children of every node in edge order.
+
+    Args:
+        graph: The PythonParser structure
+
+    Returns:
+        Mapping of node id to a list of (child id, edge type)
+    """
+    children: Dict[Any, List[Tuple[Any, str]]] = {node["id"]: [] for node in graph.get("nodes", [])}
+    for edge in graph.get("edges", []):
+        if edge["from"] in children and edge["to"] in children:
+            children[edge["from"]].append((edge["to"], edge.get("type", "normal")))
+    return children
+
+
+def subtree_hashes(graph: Dict[str, Any], ignore_literals: bool = False) -> Tuple[Dict[Any, bytes], Dict[Any, int]]:
+    """
+    Hash every subtree bottom-up.
+
+    A node's hash covers its type, its label and the ordered hashes of its
+    children together with the edge types leading to them, so two subtrees
+    have the same hash exactly when they chart the same code, wherever it
+    sits in the file. Source positions are left out. Runs in linear time.
+
+    Args:
+        graph: The PythonParser structure
+        ignore_literals: Hash labels with their literals masked, so code
+            differing only in constants gets the same hash
+
+    Returns:
+        Tuple of (hash by node id, subtree size by node id)
+    """
+    children = tree_children(graph)
+    nodes = {node["id"]: node for node in graph.get("nodes", [])}
+
+    # Post-order without recursion, so deeply nested code does not hit the recursion limit
+    order = []
+    seen = set()
+    for root in nodes:
+        if root in seen:
+            continue
+        stack = [(root, False)]
+        while stack:
+            node_id, expanded = stack.pop()
+            if expanded:
+                order.append(node_id)
+                continue
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            stack.append((node_id, True))
+            stack.extend((child, False) for child, _ in reversed(children[node_id]) if child not in seen)
+
+    hashes: Dict[Any, bytes] = {}
+    sizes: Dict[Any, int] = {}
+    for node_id in order:
+        node = nodes[node_id]
+        digest = hashlib.blake2b(digest_size=16)
+        label = node.get("label", "")
+        if ignore_literals:
+            label = mask_literals(label)
+        digest.update(f"{node.get('type', '')}\0{label}\0".encode("utf-8"))
+        size = 1
+        for child, edge_type in children[node_id]:
+            # A child reached through a cycle has no hash yet; its edge type still counts
+            digest.update(edge_type.encode("utf-8") + b"\0" + hashes.get(child, b""))
+            size += sizes.get(child, 0)
+        hashes[node_id] = digest.digest()
+        sizes[node_id] = size
+    return hashes, sizes
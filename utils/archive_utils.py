@@ -0,0 +1,151 @@
+"""
+Archive access for the Code to Flowchart tool.
+Lists and reads Python files inside zip, wheel and sdist archives without extracting them.
+"""
+
+import os
+import tarfile
+import zipfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Separates the archive from the member in "archive.whl!/package/module.py"
+ARCHIVE_SEPARATOR = "!/"
+
+ZIP_SUFFIXES = (".zip", ".whl", ".egg", ".pyz")
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+# Open zip files by (process id, path), so reading many members parses each central directory
+# once; forked workers must not share a file offset with their parent
+_open_zips: Dict[Tuple[int, str], zipfile.ZipFile] = {}
+
+
+def is_archive(path: str) -> bool:
+    """
+    Check if a path is a supported archive file.
+
+    Args:
+        path: Path to check
+
+    Returns:
+        True for existing zip, wheel, egg, pyz and (compressed) tar files
+    """
+    return path.lower().endswith(ZIP_SUFFIXES + TAR_SUFFIXES) and os.path.isfile(path)
+
+
+def is_tar_archive(path: str) -> bool:
+    """Check if an archive path is a tar file, where members can only be read in order."""
+    return path.lower().endswith(TAR_SUFFIXES)
+
+
+def archive_stem(path: str) -> str:
+    """
+    Get the file name of an archive without its (possibly double) extension.
+
+    Args:
+        path: Path to the archive
+
+    Returns:
+        E.g. "requests-2.31.0" for "dist/requests-2.31.0.tar.gz"
+    """
+    name = os.path.basename(path)
+    for suffix in sorted(ZIP_SUFFIXES + TAR_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def split_member_path(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Split an "archive!/inner/path.py" selector.
+
+    Args:
+        path: A plain path or a selector
+
+    Returns:
+        Tuple of (archive or plain path, member name or None)
+    """
+    archive, separator, member = path.partition(ARCHIVE_SEPARATOR)
+    if not separator:
+        return path, None
+    return archive, member
+
+
+def member_path(archive: str, member: str) -> str:
+    """Build the "archive!/member" selector for an archive member."""
+    return f"{archive}{ARCHIVE_SEPARATOR}{member}"
+
+
+def _zip(archive: str) -> zipfile.ZipFile:
+    key = (os.getpid(), archive)
+    try:
+        return _open_zips[key]
+    except KeyError:
+        _open_zips[key] = zipfile.ZipFile(archive)
+        return _open_zips[key]
+
+
+def list_python_members(archive: str) -> List[str]:
+    """
+    List the Python files in an archive.
+
+    Args:
+        archive: Path to the archive
+
+    Returns:
+        Member names ending in .py, in archive order
+    """
+    if is_tar_archive(archive):
+        with tarfile.open(archive) as tar:
+            return [info.name for info in tar if info.isfile() and info.name.endswith(".py")]
+    return [name for name in _zip(archive).namelist() if name.endswith(".py")]
+
+
+def read_member(archive: str, member: str) -> bytes:
+    """
+    Read one member of an archive into memory.
+
+    Args:
+        archive: Path to the archive
+        member: Name of the member
+
+    Returns:
+        The member's contents
+
+    Raises:
+        FileNotFoundError: If the archive has no such member
+    """
+    try:
+        if is_tar_archive(archive):
+            with tarfile.open(archive) as tar:
+                extracted = tar.extractfile(member)
+                if extracted is None:
+                    raise KeyError(member)
+                return extracted.read()
+        return _zip(archive).read(member)
+    except KeyError:
+        raise FileNotFoundError(f"'{member}' not found in {archive}")
+
+
+def iter_python_members(archive: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    Read every Python file of an archive in one pass.
+
+    Tar files are read as a stream, so a compressed sdist is decompressed
+    only once instead of once per member.
+
+    Args:
+        archive: Path to the archive
+
+    Yields:
+        Tuples of (member name, contents)
+    """
+    if is_tar_archive(archive):
+        with tarfile.open(archive, "r|*") as tar:
+            for info in tar:
+                if info.isfile() and info.name.endswith(".py"):
+                    yield info.name, tar.extractfile(info).read()
+        return
+    zip_file = _zip(archive)
+    for name in zip_file.namelist():
+        if name.endswith(".py"):
+            yield name, zip_file.read(name)
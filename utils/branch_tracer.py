@@ -0,0 +1,304 @@
+"""
+Branch tracing for the Code to Flowchart tool.
+Runs a command in-process, counts executed lines of the charted files and turns them into branch counts.
+"""
+
+import math
+import os
+import runpy
+import sys
+import threading
+from collections import Counter
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+# Parser node types whose executions are counted
+COUNTED_NODE_TYPES = {"if", "for", "while", "except"}
+
+# Parser edge types whose traversals are counted
+COUNTED_EDGE_TYPES = {"true", "false", "exception"}
+
+# Loop node types whose edge into the body is counted too
+LOOP_NODE_TYPES = {"for", "while"}
+
+# Edge width multiplier for the most frequently taken edge
+MAX_EDGE_WIDTH = 4.0
+
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _is_statement_code(code) -> bool:
+    """
+    Tell whether a code object runs charted statements.
+
+    Lambdas, comprehensions and generator expressions share their line with
+    the enclosing statement and would count it once per element.
+    """
+    return not code.co_name.startswith("<") or code.co_name == "<module>"
+
+
+class BranchTracer:
+    """
+    Counts line executions and line-to-line transitions in a set of source files while active.
+
+    Transitions are counted per frame, from each executed line to the next
+    one executed in the same frame, so a branch taken once counts once even
+    if its body loops.
+
+    On Python 3.12+ this uses sys.monitoring: every code object reports its
+    first start once, and only code objects from the charted files keep
+    reporting starts and get line events switched on; everything else runs
+    at full speed afterwards. Older versions fall back to sys.settrace,
+    where frames from other files are not line-traced.
+    """
+
+    def __init__(self, source_files: List[str]):
+        """
+        Initialize the tracer.
+
+        Args:
+            source_files: Paths of the files to count lines in
+        """
+        self.line_counts: Dict[str, Counter] = {_normalize(path): Counter() for path in source_files}
+        self.arc_counts: Dict[str, Counter] = {_normalize(path): Counter() for path in source_files}
+        self.backend = "monitoring" if hasattr(sys, "monitoring") else "settrace"
+        # co_filename -> (line Counter, arc Counter) of the charted file, or None for other files
+        self._targets: Dict[str, Optional[Tuple[Counter, Counter]]] = {}
+        self._tool_id: Optional[int] = None
+        self._instrumented: Set[Any] = set()
+        # Last line executed per frame id, for sys.monitoring; reset whenever a frame starts
+        self._last_lines: Dict[int, int] = {}
+
+    def counts_for(self, source_file: str) -> Dict[int, int]:
+        """
+        Get the line execution counts of a charted file.
+
+        Args:
+            source_file: Path to one of the traced files
+
+        Returns:
+            Mapping of line number to execution count
+        """
+        return dict(self.line_counts.get(_normalize(source_file), {}))
+
+    def arcs_for(self, source_file: str) -> Dict[Tuple[int, int], int]:
+        """
+        Get the line transition counts of a charted file.
+
+        Args:
+            source_file: Path to one of the traced files
+
+        Returns:
+            Mapping of (line, next line in the same frame) to count
+        """
+        return dict(self.arc_counts.get(_normalize(source_file), {}))
+
+    def _counters_for(self, filename: str) -> Optional[Tuple[Counter, Counter]]:
+        """Look up the line and arc counters for a code object's file, caching the answer per filename."""
+        try:
+            return self._targets[filename]
+        except KeyError:
+            path = _normalize(filename)
+            counters = (self.line_counts[path], self.arc_counts[path]) if path in self.line_counts else None
+            self._targets[filename] = counters
+            return counters
+
+    def start(self) -> None:
+        """Start counting."""
+        if self.backend == "monitoring":
+            self._start_monitoring()
+        else:
+            threading.settrace(self._global_trace)
+            sys.settrace(self._global_trace)
+
+    def stop(self) -> None:
+        """Stop counting and remove all instrumentation."""
+        if self.backend == "monitoring":
+            self._stop_monitoring()
+        else:
+            sys.settrace(None)
+            threading.settrace(None)
+
+    def __enter__(self) -> "BranchTracer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _start_monitoring(self) -> None:
+        """Register a sys.monitoring tool that line-traces only the charted code objects."""
+        monitoring = sys.monitoring
+        for tool_id in (monitoring.COVERAGE_ID, monitoring.PROFILER_ID, 3, 4):
+            if monitoring.get_tool(tool_id) is None:
+                self._tool_id = tool_id
+                break
+        else:
+            raise RuntimeError("No free sys.monitoring tool id for tracing")
+
+        events = monitoring.events
+        last_lines = self._last_lines
+
+        def on_start(code, instruction_offset):
+            # Frame ids are reused, so a new frame of charted code must not inherit a last line
+            if code in self._instrumented:
+                last_lines.pop(id(sys._getframe(1)), None)
+                return None
+            if self._counters_for(code.co_filename) is not None and _is_statement_code(code):
+                monitoring.set_local_events(self._tool_id, code, events.LINE)
+                self._instrumented.add(code)
+                last_lines.pop(id(sys._getframe(1)), None)
+                return None
+            # Other code objects only need to be looked at once
+            return monitoring.DISABLE
+
+        def on_line(code, line_number):
+            lines, arcs = self._targets[code.co_filename]
+            lines[line_number] += 1
+            frame_id = id(sys._getframe(1))
+            previous = last_lines.get(frame_id)
+            if previous is not None:
+                arcs[previous, line_number] += 1
+            last_lines[frame_id] = line_number
+
+        monitoring.use_tool_id(self._tool_id, "code_to_flowchart")
+        monitoring.register_callback(self._tool_id, events.PY_START, on_start)
+        monitoring.register_callback(self._tool_id, events.LINE, on_line)
+        monitoring.set_events(self._tool_id, events.PY_START)
+
+    def _stop_monitoring(self) -> None:
+        """Unregister the sys.monitoring tool."""
+        if self._tool_id is None:
+            return
+        monitoring = sys.monitoring
+        monitoring.set_events(self._tool_id, monitoring.events.NO_EVENTS)
+        for code in self._instrumented:
+            monitoring.set_local_events(self._tool_id, code, monitoring.events.NO_EVENTS)
+        monitoring.register_callback(self._tool_id, monitoring.events.PY_START, None)
+        monitoring.register_callback(self._tool_id, monitoring.events.LINE, None)
+        monitoring.free_tool_id(self._tool_id)
+        self._tool_id = None
+        self._instrumented = set()
+        self._last_lines = {}
+
+    def _global_trace(self, frame, event, arg):
+        """sys.settrace hook: only frames from the charted files get a line tracer."""
+        counters = self._counters_for(frame.f_code.co_filename)
+        if counters is None or not _is_statement_code(frame.f_code):
+            return None
+        lines, arcs = counters
+        # Every call, and every resumption of a generator, gets its own tracer
+        previous: Optional[int] = None
+
+        def local_trace(frame, event, arg):
+            nonlocal previous
+            if event == "line":
+                lines[frame.f_lineno] += 1
+                if previous is not None:
+                    arcs[previous, frame.f_lineno] += 1
+                previous = frame.f_lineno
+            return local_trace
+
+        return local_trace
+
+
+def run_command(command: List[str]) -> int:
+    """
+    Run a script or module in this process, like `python script.py ...` or `python -m module ...`.
+
+    Args:
+        command: The script path or "-m" and a module name, followed by its arguments
+
+    Returns:
+        The exit status of the command
+
+    Raises:
+        ValueError: If the command is empty
+    """
+    if not command or command == ["-m"]:
+        raise ValueError("Empty trace command")
+
+    saved_argv, saved_path = sys.argv[:], sys.path[:]
+    try:
+        if command[0] == "-m":
+            sys.argv = command[1:]
+            sys.path.insert(0, os.getcwd())
+            runpy.run_module(command[1], run_name="__main__", alter_sys=True)
+        else:
+            sys.argv = command[:]
+            sys.path.insert(0, os.path.dirname(os.path.abspath(command[0])))
+            runpy.run_path(command[0], run_name="__main__")
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        return 1
+    finally:
+        sys.argv, sys.path[:] = saved_argv, saved_path
+    return 0
+
+
+def apply_branch_counts(graph: Dict[str, Any], line_counts: Dict[int, int],
+                        arc_counts: Dict[Tuple[int, int], int]) -> int:
+    """
+    Annotate a parsed graph with execution counts.
+
+    If/for/while nodes count the executions of their own line, except
+    nodes the executions of their handler's first statement. True/false
+    edges and the edge into a loop body count the transitions from the
+    test line to the first line of the branch, so a branch whose body is a
+    loop still counts once per test. Exception edges count the `except`
+    line, i.e. how often an exception reached the handler. A branch whose
+    body starts on the same line as its test cannot be told apart and is
+    left without a count.
+
+    Counted nodes and edges get a "count"; counted edges also get a
+    "width" multiplier on a log scale up to MAX_EDGE_WIDTH.
+
+    Args:
+        graph: The PythonParser structure, with source spans; modified in place
+        line_counts: Line execution counts of the graph's file, from BranchTracer.counts_for
+        arc_counts: Line transition counts of the graph's file, from BranchTracer.arcs_for
+
+    Returns:
+        The number of counted nodes
+    """
+    nodes = {node["id"]: node for node in graph.get("nodes", [])}
+    first_child: Dict[Any, Any] = {}
+    for edge in graph.get("edges", []):
+        first_child.setdefault(edge["from"], edge["to"])
+
+    counted = 0
+    for node in nodes.values():
+        if node.get("type") not in COUNTED_NODE_TYPES or node.get("lineno") is None:
+            continue
+        line = node["lineno"]
+        if node["type"] == "except":
+            body = nodes.get(first_child.get(node["id"]))
+            line = body.get("lineno") if body is not None else None
+        if line is not None:
+            node["count"] = line_counts.get(line, 0)
+            counted += 1
+
+    counted_edges = []
+    for edge in graph.get("edges", []):
+        source, target = nodes.get(edge["from"]), nodes.get(edge["to"])
+        if source is None or target is None:
+            continue
+        is_loop_body = source.get("type") in LOOP_NODE_TYPES and first_child.get(source["id"]) == target["id"]
+        if edge.get("type") not in COUNTED_EDGE_TYPES and not is_loop_body:
+            continue
+        line = target.get("lineno")
+        if line is None or line == source.get("lineno"):
+            continue
+        if edge.get("type") == "exception":
+            edge["count"] = line_counts.get(line, 0)
+        else:
+            edge["count"] = arc_counts.get((source.get("lineno"), line), 0)
+        counted_edges.append(edge)
+
+    highest = max((edge["count"] for edge in counted_edges), default=0)
+    for edge in counted_edges:
+        scale = math.log1p(edge["count"]) / math.log1p(highest) if highest else 0
+        edge["width"] = round(1 + (MAX_EDGE_WIDTH - 1) * scale, 3)
+    return counted
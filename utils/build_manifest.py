@@ -0,0 +1,199 @@
+"""
+Build manifest for the Code to Flowchart tool.
+Records what every output was rendered from, so unchanged outputs are skipped on the next run.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Any, Optional
+
+from parsers.python_parser import PARSER_VERSION
+from utils.archive_utils import split_member_path
+from utils.file_utils import SourceFile
+
+# Bump when the manifest layout changes; older manifests are then ignored
+MANIFEST_VERSION = 1
+
+# File name of the manifest when it is kept in the output directory
+MANIFEST_NAME = ".flowchart_manifest.json"
+
+
+def _fingerprint(path: str) -> Optional[str]:
+    """
+    Summarize an output's size and modification time without reading it.
+
+    Directories such as tile pyramids are summarized file by file.
+
+    Returns:
+        The fingerprint, or None if the output does not exist
+    """
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+    if not os.path.isdir(path):
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    for directory, _, names in sorted(os.walk(path)):
+        for name in sorted(names):
+            file_path = os.path.join(directory, name)
+            stat = os.stat(file_path)
+            digest.update(f"{os.path.relpath(file_path, path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _content_hash(path: str) -> Optional[str]:
+    """
+    Hash an output's contents; directories are hashed over their file names and contents.
+
+    Returns:
+        The hex digest, or None if the output does not exist
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if os.path.isfile(path):
+        files = [(os.path.basename(path), path)]
+    elif os.path.isdir(path):
+        files = sorted((os.path.relpath(os.path.join(directory, name), path), os.path.join(directory, name))
+                       for directory, _, names in os.walk(path) for name in names)
+    else:
+        return None
+    for name, file_path in files:
+        digest.update(name.encode("utf-8") + b"\0")
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    A JSON record of the inputs and contents of every rendered output.
+
+    For each output path the manifest keeps the source file and the hash of
+    its contents, PARSER_VERSION, the theme, the format and the render
+    options, together with the hash of the output itself. An output is up
+    to date when all of these are unchanged and the file still has its
+    recorded contents.
+
+    Checks take a stat fast path: a source whose size and modification
+    time match the manifest is not read again, and an output whose size and
+    modification time match is not hashed again, so a run where nothing
+    changed costs one stat per file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Load the manifest, or start an empty one.
+
+        Args:
+            path: Path to the manifest file; a missing, unreadable or
+                outdated manifest just means everything is rebuilt
+        """
+        self.path = path
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.outputs: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return
+        if isinstance(manifest, dict) and manifest.get("version") == MANIFEST_VERSION:
+            self.sources = manifest.get("sources", {})
+            self.outputs = manifest.get("outputs", {})
+
+    def source_hash(self, source_file: str, data: Optional[bytes] = None) -> str:
+        """
+        Get the hash of a source file's contents, reading it only if its size or modification time changed.
+
+        Archive members are checked against the stat of their archive.
+
+        Args:
+            source_file: Path to the source code file, or an "archive!/member" selector
+            data: The file contents if already read
+
+        Returns:
+            The hex digest, as from SourceFile.digest
+        """
+        stat = os.stat(split_member_path(source_file)[0])
+        fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+        record = self.sources.get(source_file)
+        if record is not None and record["fingerprint"] == fingerprint:
+            return record["hash"]
+        with SourceFile(source_file, data) as source:
+            digest = source.digest()
+        self.sources[source_file] = {"fingerprint": fingerprint, "hash": digest}
+        return digest
+
+    @staticmethod
+    def inputs(source_file: str, source_hash: str, theme: Optional[str], output_format: str,
+               options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Describe everything an output is rendered from.
+
+        Args:
+            source_file: Path to the source code file
+            source_hash: Hash of its contents, from source_hash
+            theme: The color scheme, None for theme-independent outputs
+            output_format: The output format
+            options: Other settings that change the output, e.g. the backend; must be JSON values
+
+        Returns:
+            The inputs as recorded in the manifest
+        """
+        return {
+            "source": source_file,
+            "source_hash": source_hash,
+            "parser_version": PARSER_VERSION,
+            "theme": theme,
+            "format": output_format,
+            "options": options
+        }
+
+    def is_up_to_date(self, output_path: str, inputs: Dict[str, Any]) -> bool:
+        """
+        Tell whether an output can be skipped.
+
+        Args:
+            output_path: Path to the output
+            inputs: The current inputs, from `inputs`
+
+        Returns:
+            True if the output was rendered from the same inputs and still has its recorded contents
+        """
+        record = self.outputs.get(output_path)
+        if record is None or any(record.get(key) != value for key, value in inputs.items()):
+            return False
+        fingerprint = _fingerprint(output_path)
+        if fingerprint is None:
+            return False
+        if fingerprint == record["fingerprint"]:
+            return True
+        # Touched but perhaps not changed, e.g. by a checkout; compare the contents
+        if _content_hash(output_path) != record["hash"]:
+            return False
+        record["fingerprint"] = fingerprint
+        return True
+
+    def record(self, output_path: str, inputs: Dict[str, Any]) -> None:
+        """
+        Record a freshly rendered output.
+
+        Args:
+            output_path: Path to the output
+            inputs: The inputs it was rendered from, from `inputs`
+        """
+        content_hash = _content_hash(output_path)
+        if content_hash is None:
+            self.outputs.pop(output_path, None)
+            return
+        self.outputs[output_path] = dict(inputs, hash=content_hash, fingerprint=_fingerprint(output_path))
+
+    def save(self) -> None:
+        """Write the manifest, replacing the old one only once the new one is complete."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp{os.getpid()}"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"version": MANIFEST_VERSION, "sources": self.sources, "outputs": self.outputs}, file)
+        os.replace(temporary_path, self.path)
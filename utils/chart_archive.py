@@ -0,0 +1,311 @@
+"""
+Chart archives for the Code to Flowchart tool.
+Bundles the charts of a batch run into one zip or tar file with a JSON index, and reads single charts back out.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import time
+import zipfile
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.archive_utils import is_tar_archive
+
+# Name of the index member, written last
+INDEX_MEMBER = "index.json"
+
+# Bump when the index layout changes
+INDEX_VERSION = 1
+
+# Outputs that are compressed already and are stored as they are in zip files
+_STORED_SUFFIXES = (".png", ".pdf", ".gz")
+
+# tarfile write modes by suffix; plain ".tar" is written uncompressed
+_TAR_MODES = ((".tar.gz", "w:gz"), (".tgz", "w:gz"), (".tar.bz2", "w:bz2"), (".tbz2", "w:bz2"),
+              (".tar.xz", "w:xz"), (".txz", "w:xz"))
+
+
+def output_digest(data: bytes) -> str:
+    """Hash the contents of one chart file, like SourceFile.digest."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _tar_mode(path: str) -> str:
+    lowered = path.lower()
+    return next((mode for suffix, mode in _TAR_MODES if lowered.endswith(suffix)), "w")
+
+
+class ChartArchiveWriter:
+    """
+    Writer adding rendered charts to a single zip or tar file.
+
+    Charts are appended one at a time as they are rendered, so a batch run
+    never holds more than one chart in memory. Every member is recorded in
+    an index with the source it was charted from, the symbol (None for a
+    whole file), theme, format, size and content hash, which is written as
+    INDEX_MEMBER when the writer is closed. The archive type follows the
+    file name: tar (optionally .gz, .bz2 or .xz) or zip otherwise.
+    """
+
+    def __init__(self, path: str):
+        """
+        Create the archive.
+
+        Args:
+            path: Path to the archive file; it is overwritten
+        """
+        self.path = path
+        self.entries: List[Dict[str, Any]] = []
+        self._members = set()
+        if is_tar_archive(path):
+            self._tar: Optional[tarfile.TarFile] = tarfile.open(path, _tar_mode(path))
+            self._zip: Optional[zipfile.ZipFile] = None
+        else:
+            self._tar = None
+            self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+
+    def _write(self, member: str, data: bytes) -> None:
+        if self._zip is not None:
+            compression = zipfile.ZIP_STORED if member.lower().endswith(_STORED_SUFFIXES) else zipfile.ZIP_DEFLATED
+            self._zip.writestr(member, data, compress_type=compression)
+        else:
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(data))
+
+    def add(self, member: str, data: bytes, source: str, symbol: Optional[str] = None,
+            theme: Optional[str] = None, output_format: Optional[str] = None,
+            source_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Add one chart file.
+
+        Args:
+            member: Name of the file inside the archive, which is also its key
+            data: The file contents
+            source: The source file the chart was made from
+            symbol: Qualified name of the charted definition, None for the whole file
+            theme: The color scheme, None for theme-independent outputs
+            output_format: The output format, e.g. "png" or "tiles"
+            source_hash: Hash of the source file contents, from SourceFile.digest
+
+        Returns:
+            The index entry
+
+        Raises:
+            ValueError: If the archive already has a member of that name
+        """
+        if member in self._members or member == INDEX_MEMBER:
+            raise ValueError(f"Duplicate archive member '{member}'")
+        self._write(member, data)
+        self._members.add(member)
+        entry = {
+            "member": member,
+            "source": source,
+            "symbol": symbol,
+            "theme": theme,
+            "format": output_format,
+            "size": len(data),
+            "hash": output_digest(data),
+            "source_hash": source_hash
+        }
+        self.entries.append(entry)
+        return entry
+
+    def add_outputs(self, outputs: List[Tuple[Optional[str], str, str]], staging_dir: str, source: str,
+                    symbol: Optional[str] = None, source_hash: Optional[str] = None) -> int:
+        """
+        Move rendered outputs from a staging directory into the archive.
+
+        Member names are the output paths relative to the staging directory.
+        Directory outputs such as tile pyramids add one member per file.
+        The staged files are deleted once added.
+
+        Args:
+            outputs: List of (theme, output_path, output_format) tuples under staging_dir
+            staging_dir: Directory the outputs were rendered into
+            source: The source file the charts were made from
+            symbol: Qualified name of the charted definition, None for the whole file
+            source_hash: Hash of the source file contents
+
+        Returns:
+            The number of members added
+        """
+        added = 0
+        for theme, output_path, output_format in outputs:
+            if os.path.isdir(output_path):
+                files = sorted(os.path.join(directory, name)
+                               for directory, _, names in os.walk(output_path) for name in names)
+            elif os.path.isfile(output_path):
+                files = [output_path]
+            else:
+                continue
+            for file_path in files:
+                with open(file_path, "rb") as file:
+                    data = file.read()
+                member = os.path.relpath(file_path, staging_dir).replace(os.sep, "/")
+                self.add(member, data, source, symbol, theme, output_format, source_hash)
+                added += 1
+            if os.path.isdir(output_path):
+                shutil.rmtree(output_path)
+            else:
+                os.remove(output_path)
+        return added
+
+    def close(self) -> None:
+        """Write the index and close the archive."""
+        if self._zip is None and self._tar is None:
+            return
+        self._write(INDEX_MEMBER, json.dumps({"version": INDEX_VERSION, "charts": self.entries},
+                                             indent=2).encode("utf-8"))
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        else:
+            self._tar.close()
+            self._tar = None
+
+    def __enter__(self) -> "ChartArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ChartArchive:
+    """
+    Reader for archives written by ChartArchiveWriter.
+
+    Only the index is read on opening; `read` then fetches one member.
+    Zip members are found through the central directory, and members of
+    uncompressed tar files by seeking past the others, so a single chart
+    comes out without unpacking the rest.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open an archive and load its index.
+
+        Args:
+            path: Path to the archive file
+
+        Raises:
+            ValueError: If the archive has no chart index
+        """
+        self.path = path
+        if is_tar_archive(path):
+            self._tar: Optional[tarfile.TarFile] = tarfile.open(path)
+            self._zip: Optional[zipfile.ZipFile] = None
+        else:
+            self._tar = None
+            self._zip = zipfile.ZipFile(path)
+        try:
+            index = json.loads(self._read_member(INDEX_MEMBER))
+        except KeyError:
+            self.close()
+            raise ValueError(f"{path} has no {INDEX_MEMBER}; it was not written by --output-archive")
+        self.entries: List[Dict[str, Any]] = index["charts"]
+        self._by_member = {entry["member"]: entry for entry in self.entries}
+
+    def _read_member(self, member: str) -> bytes:
+        if self._zip is not None:
+            return self._zip.read(member)
+        extracted = self._tar.extractfile(member)
+        if extracted is None:
+            raise KeyError(member)
+        return extracted.read()
+
+    def keys(self) -> List[str]:
+        """List the member names of every chart file, in the order they were added."""
+        return [entry["member"] for entry in self.entries]
+
+    def entry(self, key: str) -> Dict[str, Any]:
+        """
+        Get the index entry of a chart file.
+
+        Raises:
+            KeyError: If there is no such chart
+        """
+        try:
+            return self._by_member[key]
+        except KeyError:
+            raise KeyError(f"No chart '{key}' in {self.path}")
+
+    def find(self, source: str, symbol: Optional[str] = None, theme: Optional[str] = None,
+             output_format: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Look up the charts of a source file or definition.
+
+        Args:
+            source: The source file, as given to the batch run
+            symbol: Qualified name of the definition, None for whole-file charts
+            theme: Only this color scheme, if set
+            output_format: Only this output format, if set
+
+        Returns:
+            The matching index entries
+        """
+        return [
+            entry for entry in self.entries
+            if entry["source"] == source and entry["symbol"] == symbol
+            and theme in (None, entry["theme"]) and output_format in (None, entry["format"])
+        ]
+
+    def read(self, key: str, verify: bool = True) -> bytes:
+        """
+        Read one chart file.
+
+        Args:
+            key: The member name, from `keys` or an index entry
+            verify: Check the contents against the hash in the index
+
+        Returns:
+            The file contents
+
+        Raises:
+            KeyError: If there is no such chart
+            ValueError: If the contents do not match the index
+        """
+        entry = self.entry(key)
+        data = self._read_member(key)
+        if verify and output_digest(data) != entry["hash"]:
+            raise ValueError(f"Chart '{key}' in {self.path} does not match its index hash")
+        return data
+
+    def extract(self, key: str, output_path: str) -> str:
+        """
+        Write one chart file to disk.
+
+        Args:
+            key: The member name
+            output_path: Where to write it
+
+        Returns:
+            The output path
+        """
+        data = self.read(key)
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output_path, "wb") as file:
+            file.write(data)
+        return output_path
+
+    def close(self) -> None:
+        """Close the archive file."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+
+    def __enter__(self) -> "ChartArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,151 @@
+"""
+Coverage overlay for the Code to Flowchart tool.
+Reads line and arc data from a coverage.py `.coverage` database and grays out what never ran.
+"""
+
+import os
+import sqlite3
+from bisect import bisect_left
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from utils.file_utils import PathMatcher
+from utils.graph_stats import FUNCTION_TYPES
+
+# Fill color of nodes and edges that never ran
+UNCOVERED_COLOR = "#d0d0d0"
+
+
+def numbits_to_lines(numbits: bytes) -> List[int]:
+    """
+    Decode coverage.py's numbits format: bit k of byte n marks line 8 * n + k.
+
+    Args:
+        numbits: The encoded line set
+
+    Returns:
+        The line numbers, ascending
+    """
+    return [
+        index * 8 + bit
+        for index, byte in enumerate(numbits) if byte
+        for bit in range(8) if byte & (1 << bit)
+    ]
+
+
+class CoverageData:
+    """Read-only access to a coverage.py SQLite data file, shared by every charted file."""
+
+    def __init__(self, path: str):
+        """
+        Open the data file and read its file table.
+
+        Args:
+            path: Path to the `.coverage` file
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Coverage data not found: {path}")
+        self._connection = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        self._file_ids = {
+            recorded: file_id for file_id, recorded in self._connection.execute("SELECT id, path FROM file")
+        }
+        self._paths = PathMatcher(self._file_ids)
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def __enter__(self) -> "CoverageData":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def lines_for(self, source_file: str) -> Optional[Tuple[List[int], Optional[Set[Tuple[int, int]]]]]:
+        """
+        Get the executed lines and arcs of a source file in one query.
+
+        Data measured with `--branch` only has arcs; the executed lines are
+        then derived from them.
+
+        Args:
+            source_file: Path to the charted source file
+
+        Returns:
+            Tuple of (executed lines ascending, executed arcs or None without
+            branch data), or None if the file was not measured
+        """
+        path = self._paths.match(source_file)
+        if path is None:
+            return None
+        file_id = self._file_ids[path]
+
+        lines: Set[int] = set()
+        arcs: Optional[Set[Tuple[int, int]]] = None
+        rows = self._connection.execute(
+            "SELECT numbits, NULL, NULL FROM line_bits WHERE file_id = ? "
+            "UNION ALL SELECT NULL, fromno, tono FROM arc WHERE file_id = ?",
+            (file_id, file_id)
+        )
+        for numbits, from_line, to_line in rows:
+            if numbits is not None:
+                lines.update(numbits_to_lines(numbits))
+            else:
+                if arcs is None:
+                    arcs = set()
+                arcs.add((from_line, to_line))
+                # Negative line numbers mark entries into and exits from code objects
+                lines.update(line for line in (from_line, to_line) if line > 0)
+        return sorted(lines), arcs
+
+
+def apply_coverage_overlay(graph: Dict[str, Any], lines: List[int],
+                           arcs: Optional[Set[Tuple[int, int]]] = None) -> int:
+    """
+    Gray out the nodes and edges of a parsed graph that never ran.
+
+    A node ran if an executed line falls inside its span; for functions the
+    `def` line itself does not count, since it runs on import. The join
+    bisects the sorted executed lines once per node. With arc data a
+    true/false edge ran if the arc from the test to the first line of the
+    branch was taken; otherwise, and for other edges, an edge ran if its
+    target did.
+
+    Args:
+        graph: The PythonParser structure, with source spans; modified in place
+        lines: Executed lines, ascending
+        arcs: Executed (from line, to line) arcs, if measured
+
+    Returns:
+        The number of nodes grayed out
+    """
+    nodes = {node["id"]: node for node in graph.get("nodes", [])}
+
+    def ran(node: Dict[str, Any]) -> bool:
+        if node.get("lineno") is None:
+            return True
+        first = node["lineno"] + (1 if node.get("type") in FUNCTION_TYPES else 0)
+        last = node.get("end_lineno") or node["lineno"]
+        position = bisect_left(lines, first)
+        return position < len(lines) and lines[position] <= last
+
+    executed = {node_id: ran(node) for node_id, node in nodes.items()}
+    for node_id, node in nodes.items():
+        node["covered"] = executed[node_id]
+        if not executed[node_id]:
+            node["color"] = UNCOVERED_COLOR
+
+    for edge in graph.get("edges", []):
+        source, target = nodes.get(edge["from"]), nodes.get(edge["to"])
+        if source is None or target is None:
+            continue
+        taken = executed[edge["from"]] and executed[edge["to"]]
+        if taken and arcs is not None and edge.get("type") in ("true", "false"):
+            taken = (source.get("lineno"), target.get("lineno")) in arcs
+        edge["covered"] = taken
+        if not taken:
+            edge["color"] = UNCOVERED_COLOR
+
+    return sum(1 for value in executed.values() if not value)
@@ -0,0 +1,209 @@
+"""
+Outline and detail charts for the Code to Flowchart tool.
+Charts a large module as a quick outline plus per-function detail charts, rendered on demand and cached by function hash.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from parsers.outline_scanner import OutlineScanner, parse_symbol
+from parsers.python_parser import PARSER_VERSION
+from utils.file_utils import ensure_dir_exists
+from utils.graph_partition import extract_subtree, qualified_names
+from utils.graph_stats import FUNCTION_TYPES
+
+# Bump when detail charts of the same code would come out differently
+DETAIL_CACHE_VERSION = 1
+
+
+def _output_paths(cache_base: str, theme: str, formats: List[str]) -> List[Tuple[str, str, str]]:
+    """List the (theme, path, format) outputs of one detail chart; mirrors plan_outputs for one theme."""
+    outputs = []
+    for output_format in formats:
+        if output_format == "tiles":
+            outputs.append((theme, f"{cache_base}_tiles", output_format))
+        elif output_format == "pages":
+            outputs.append((theme, f"{cache_base}_pages.pdf", output_format))
+        else:
+            outputs.append((theme, f"{cache_base}.{output_format}", output_format))
+    return outputs
+
+
+def render_detail_chart(body: str, node: Dict[str, Any], outputs: List[Tuple[str, str, str]],
+                        render: Callable, render_options: Dict[str, Any]) -> List[str]:
+    """
+    Parse one function and render its detail chart into the cache.
+
+    Everything is written under temporary names first and then renamed, so
+    an interrupted run never leaves a chart that looks cached. This is a
+    module-level function so it can run in a worker process.
+
+    Args:
+        body: The function's source lines
+        node: The function's outline node
+        outputs: The final (theme, path, format) outputs
+        render: The render function, called like render_outputs(graph, outputs, **render_options)
+        render_options: Keyword arguments for the render function
+
+    Returns:
+        The output paths
+    """
+    graph = parse_symbol("\n" * (node["lineno"] - 1) + body, node)
+    suffix = f".tmp{os.getpid()}"
+    render(graph, [(theme, path + suffix, output_format) for theme, path, output_format in outputs],
+           **render_options)
+    for _, path, _ in outputs:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(path + suffix, path)
+    return [path for _, path, _ in outputs]
+
+
+class DetailCharts:
+    """
+    A module charted as an outline plus one detail chart per function.
+
+    The outline comes from OutlineScanner and is available at once. Detail
+    charts are parsed and rendered only when asked for, with `chart` one
+    at a time or with `chart_all` in parallel, and land in a cache
+    directory under the hash of the function's source and the render
+    options, so a function that did not change is never rendered twice,
+    even when it moved within the file or to another file.
+    """
+
+    def __init__(self, source_code: str, cache_dir: str, render: Callable,
+                 themes: Optional[List[str]] = None, formats: Optional[List[str]] = None,
+                 render_options: Optional[Dict[str, Any]] = None):
+        """
+        Scan the outline.
+
+        Args:
+            source_code: The Python source code
+            cache_dir: Directory holding the cached detail charts
+            render: The render function, called like render_outputs(graph, outputs, **render_options)
+            themes: The color schemes to render (default: standard)
+            formats: The output formats to render (default: png)
+            render_options: Keyword arguments for the render function, e.g. the backend
+        """
+        self.cache_dir = cache_dir
+        self.themes = themes or ["standard"]
+        self.formats = formats or ["png"]
+        self.outline = OutlineScanner().scan(source_code)
+        self._lines = source_code.split("\n")
+        self._render = render
+        self._render_options = render_options or {}
+
+        names = qualified_names(self.outline)
+        self.functions: Dict[str, Dict[str, Any]] = {
+            names[node["id"]]: node for node in self.outline["nodes"] if node["type"] in FUNCTION_TYPES
+        }
+
+    def outline_chart(self) -> Dict[str, Any]:
+        """
+        Get the module-level outline: classes, functions and top-level blocks, with function bodies left out.
+
+        Returns:
+            A PythonParser-style structure
+        """
+        module = self.outline["nodes"][0]["id"]
+        return extract_subtree(self.outline, module, tuple(FUNCTION_TYPES))
+
+    def _body(self, qualname: str) -> str:
+        node = self.functions[qualname]
+        return "\n".join(self._lines[node["lineno"] - 1:node["end_lineno"]])
+
+    def function_hash(self, qualname: str) -> str:
+        """
+        Hash a function's source together with everything that affects its chart.
+
+        Args:
+            qualname: Qualified name of the function, e.g. "Box.put"
+
+        Returns:
+            The hex digest naming its cached charts
+        """
+        node = self.functions[qualname]
+        digest = hashlib.blake2b(digest_size=16)
+        header = [DETAIL_CACHE_VERSION, PARSER_VERSION, node.get("col_offset", 0), self._render_options]
+        digest.update(json.dumps(header, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(self._body(qualname).encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def outputs(self, qualname: str) -> List[Tuple[str, str, str]]:
+        """
+        List the cached (theme, path, format) outputs of a function's detail chart.
+
+        Args:
+            qualname: Qualified name of the function
+
+        Returns:
+            The outputs, one per theme and format
+        """
+        base = os.path.join(self.cache_dir, self.function_hash(qualname))
+        return [output for theme in self.themes for output in _output_paths(f"{base}_{theme}", theme, self.formats)]
+
+    def is_cached(self, qualname: str) -> bool:
+        """Tell whether every output of a function's detail chart is already in the cache."""
+        return all(os.path.exists(path) for _, path, _ in self.outputs(qualname))
+
+    def chart(self, qualname: str) -> List[str]:
+        """
+        Get a function's detail chart, rendering it on first request.
+
+        Args:
+            qualname: Qualified name of the function
+
+        Returns:
+            The output paths
+
+        Raises:
+            KeyError: If there is no such function
+        """
+        if qualname not in self.functions:
+            raise KeyError(f"No function named '{qualname}'")
+        outputs = self.outputs(qualname)
+        if not self.is_cached(qualname):
+            ensure_dir_exists(self.cache_dir)
+            render_detail_chart(self._body(qualname), self.functions[qualname], outputs,
+                                self._render, self._render_options)
+        return [path for _, path, _ in outputs]
+
+    def chart_all(self, max_workers: Optional[int] = None) -> Tuple[Dict[str, List[str]], Dict[str, Exception]]:
+        """
+        Render every detail chart not yet in the cache, in parallel.
+
+        Args:
+            max_workers: Number of worker processes (default: CPU count)
+
+        Returns:
+            Tuple of (output paths by qualified name, errors by qualified name)
+        """
+        charts: Dict[str, List[str]] = {}
+        errors: Dict[str, Exception] = {}
+        pending = {}
+        for qualname in self.functions:
+            outputs = self.outputs(qualname)
+            charts[qualname] = [path for _, path, _ in outputs]
+            if not self.is_cached(qualname):
+                # Functions with identical code share one chart; render it once
+                pending.setdefault(outputs[0][1], (qualname, outputs))
+        if not pending:
+            return charts, errors
+
+        ensure_dir_exists(self.cache_dir)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                qualname: executor.submit(render_detail_chart, self._body(qualname), self.functions[qualname],
+                                          outputs, self._render, self._render_options)
+                for qualname, outputs in pending.values()
+            }
+            for qualname, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[qualname] = e
+        return charts, errors
@@ -2,13 +2,121 @@
 File utility functions for the Code to Flowchart tool.
 """
 
+import hashlib
+import mmap
 import os
-from typing import Optional
+import tokenize
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from utils.archive_utils import split_member_path, read_member
+
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 1 << 20
+
+# Bytes-like source contents: bytes for small files, a read-only mmap for large ones
+SourceBuffer = Union[bytes, mmap.mmap]
+
+
+def detect_source_encoding(data: SourceBuffer) -> str:
+    """
+    Detect the encoding of Python source from its BOM or PEP 263 coding cookie.
+
+    Only the first two lines are looked at, as tokenize.detect_encoding does.
+
+    Args:
+        data: The raw source contents
+
+    Returns:
+        The encoding name, "utf-8" if none is declared or the declaration is invalid
+    """
+    def first_lines() -> Iterator[bytes]:
+        start = 0
+        for _ in range(2):
+            end = data.find(b"\n", start)
+            end = len(data) if end < 0 else end + 1
+            yield data[start:end]
+            start = end
+
+    lines = first_lines()
+    try:
+        encoding, _ = tokenize.detect_encoding(lambda: next(lines, b""))
+    except SyntaxError:
+        return "utf-8"
+    return encoding
+
+
+class SourceFile:
+    """
+    The contents of a source file, read once as bytes.
+
+    Files of at least MMAP_THRESHOLD bytes are memory-mapped, and
+    "archive!/inner/path.py" members are read straight from their archive.
+    The same buffer can be handed to ast.parse, which honours the coding
+    cookie itself, decoded with `text`, and hashed with `digest`, without
+    copies.
+    """
+
+    def __init__(self, file_path: str, data: Optional[bytes] = None):
+        """
+        Open and read (or map) a source file.
+
+        Args:
+            file_path: Path to the file, or an "archive!/member" selector
+            data: The contents if already read, e.g. in one pass over an archive
+
+        Raises:
+            FileNotFoundError: If the file or archive member does not exist
+        """
+        self.path = file_path
+        self._mmap: Optional[mmap.mmap] = None
+        archive, member = split_member_path(file_path)
+        if data is not None or member is not None:
+            self.data: SourceBuffer = data if data is not None else read_member(archive, member)
+            self.encoding = detect_source_encoding(self.data)
+            return
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size >= MMAP_THRESHOLD:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.data = self._mmap
+            else:
+                self.data = file.read()
+        self.encoding = detect_source_encoding(self.data)
+
+    def text(self) -> str:
+        """Decode the contents, falling back to latin-1 like read_file."""
+        return decode_source(self.data, self.encoding)
+
+    def is_decodable(self) -> bool:
+        """Tell whether the contents are valid in their detected encoding."""
+        try:
+            str(self.data, self.encoding)
+            return True
+        except (UnicodeDecodeError, LookupError):
+            return False
+
+    def digest(self) -> str:
+        """Hash the raw contents, e.g. for cache keys."""
+        return hashlib.blake2b(self.data, digest_size=16).hexdigest()
+
+    def close(self) -> None:
+        """Unmap the file, if it was mapped."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "SourceFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 
 def read_file(file_path: str) -> str:
     """
-    Read the contents of a file.
+    Read the contents of a source file.
+
+    The file is read once as bytes and decoded in the encoding its coding
+    cookie declares (UTF-8 by default), or as latin-1 if that fails.
     
     Args:
         file_path: Path to the file to read
@@ -20,13 +128,26 @@ def read_file(file_path: str) -> str:
         FileNotFoundError: If the file does not exist
         IOError: If there is an error reading the file
     """
+    with SourceFile(file_path) as source:
+        return source.text()
+
+
+def decode_source(data: SourceBuffer, encoding: Optional[str] = None) -> str:
+    """
+    Decode source code read as bytes, e.g. from a git object.
+
+    Args:
+        data: The raw file contents
+        encoding: The encoding, detected from the contents if not given
+
+    Returns:
+        The contents as a string, decoded like read_file does
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-    except UnicodeDecodeError:
-        # Try with a different encoding if UTF-8 fails
-        with open(file_path, 'r', encoding='latin-1') as file:
-            return file.read()
+        return str(data, encoding or detect_source_encoding(data))
+    except (UnicodeDecodeError, LookupError):
+        # Undeclared legacy encodings: every byte is valid latin-1
+        return str(data, 'latin-1')
 
 
 def write_file(file_path: str, content: str) -> None:
@@ -80,3 +201,59 @@ def is_python_file(file_path: str) -> bool:
         True if the file is a Python file, False otherwise
     """
     return get_file_extension(file_path).lower() == "py"
+
+
+def _path_parts(path: str) -> Tuple[str, ...]:
+    """Split a path into normalized components, so paths can be compared from the end."""
+    return tuple(part for part in os.path.normcase(os.path.abspath(path)).split(os.sep) if part)
+
+
+class PathMatcher:
+    """
+    Finds which of a set of recorded paths (from a profile, a coverage
+    database, ...) refers to a given source file.
+
+    Recorded paths are often relative to another working directory or from
+    another checkout, so when there is no exact match the path sharing the
+    longest trailing part with the file wins; ties count as no match.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        """
+        Index the recorded paths.
+
+        Args:
+            paths: The recorded paths
+        """
+        self._exact: Dict[Tuple[str, ...], str] = {}
+        self._by_basename: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+        for path in paths:
+            parts = _path_parts(path)
+            if parts and parts not in self._exact:
+                self._exact[parts] = path
+                self._by_basename.setdefault(parts[-1], []).append((parts, path))
+
+    def match(self, source_file: str) -> Optional[str]:
+        """
+        Find the recorded path for a source file.
+
+        Args:
+            source_file: Path to the source file
+
+        Returns:
+            The matching recorded path, or None
+        """
+        target = _path_parts(source_file)
+        if target in self._exact:
+            return self._exact[target]
+
+        best, best_length, tied = None, 0, False
+        for parts, path in self._by_basename.get(target[-1], []) if target else []:
+            length = 0
+            while length < min(len(parts), len(target)) and parts[-1 - length] == target[-1 - length]:
+                length += 1
+            if length > best_length:
+                best, best_length, tied = path, length, False
+            elif length == best_length:
+                tied = True
+        return None if tied else best
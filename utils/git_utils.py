@@ -0,0 +1,160 @@
+"""
+Git helpers for the Code to Flowchart tool.
+Reads changed files, changed line ranges and file contents from a local repository with git plumbing.
+"""
+
+import os
+import re
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+from utils.file_utils import is_python_file
+
+# New-side start and length of a unified diff hunk; the length defaults to 1
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def _git(args: List[str], cwd: Optional[str] = None, stdin: Optional[bytes] = None,
+         config: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Run a git command and return its standard output.
+
+    Raises:
+        RuntimeError: If git is not installed or the command fails
+    """
+    options = [option for key, value in (config or {}).items() for option in ("-c", f"{key}={value}")]
+    try:
+        result = subprocess.run(["git", *options, *args], cwd=cwd, input=stdin, capture_output=True)
+    except FileNotFoundError:
+        raise RuntimeError("git binary not found")
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", "replace").strip() or f"exit status {result.returncode}"
+        raise RuntimeError(f"git {args[0]} failed: {message}")
+    return result.stdout
+
+
+def split_revision_range(rev_range: str) -> Tuple[str, Optional[str]]:
+    """
+    Split an "A..B" or "A...B" range into its two revisions.
+
+    Args:
+        rev_range: The range; as in git, a missing end means HEAD, and a
+            single revision "A" compares A with the working tree
+
+    Returns:
+        Tuple of (old revision, new revision or None for the working tree)
+
+    Raises:
+        ValueError: If the old revision is missing
+    """
+    separator = "..." if "..." in rev_range else ".."
+    old, found, new = rev_range.partition(separator)
+    if not old:
+        raise ValueError(f"Invalid revision range '{rev_range}': the old revision is missing")
+    if not found:
+        return old, None
+    return old, new or "HEAD"
+
+
+def repository_root(cwd: Optional[str] = None) -> str:
+    """
+    Find the top-level directory of the repository containing a directory.
+
+    Args:
+        cwd: Directory inside the repository, defaults to the current directory
+
+    Returns:
+        The absolute path of the repository root
+
+    Raises:
+        RuntimeError: If the directory is not inside a git repository
+    """
+    return _git(["rev-parse", "--show-toplevel"], cwd=cwd).decode("utf-8").strip()
+
+
+def changed_hunks(rev_range: str, pathspecs: Optional[List[str]] = None,
+                  cwd: Optional[str] = None) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    List the changed line ranges of every Python file changed in a revision range.
+
+    Uses a single `git diff -U0`, so hunks carry no context lines. Ranges are
+    on the new side; a hunk that only deletes lines becomes the line just
+    before the deletion, so the enclosing code is still found. Deleted
+    files are left out.
+
+    Args:
+        rev_range: "A..B", "A...B" (changes since the merge base), or "A"
+            to compare with the working tree
+        pathspecs: Limit the diff to these paths, relative to cwd
+        cwd: Directory inside the repository, defaults to the current directory
+
+    Returns:
+        Mapping of path relative to the repository root to (first, last)
+        line ranges, inclusive and ascending
+
+    Raises:
+        RuntimeError: If git fails, e.g. for an unknown revision
+    """
+    old, new = split_revision_range(rev_range)
+    revisions = [rev_range] if new is not None else [old]
+    output = _git(["diff", "-U0", "--no-color", "--no-ext-diff", "--diff-filter=d", *revisions,
+                   "--", *(pathspecs or [])], cwd=cwd, config={"core.quotepath": "off"})
+
+    hunks: Dict[str, List[Tuple[int, int]]] = {}
+    current: Optional[List[Tuple[int, int]]] = None
+    for line in output.decode("utf-8", "surrogateescape").splitlines():
+        if line.startswith("+++ "):
+            path = line[4:]
+            # "b/" prefix on the new side; /dev/null cannot occur with deletions filtered out
+            path = path[2:] if path.startswith("b/") else path
+            current = hunks.setdefault(path, []) if is_python_file(path) else None
+        elif line.startswith("@@") and current is not None:
+            match = _HUNK_HEADER.match(line)
+            if match is None:
+                continue
+            start = int(match.group(1))
+            length = int(match.group(2)) if match.group(2) is not None else 1
+            if length == 0:
+                current.append((max(start, 1), max(start, 1)))
+            else:
+                current.append((start, start + length - 1))
+    return {path: ranges for path, ranges in hunks.items() if ranges}
+
+
+def read_revision_files(paths: List[str], revision: Optional[str],
+                        root: str) -> Dict[str, bytes]:
+    """
+    Read several files as they are in a revision, with one git process.
+
+    Args:
+        paths: Paths relative to the repository root
+        revision: The revision, or None to read the working tree
+        root: The repository root
+
+    Returns:
+        Mapping of path to file contents
+
+    Raises:
+        RuntimeError: If git fails or a file does not exist in the revision
+    """
+    if revision is None:
+        contents = {}
+        for path in paths:
+            with open(os.path.join(root, path), "rb") as file:
+                contents[path] = file.read()
+        return contents
+
+    # cat-file --batch answers each "<rev>:<path>" line with a header and the blob
+    request = "".join(f"{revision}:{path}\n" for path in paths).encode("utf-8", "surrogateescape")
+    output = _git(["cat-file", "--batch"], cwd=root, stdin=request)
+    contents = {}
+    position = 0
+    for path in paths:
+        header_end = output.index(b"\n", position)
+        header = output[position:header_end].split()
+        if len(header) != 3:
+            raise RuntimeError(f"'{path}' not found in revision {revision}")
+        size = int(header[2])
+        contents[path] = output[header_end + 1:header_end + 1 + size]
+        position = header_end + 1 + size + 1
+    return contents
@@ -0,0 +1,77 @@
+"""
+Repeat compaction for the Code to Flowchart tool.
+Collapses runs of structurally identical sibling subtrees into one representative with a ×N badge.
+"""
+
+from typing import Dict, List, Any, Tuple
+
+from parsers.tree_hash import tree_children, subtree_hashes
+
+# Shortest run of identical siblings worth collapsing
+MIN_REPEAT = 2
+
+
+def collapse_repeats(graph: Dict[str, Any], ignore_literals: bool = False) -> int:
+    """
+    Collapse runs of identical sibling subtrees of a parsed graph.
+
+    Siblings reached through the same edge type whose subtrees have equal
+    hashes are replaced by the first of them, which gets a "repeat" count
+    and a span covering the whole run; the subtrees of the others are
+    dropped. Runs inside a representative are collapsed too, so drawing
+    cost follows the distinct structure rather than the file size.
+
+    Args:
+        graph: The PythonParser structure; modified in place
+        ignore_literals: Also treat subtrees differing only in string and
+            number literals as identical
+
+    Returns:
+        The number of nodes removed
+    """
+    children = tree_children(graph)
+    hashes, _ = subtree_hashes(graph, ignore_literals)
+    nodes = {node["id"]: node for node in graph.get("nodes", [])}
+
+    has_parent = {child for kids in children.values() for child, _ in kids}
+    stack = [node_id for node_id in nodes if node_id not in has_parent]
+    removed = set()
+    visited = set()
+    while stack:
+        node_id = stack.pop()
+        if node_id in visited:
+            continue
+        visited.add(node_id)
+
+        kids: List[Tuple[Any, str]] = children[node_id]
+        start = 0
+        while start < len(kids):
+            child, edge_type = kids[start]
+            end = start + 1
+            while end < len(kids) and kids[end][1] == edge_type and hashes[kids[end][0]] == hashes[child]:
+                end += 1
+            if end - start >= MIN_REPEAT:
+                representative, last = nodes[child], nodes[kids[end - 1][0]]
+                representative["repeat"] = end - start
+                for key in ("end_lineno", "end_col_offset"):
+                    if key in last:
+                        representative[key] = last[key]
+                for duplicate, _ in kids[start + 1:end]:
+                    removed.add(duplicate)
+            stack.append(child)
+            start = end
+
+    if not removed:
+        return 0
+
+    # Everything below a dropped duplicate goes too
+    stack = list(removed)
+    while stack:
+        for child, _ in children[stack.pop()]:
+            if child not in removed:
+                removed.add(child)
+                stack.append(child)
+
+    graph["nodes"] = [node for node in graph["nodes"] if node["id"] not in removed]
+    graph["edges"] = [edge for edge in graph["edges"] if edge["from"] not in removed and edge["to"] not in removed]
+    return len(removed)
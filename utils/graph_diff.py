@@ -0,0 +1,191 @@
+"""
+Structural diff for the Code to Flowchart tool.
+Matches two parsed versions of a file by subtree hash and builds one chart of what changed.
+"""
+
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, List, Any, Optional, Tuple
+
+from parsers.python_parser import SPAN_KEYS
+from parsers.tree_hash import tree_children, subtree_hashes
+
+# Fill colors by diff status; nodes with changes below them keep their theme color
+DIFF_COLORS = {
+    "added": "#a5d6a7",
+    "removed": "#ef9a9a",
+    "modified": "#ffe082",
+    "unchanged": "#eeeeee"
+}
+
+# Label prefixes, so the status does not depend on color alone
+DIFF_MARKERS = {
+    "added": "+ ",
+    "removed": "− ",
+    "modified": "~ "
+}
+
+
+def _roots(graph: Dict[str, Any], children: Dict[Any, List[Tuple[Any, str]]]) -> List[Any]:
+    has_parent = {child for kids in children.values() for child, _ in kids}
+    return [node["id"] for node in graph.get("nodes", []) if node["id"] not in has_parent]
+
+
+def _align(old_keys: List[bytes], new_keys: List[bytes]) -> List[Tuple[str, int, int, int, int]]:
+    """
+    Align two sibling lists by subtree hash, like difflib opcodes.
+
+    The common prefix and suffix are matched directly, so the usual case
+    of a few edited statements among many costs linear time.
+    """
+    prefix = 0
+    while prefix < min(len(old_keys), len(new_keys)) and old_keys[prefix] == new_keys[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < min(len(old_keys), len(new_keys)) - prefix
+           and old_keys[-1 - suffix] == new_keys[-1 - suffix]):
+        suffix += 1
+
+    opcodes = []
+    if prefix:
+        opcodes.append(("equal", 0, prefix, 0, prefix))
+    old_end, new_end = len(old_keys) - suffix, len(new_keys) - suffix
+    if prefix < old_end or prefix < new_end:
+        matcher = SequenceMatcher(None, old_keys[prefix:old_end], new_keys[prefix:new_end], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            opcodes.append((tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix))
+    if suffix:
+        opcodes.append(("equal", old_end, len(old_keys), new_end, len(new_keys)))
+    return opcodes
+
+
+def diff_graphs(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a chart of the differences between two parsed versions of a file.
+
+    Every subtree of both versions is hashed bottom-up; subtrees with equal
+    hashes are unchanged and are matched without being looked into.
+    Children of changed nodes are aligned by hash. Unmatched children of
+    the same type at the same place are compared recursively, the rest are
+    added or removed. Runs of unchanged siblings collapse into one node.
+
+    Added, removed and modified nodes get a "diff" status, a label marker
+    and a "color" override. Nodes that only changed further down keep their
+    look. Removed nodes keep the spans of the old version.
+
+    Args:
+        old: The PythonParser structure of the old version
+        new: The PythonParser structure of the new version
+
+    Returns:
+        A PythonParser-style structure with "nodes", "edges" and a "summary"
+        counting the added, removed, modified and unchanged nodes
+    """
+    old_children, new_children = tree_children(old), tree_children(new)
+    old_hashes, old_sizes = subtree_hashes(old)
+    new_hashes, new_sizes = subtree_hashes(new)
+    old_nodes = {node["id"]: node for node in old.get("nodes", [])}
+    new_nodes = {node["id"]: node for node in new.get("nodes", [])}
+
+    nodes: List[Dict[str, Any]] = []
+    edges: List[Dict[str, Any]] = []
+    summary = Counter({"added": 0, "removed": 0, "modified": 0, "unchanged": 0})
+
+    def emit(node_id: Any, source: Dict[str, Any], status: str, parent: Any, edge_type: str,
+             label: Optional[str] = None) -> None:
+        node = {"id": node_id, "type": source.get("type", "expr"), "label": source.get("label", "")}
+        node.update((key, source[key]) for key in SPAN_KEYS if key in source)
+        if label is not None:
+            node["label"] = label
+        node["diff"] = status
+        if status in DIFF_MARKERS:
+            node["label"] = DIFF_MARKERS[status] + node["label"]
+        if status in DIFF_COLORS:
+            node["color"] = DIFF_COLORS[status]
+        nodes.append(node)
+        if parent is not None:
+            edges.append({"from": parent, "to": node_id, "type": edge_type})
+
+    # Work items: (kind, old id, new id, output parent, edge type); processed in preorder
+    stack: List[Tuple[str, Any, Any, Any, str]] = []
+    old_roots, new_roots = _roots(old, old_children), _roots(new, new_children)
+    for old_root, new_root in zip(old_roots, new_roots):
+        stack.append(("pair", old_root, new_root, None, "normal"))
+    stack.extend(("removed", root, None, None, "normal") for root in old_roots[len(new_roots):])
+    stack.extend(("added", None, root, None, "normal") for root in new_roots[len(old_roots):])
+    stack.reverse()
+
+    while stack:
+        kind, old_id, new_id, parent, edge_type = stack.pop()
+
+        if kind == "added":
+            summary["added"] += 1
+            emit(new_id, new_nodes[new_id], "added", parent, edge_type)
+            stack.extend(("added", None, child, new_id, child_edge)
+                         for child, child_edge in reversed(new_children[new_id]))
+            continue
+
+        if kind == "removed":
+            summary["removed"] += 1
+            out_id = f"r{old_id}"
+            emit(out_id, old_nodes[old_id], "removed", parent, edge_type)
+            stack.extend(("removed", child, None, out_id, child_edge)
+                         for child, child_edge in reversed(old_children[old_id]))
+            continue
+
+        if kind == "unchanged":
+            # new_id holds the run of unchanged new siblings as (child id, edge type) pairs
+            run = new_id
+            total = sum(new_sizes[child] for child, _ in run)
+            summary["unchanged"] += total
+            first, first_edge = run[0]
+            if len(run) == 1:
+                label = new_nodes[first].get("label", "")
+                if total > 1:
+                    label += f"\n({total} nodes unchanged)"
+                emit(first, new_nodes[first], "unchanged", parent, first_edge, label)
+            else:
+                first_node, last_node = new_nodes[first], new_nodes[run[-1][0]]
+                span = {"type": "unchanged"}
+                if "lineno" in first_node and "end_lineno" in last_node:
+                    span.update(lineno=first_node["lineno"], end_lineno=last_node["end_lineno"])
+                emit(f"u{first}", span, "unchanged", parent, first_edge,
+                     f"{len(run)} unchanged statements ({total} nodes)")
+            continue
+
+        old_node, new_node = old_nodes[old_id], new_nodes[new_id]
+        if old_hashes[old_id] == new_hashes[new_id]:
+            stack.append(("unchanged", None, [(new_id, edge_type)], parent, edge_type))
+            continue
+
+        changed_here = (old_node.get("type"), old_node.get("label")) != (new_node.get("type"), new_node.get("label"))
+        if changed_here:
+            summary["modified"] += 1
+        emit(new_id, new_node, "modified" if changed_here else "changed_inside", parent, edge_type)
+
+        old_kids, new_kids = old_children[old_id], new_children[new_id]
+        items = []
+        for tag, i1, i2, j1, j2 in _align([old_hashes[child] for child, _ in old_kids],
+                                          [new_hashes[child] for child, _ in new_kids]):
+            if tag == "equal":
+                # Siblings reached through different edge types (true/false branches) stay apart
+                start = j1
+                for end in range(j1 + 1, j2 + 1):
+                    if end == j2 or new_kids[end][1] != new_kids[start][1]:
+                        items.append(("unchanged", None, new_kids[start:end], new_id, new_kids[start][1]))
+                        start = end
+                continue
+            paired = 0
+            if tag == "replace":
+                for (old_child, _), (new_child, new_edge) in zip(old_kids[i1:i2], new_kids[j1:j2]):
+                    if old_nodes[old_child].get("type") != new_nodes[new_child].get("type"):
+                        break
+                    items.append(("pair", old_child, new_child, new_id, new_edge))
+                    paired += 1
+            items.extend(("removed", old_child, None, new_id, old_edge)
+                         for old_child, old_edge in old_kids[i1 + paired:i2])
+            items.extend(("added", None, new_child, new_id, new_edge)
+                         for new_child, new_edge in new_kids[j1 + paired:j2])
+        stack.extend(reversed(items))
+
+    return {"nodes": nodes, "edges": edges, "summary": dict(summary)}
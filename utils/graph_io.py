@@ -0,0 +1,185 @@
+"""
+Graph interchange format for the Code to Flowchart tool.
+Streams parsed code graphs to and from compact, versioned JSON Lines files.
+
+The first line is a header object, which also holds the graph's heat
+legend, if any. Every following line is one record:
+
+    ["n", id, type, label]            a node
+    ["n", id, type, label, {...}]     a node with extra attributes (x, y, ...)
+    ["e", from, to, type]             an edge
+    ["e", from, to, type, {...}]      an edge with extra attributes (count, color, ...)
+
+Files whose name ends in ".gz" are gzip-compressed.
+"""
+
+import gzip
+import json
+from typing import Dict, Any, Iterator, Optional, Tuple, IO, Union
+
+
+FORMAT_NAME = "co_to_f-graph"
+FORMAT_VERSION = 1
+
+# Node and edge keys stored positionally; everything else goes into the extra object
+_NODE_KEYS = ("id", "type", "label")
+_EDGE_KEYS = ("from", "to", "type")
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    """
+    Open a graph file for text I/O, transparently handling gzip.
+
+    Args:
+        path: Path to the graph file
+        mode: "r" or "w"
+
+    Returns:
+        A text file object
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class GraphWriter:
+    """Streaming writer for graph files; use as a context manager."""
+
+    def __init__(self, target: Union[str, IO[str]], legend: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the writer.
+
+        Args:
+            target: Path to the graph file, or an open text file object
+            legend: The graph's "legend" from a heat overlay, if any
+        """
+        self._owns_file = isinstance(target, str)
+        self._file = _open(target, "w") if self._owns_file else target
+        self._encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+        header = {"format": FORMAT_NAME, "version": FORMAT_VERSION}
+        if legend:
+            header["legend"] = legend
+        self._write(header)
+
+    def __enter__(self) -> "GraphWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def write_node(self, node: Dict[str, Any]) -> None:
+        """
+        Write a single node record.
+
+        Args:
+            node: Node dictionary with at least id, type and label
+        """
+        record = ["n", node["id"], node["type"], node["label"]]
+        extra = {key: value for key, value in node.items() if key not in _NODE_KEYS}
+        if extra:
+            record.append(extra)
+        self._write(record)
+
+    def write_edge(self, edge: Dict[str, Any]) -> None:
+        """
+        Write a single edge record.
+
+        Args:
+            edge: Edge dictionary with from, to and optionally type
+        """
+        record = ["e", edge["from"], edge["to"], edge.get("type", "normal")]
+        extra = {key: value for key, value in edge.items() if key not in _EDGE_KEYS}
+        if extra:
+            record.append(extra)
+        self._write(record)
+
+    def close(self) -> None:
+        """Flush the writer and close the file if it was opened here."""
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def _write(self, record: Any) -> None:
+        self._file.write(self._encoder.encode(record))
+        self._file.write("\n")
+
+
+def write_graph(parsed_code: Dict[str, Any], target: Union[str, IO[str]]) -> None:
+    """
+    Write a parsed code graph to a graph file.
+
+    Args:
+        parsed_code: The parsed code structure from PythonParser
+        target: Path to the graph file, or an open text file object
+    """
+    with GraphWriter(target, parsed_code.get("legend")) as writer:
+        for node in parsed_code["nodes"]:
+            writer.write_node(node)
+        for edge in parsed_code["edges"]:
+            writer.write_edge(edge)
+
+
+def iter_graph(source: Union[str, IO[str]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream the records of a graph file.
+
+    Args:
+        source: Path to the graph file, or an open text file object
+
+    Yields:
+        ("legend", legend) first if the graph has a heat legend, then
+        ("node", node) and ("edge", edge) tuples in file order
+
+    Raises:
+        ValueError: If the file is not a supported graph file
+    """
+    file = _open(source, "r") if isinstance(source, str) else source
+    try:
+        try:
+            header = json.loads(file.readline() or "null")
+        except (UnicodeDecodeError, ValueError):
+            header = None
+        if not isinstance(header, dict) or header.get("format") != FORMAT_NAME:
+            raise ValueError("Not a flowchart graph file")
+        if header.get("version", 0) > FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph file version: {header.get('version')}")
+        if header.get("legend"):
+            yield "legend", header["legend"]
+
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record[0] == "n":
+                node = {"id": record[1], "type": record[2], "label": record[3]}
+                if len(record) > 4:
+                    node.update(record[4])
+                yield "node", node
+            elif record[0] == "e":
+                edge = {"from": record[1], "to": record[2], "type": record[3]}
+                if len(record) > 4:
+                    edge.update(record[4])
+                yield "edge", edge
+    finally:
+        if isinstance(source, str):
+            file.close()
+
+
+def read_graph(source: Union[str, IO[str]]) -> Dict[str, Any]:
+    """
+    Read a graph file into the structure produced by PythonParser.
+
+    Args:
+        source: Path to the graph file, or an open text file object
+
+    Returns:
+        A dictionary with "nodes" and "edges" lists, and the "legend" if there is one
+    """
+    graph = {"nodes": [], "edges": []}
+    for kind, item in iter_graph(source):
+        if kind == "legend":
+            graph["legend"] = item
+        else:
+            graph["nodes" if kind == "node" else "edges"].append(item)
+    return graph
@@ -0,0 +1,266 @@
+"""
+Graph partitioning for the Code to Flowchart tool.
+Splits large graphs into page-sized pieces while keeping functions together and cutting few edges,
+and cuts out the subgraphs of single definitions.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.graph_stats import FUNCTION_TYPES
+from utils.line_index import LineIndex
+
+
+def spanning_forest(graph: Dict[str, Any]) -> Tuple[List[Any], Dict[Any, Any]]:
+    """
+    Build a depth-first spanning forest of a graph.
+
+    Roots are the nodes without incoming edges, in file order; nodes only
+    reachable through a cycle start trees of their own.
+
+    Args:
+        graph: Dictionary with "nodes" and "edges" lists
+
+    Returns:
+        Tuple of (node ids in preorder, parent id by node id; None for roots)
+    """
+    nodes = graph.get("nodes", [])
+    children: Dict[Any, List[Any]] = {node["id"]: [] for node in nodes}
+    has_parent = set()
+    for edge in graph.get("edges", []):
+        if edge["from"] in children and edge["to"] in children:
+            children[edge["from"]].append(edge["to"])
+            has_parent.add(edge["to"])
+
+    roots = [node["id"] for node in nodes if node["id"] not in has_parent]
+    roots += [node["id"] for node in nodes]
+
+    order: List[Any] = []
+    parent: Dict[Any, Any] = {}
+    for root in roots:
+        if root in parent:
+            continue
+        parent[root] = None
+        stack = [root]
+        while stack:
+            node_id = stack.pop()
+            order.append(node_id)
+            for child in reversed(children[node_id]):
+                if child not in parent:
+                    parent[child] = node_id
+                    stack.append(child)
+    return order, parent
+
+
+def function_clusters(graph: Dict[str, Any]) -> Dict[Any, Any]:
+    """
+    Attribute every node to its nearest enclosing function.
+
+    Args:
+        graph: The PythonParser structure (function nodes have type "function")
+
+    Returns:
+        Mapping of node id to the id of its function node, or None for module level
+    """
+    order, parent = spanning_forest(graph)
+    types = {node["id"]: node.get("type") for node in graph.get("nodes", [])}
+
+    cluster: Dict[Any, Any] = {}
+    for node_id in order:
+        if types[node_id] in FUNCTION_TYPES:
+            cluster[node_id] = node_id
+        else:
+            cluster[node_id] = cluster[parent[node_id]] if parent[node_id] is not None else None
+    return cluster
+
+
+def partition_graph(graph: Dict[str, Any], max_nodes: int,
+                    clusters: Optional[Dict[Any, Any]] = None) -> List[List[Any]]:
+    """
+    Split a graph into pages of at most `max_nodes` nodes.
+
+    Functions are kept whole where they fit. A function that does not fit is
+    split along its spanning tree: working bottom-up, the largest child
+    subtrees are cut off until the rest fits, and cut-off sibling subtrees
+    share pages. Since parsed code is almost a tree, each cut costs about one
+    edge. The pieces are then packed onto pages in source order, so
+    neighbouring functions end up on the same page. Runs in O(V log V + E).
+
+    Args:
+        graph: Dictionary with "nodes" and "edges" lists
+        max_nodes: Maximum number of nodes per page
+        clusters: Optional node id to cluster key mapping, e.g. from function_clusters
+
+    Returns:
+        The pages, each a list of node ids in file order
+    """
+    order, parent = spanning_forest(graph)
+    if clusters is None:
+        clusters = {}
+
+    # A piece starts at every cluster root and at every cut
+    piece_key: Dict[Any, Any] = {}
+    for node_id in order:
+        above = parent[node_id]
+        if above is None or clusters.get(above) != clusters.get(node_id):
+            piece_key[node_id] = node_id
+
+    kids: Dict[Any, List[Any]] = {node_id: [] for node_id in order}
+    for node_id in order:
+        if node_id not in piece_key:
+            kids[parent[node_id]].append(node_id)
+
+    # Bottom-up: size of the still attached subtree below each node
+    size: Dict[Any, int] = {}
+    for node_id in reversed(order):
+        attached = kids[node_id]
+        total = 1 + sum(size[child] for child in attached)
+        if total > max_nodes:
+            attached.sort(key=lambda child: size[child], reverse=True)
+            bin_key, bin_size = None, 0
+            for child in attached:
+                if total <= max_nodes:
+                    break
+                if bin_key is None or bin_size + size[child] > max_nodes:
+                    bin_key, bin_size = child, 0
+                piece_key[child] = bin_key
+                bin_size += size[child]
+                total -= size[child]
+        size[node_id] = total
+
+    piece: Dict[Any, Any] = {}
+    piece_order: List[Any] = []
+    piece_size: Dict[Any, int] = {}
+    for node_id in order:
+        key = piece_key[node_id] if node_id in piece_key else piece[parent[node_id]]
+        piece[node_id] = key
+        if key not in piece_size:
+            piece_order.append(key)
+            piece_size[key] = 0
+        piece_size[key] += 1
+
+    page_of_piece: Dict[Any, int] = {}
+    page_count, page_size = 0, max_nodes
+    for key in piece_order:
+        if page_size + piece_size[key] > max_nodes:
+            page_count += 1
+            page_size = 0
+        page_of_piece[key] = page_count - 1
+        page_size += piece_size[key]
+
+    pages: List[List[Any]] = [[] for _ in range(page_count)]
+    for node in graph.get("nodes", []):
+        pages[page_of_piece[piece[node["id"]]]].append(node["id"])
+    return pages
+
+
+def extract_subtree(graph: Dict[str, Any], root: Any, collapse_types: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """
+    Copy the part of a graph reachable from one node.
+
+    Args:
+        graph: Dictionary with "nodes" and "edges" lists
+        root: Id of the node to start from
+        collapse_types: Node types below the root that are kept without
+            their children, e.g. function types for a module-level chart
+
+    Returns:
+        Dictionary with the reached "nodes" (in file order) and the edges between them
+    """
+    types = {node["id"]: node.get("type") for node in graph.get("nodes", [])}
+    children: Dict[Any, List[Any]] = {node_id: [] for node_id in types}
+    for edge in graph.get("edges", []):
+        if edge["from"] in children and edge["to"] in children:
+            children[edge["from"]].append(edge["to"])
+
+    kept = {root}
+    stack = [root]
+    while stack:
+        node_id = stack.pop()
+        if node_id != root and types[node_id] in collapse_types:
+            continue
+        for child in children[node_id]:
+            if child not in kept:
+                kept.add(child)
+                stack.append(child)
+
+    return {
+        "nodes": [dict(node) for node in graph.get("nodes", []) if node["id"] in kept],
+        "edges": [dict(edge) for edge in graph.get("edges", [])
+                  if edge["from"] in kept and edge["to"] in kept
+                  and (edge["from"] == root or types[edge["from"]] not in collapse_types)]
+    }
+
+
+def touched_symbols(graph: Dict[str, Any], line_ranges: List[Tuple[int, int]]) -> List[Tuple[str, Any]]:
+    """
+    Find the function and class definitions enclosing changed lines.
+
+    A definition is touched when a changed line belongs to it and not to a
+    definition nested in it; a range outside every definition touches the
+    module level.
+
+    Args:
+        graph: The PythonParser structure, with source spans and names
+        line_ranges: Changed (first, last) line ranges, inclusive
+
+    Returns:
+        (qualified name, node id) pairs in file order; the module level is
+        named "<module>" and refers to the module node
+    """
+    order, parent = spanning_forest(graph)
+    nodes = {node["id"]: node for node in graph.get("nodes", [])}
+    symbol_types = FUNCTION_TYPES | {"class"}
+    index = LineIndex(graph)
+
+    touched = set()
+    for first, last in line_ranges:
+        candidates = [node_id for node_id in index.nodes_overlapping(first, last)
+                      if nodes[node_id].get("type") in symbol_types]
+        if not candidates:
+            touched.update(node_id for node_id in order[:1] if nodes[node_id].get("type") == "module")
+            continue
+        spans = {node_id: index.lines_of(node_id) for node_id in candidates}
+        for node_id in candidates:
+            start, end = spans[node_id]
+            # Touched if a changed line is its own, not one of a nested definition
+            line, last_own = max(first, start), min(last, end)
+            for inner_start, inner_end in sorted(spans[other] for other in candidates if other != node_id
+                                                 and start <= spans[other][0] and spans[other][1] <= end):
+                if inner_start > line:
+                    break
+                line = max(line, inner_end + 1)
+            if line <= last_own:
+                touched.add(node_id)
+
+    names = qualified_names(graph)
+    return [("<module>" if nodes[node_id].get("type") == "module" else names[node_id], node_id)
+            for node_id in order if node_id in touched]
+
+
+def qualified_names(graph: Dict[str, Any]) -> Dict[Any, str]:
+    """
+    Build the dotted qualified names of the function and class nodes, like "Box.put".
+
+    Args:
+        graph: The PythonParser structure, with names on function and class nodes
+
+    Returns:
+        Mapping of node id to qualified name; unnamed definitions are named
+        after their line, e.g. "line12"
+    """
+    order, parent = spanning_forest(graph)
+    nodes = {node["id"]: node for node in graph.get("nodes", [])}
+    symbol_types = FUNCTION_TYPES | {"class"}
+
+    names: Dict[Any, str] = {}
+    # Preorder, so every enclosing definition is named first
+    for node_id in order:
+        node = nodes[node_id]
+        if node.get("type") not in symbol_types:
+            continue
+        ancestor = parent[node_id]
+        while ancestor is not None and ancestor not in names:
+            ancestor = parent[ancestor]
+        name = node.get("name") or f"line{node.get('lineno')}"
+        names[node_id] = f"{names[ancestor]}.{name}" if ancestor is not None else name
+    return names
@@ -0,0 +1,199 @@
+"""
+Graph statistics for the Code to Flowchart tool.
+Computes per-function complexity metrics in a single pass and derives a rendering strategy from them.
+"""
+
+import json
+from typing import Dict, List, Any, Optional
+
+
+# Node types that open a branch (parser types and the generator's "decision")
+DECISION_TYPES = {"if", "for", "while", "except", "decision"}
+
+# Node types that increase the nesting depth of their children
+NESTING_TYPES = {"if", "for", "while", "try", "with", "decision"}
+
+# Node types that start a new function scope
+FUNCTION_TYPES = {"function", "asyncfunctiondef"}
+
+# Rough cost of drawing and saving one node, edge and label character at 300 dpi,
+# measured with benchmarks/run_benchmarks.py
+SECONDS_PER_NODE = 0.004
+SECONDS_PER_EDGE = 0.002
+SECONDS_PER_CHAR = 0.0001
+
+
+def _new_bucket(node_id: Optional[Any], name: str) -> Dict[str, Any]:
+    return {
+        "id": node_id,
+        "name": name,
+        "nodes": 0,
+        "edges": 0,
+        "decisions": 0,
+        "label_chars": 0,
+        "max_nesting_depth": 0,
+        "max_fan_out": 0,
+        "back_edges": 0
+    }
+
+
+def _finish_bucket(bucket: Dict[str, Any]) -> Dict[str, Any]:
+    bucket["cyclomatic_complexity"] = bucket["decisions"] + 1
+    bucket["estimated_render_seconds"] = round(
+        bucket["nodes"] * SECONDS_PER_NODE
+        + bucket["edges"] * SECONDS_PER_EDGE
+        + bucket.pop("label_chars") * SECONDS_PER_CHAR, 4
+    )
+    return bucket
+
+
+def compute_graph_stats(graph: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compute complexity statistics for a graph in one O(V+E) depth-first sweep.
+
+    Works on both the PythonParser structure and the flowchart structure used
+    by the generators. Every node is attributed to its nearest enclosing
+    function; nodes outside any function belong to "<module>". Back edges are
+    edges to a node that is still on the DFS stack, i.e. real cycles.
+
+    Args:
+        graph: Dictionary with "nodes" and "edges" lists
+
+    Returns:
+        Dictionary with "totals" for the whole graph and a "functions" list
+    """
+    nodes = graph.get("nodes", [])
+    edges = graph.get("edges", [])
+
+    node_by_id = {node["id"]: node for node in nodes}
+    children: Dict[Any, List[Any]] = {node["id"]: [] for node in nodes}
+    has_parent = set()
+    for edge in edges:
+        if edge["from"] in children and edge["to"] in node_by_id:
+            children[edge["from"]].append(edge["to"])
+            has_parent.add(edge["to"])
+
+    totals = _new_bucket(None, "<total>")
+    module_bucket = _new_bucket(None, "<module>")
+    buckets = [module_bucket]
+
+    # 0 = unvisited, 1 = on the stack, 2 = finished
+    state = {node_id: 0 for node_id in node_by_id}
+    roots = [node["id"] for node in nodes if node["id"] not in has_parent]
+    if not roots and nodes:
+        roots = [nodes[0]["id"]]
+    # Nodes only reachable through a cycle are picked up afterwards
+    roots += [node["id"] for node in nodes]
+
+    for root in roots:
+        if state[root]:
+            continue
+
+        # Stack entries: (node id, nesting depth, bucket, index of next child)
+        stack = [(root, 0, module_bucket, 0)]
+        state[root] = 1
+        while stack:
+            node_id, depth, bucket, index = stack.pop()
+            node = node_by_id[node_id]
+
+            if index == 0:
+                node_type = node.get("type", "")
+                if node_type in FUNCTION_TYPES:
+                    bucket = _new_bucket(node_id, node.get("label", node.get("text", "")))
+                    buckets.append(bucket)
+                    depth = 0
+
+                fan_out = len(children[node_id])
+                label_chars = len(str(node.get("label", node.get("text", ""))))
+                for target in (bucket, totals):
+                    target["nodes"] += 1
+                    target["edges"] += fan_out
+                    target["label_chars"] += label_chars
+                    target["max_fan_out"] = max(target["max_fan_out"], fan_out)
+                    target["max_nesting_depth"] = max(target["max_nesting_depth"], depth)
+                    if node_type in DECISION_TYPES:
+                        target["decisions"] += 1
+
+                if node_type in NESTING_TYPES:
+                    depth += 1
+
+            if index < len(children[node_id]):
+                stack.append((node_id, depth, bucket, index + 1))
+                child = children[node_id][index]
+                if state[child] == 0:
+                    state[child] = 1
+                    stack.append((child, depth, bucket, 0))
+                elif state[child] == 1:
+                    bucket["back_edges"] += 1
+                    totals["back_edges"] += 1
+            else:
+                state[node_id] = 2
+
+    if module_bucket["nodes"] == 0:
+        buckets.remove(module_bucket)
+
+    return {
+        "totals": _finish_bucket(totals),
+        "functions": [_finish_bucket(bucket) for bucket in buckets]
+    }
+
+
+def is_complex_graph(stats: Dict[str, Any]) -> bool:
+    """
+    Decide whether a graph needs the compact shape sizes.
+
+    Args:
+        stats: Result of compute_graph_stats
+
+    Returns:
+        True if the flowchart is complex, False otherwise
+    """
+    totals = stats["totals"]
+    return totals["nodes"] > 10 or totals["decisions"] > 3 or totals["back_edges"] > 1
+
+
+def choose_render_strategy(stats: Dict[str, Any], graphviz_available: bool = False,
+                           sfdp_threshold: int = 2000) -> Dict[str, Any]:
+    """
+    Choose shape size, layout algorithm and backend from graph statistics.
+
+    Small, acyclic graphs keep the grid layout. Larger or cyclic graphs are laid
+    out by Graphviz (dot, or sfdp for very large graphs) when it is installed,
+    and charts too expensive for matplotlib are rendered by Graphviz directly.
+
+    Args:
+        stats: Result of compute_graph_stats
+        graphviz_available: Whether the Graphviz binaries are installed
+        sfdp_threshold: Node count above which sfdp replaces dot
+
+    Returns:
+        Dictionary with "is_complex", "layout" (grid, dot or sfdp) and "backend"
+    """
+    totals = stats["totals"]
+
+    layout = "grid"
+    if graphviz_available and (totals["nodes"] > 50 or totals["back_edges"] > 0
+                               or totals["max_nesting_depth"] > 3):
+        layout = "sfdp" if totals["nodes"] > sfdp_threshold else "dot"
+
+    backend = "matplotlib"
+    if graphviz_available and totals["estimated_render_seconds"] > 60:
+        backend = "graphviz"
+
+    return {
+        "is_complex": is_complex_graph(stats),
+        "layout": layout,
+        "backend": backend
+    }
+
+
+def write_stats(stats: Dict[str, Any], output_path: str) -> None:
+    """
+    Write graph statistics as JSON.
+
+    Args:
+        stats: Result of compute_graph_stats
+        output_path: Path to the JSON file
+    """
+    with open(output_path, "w", encoding="utf-8") as file:
+        json.dump(stats, file, indent=2)
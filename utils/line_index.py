@@ -0,0 +1,168 @@
+"""
+Line index for the Code to Flowchart tool.
+Maps source lines to the nodes that cover them, and nodes to their lines, using a centered interval tree.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Any, Optional, Tuple
+
+
+class _IntervalNode:
+    """One node of the centered interval tree."""
+
+    __slots__ = ("center", "by_start", "starts", "by_end", "ends", "left", "right")
+
+    def __init__(self, center: int, intervals: List[Tuple[int, int, int, Any]]):
+        self.center = center
+        # Intervals containing the center, sorted by start and by end
+        self.by_start = sorted(intervals, key=lambda interval: interval[0])
+        self.starts = [interval[0] for interval in self.by_start]
+        self.by_end = sorted(intervals, key=lambda interval: interval[1])
+        self.ends = [interval[1] for interval in self.by_end]
+        self.left: Optional["_IntervalNode"] = None
+        self.right: Optional["_IntervalNode"] = None
+
+
+class LineIndex:
+    """Answers "which nodes cover line N" and "which lines does node K cover" for a parsed graph."""
+
+    def __init__(self, graph: Dict[str, Any]):
+        """
+        Build the index. Nodes without a "lineno" are left out.
+
+        Args:
+            graph: Dictionary with a "nodes" list, as produced by PythonParser
+        """
+        self.node_lines: Dict[Any, Tuple[int, int]] = {}
+        intervals = []
+        for node in graph.get("nodes", []):
+            if node.get("lineno") is None:
+                continue
+            span = (node["lineno"], node.get("end_lineno") or node["lineno"])
+            self.node_lines[node["id"]] = span
+            # Among equal spans the later (nested) node counts as innermost
+            intervals.append((span[0], span[1], -len(intervals), node["id"]))
+        self._root = self._build(intervals)
+
+    def _build(self, intervals: List[Tuple[int, int, int, Any]]) -> Optional[_IntervalNode]:
+        """
+        Build a balanced centered interval tree in O(n log n).
+
+        Each node takes the median endpoint as its center and keeps the
+        intervals containing it; the rest go left or right, so the depth is
+        O(log n).
+
+        Args:
+            intervals: (start, end, tie breaker, node id) tuples
+
+        Returns:
+            The root, or None for no intervals
+        """
+        if not intervals:
+            return None
+
+        root = None
+        # Stack entries: (intervals, parent, is_left)
+        stack = [(intervals, None, False)]
+        while stack:
+            group, parent, is_left = stack.pop()
+            endpoints = sorted(point for interval in group for point in interval[:2])
+            center = endpoints[len(endpoints) // 2]
+
+            here, left, right = [], [], []
+            for interval in group:
+                if interval[1] < center:
+                    left.append(interval)
+                elif interval[0] > center:
+                    right.append(interval)
+                else:
+                    here.append(interval)
+
+            node = _IntervalNode(center, here)
+            if parent is None:
+                root = node
+            elif is_left:
+                parent.left = node
+            else:
+                parent.right = node
+
+            if left:
+                stack.append((left, node, True))
+            if right:
+                stack.append((right, node, False))
+        return root
+
+    def lines_of(self, node_id: Any) -> Optional[Tuple[int, int]]:
+        """
+        Get the lines a node covers.
+
+        Args:
+            node_id: The node id
+
+        Returns:
+            (first line, last line), inclusive, or None if the node has no span
+        """
+        return self.node_lines.get(node_id)
+
+    def nodes_at(self, line: int) -> List[Any]:
+        """
+        Find every node covering a line, innermost first.
+
+        Runs in O(log n + k) for k results, plus sorting the results.
+
+        Args:
+            line: 1-based line number
+
+        Returns:
+            Node ids ordered from the smallest span to the largest
+        """
+        return self.nodes_overlapping(line, line)
+
+    def innermost_at(self, line: int) -> Optional[Any]:
+        """
+        Find the most specific node covering a line.
+
+        Args:
+            line: 1-based line number
+
+        Returns:
+            The node id, or None if no node covers the line
+        """
+        nodes = self.nodes_at(line)
+        return nodes[0] if nodes else None
+
+    def nodes_overlapping(self, first: int, last: int) -> List[Any]:
+        """
+        Find every node whose span overlaps a range of lines, innermost first.
+
+        Args:
+            first: First line of the range
+            last: Last line of the range, inclusive
+
+        Returns:
+            Node ids ordered from the smallest span to the largest
+        """
+        found = []
+        node = self._root
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            if last < node.center:
+                # Intervals here end at or after the center; keep those starting in time
+                found.extend(node.by_start[:bisect_right(node.starts, last)])
+                if node.left is not None:
+                    stack.append(node.left)
+            elif first > node.center:
+                # Intervals here start at or before the center; keep those ending in time
+                found.extend(node.by_end[bisect_left(node.ends, first):])
+                if node.right is not None:
+                    stack.append(node.right)
+            else:
+                found.extend(node.by_start)
+                if node.left is not None:
+                    stack.append(node.left)
+                if node.right is not None:
+                    stack.append(node.right)
+
+        found.sort(key=lambda interval: (interval[1] - interval[0], interval[2]))
+        return [interval[3] for interval in found]
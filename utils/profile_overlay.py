@@ -0,0 +1,204 @@
+"""
+Profiler overlay for the Code to Flowchart tool.
+Joins cProfile/pstats timings onto parsed nodes by file and line span and colors them on a heat scale.
+"""
+
+import os
+import pstats
+from bisect import bisect_left
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.colors import LogNorm, Normalize, to_hex
+
+from utils.file_utils import PathMatcher
+from utils.graph_stats import FUNCTION_TYPES
+from utils.line_index import LineIndex
+
+
+# Heat metric name -> (profile entry field, legend label)
+HEAT_METRICS = {
+    "cumulative": ("cumulative_time", "Cumulative time (s)"),
+    "total": ("total_time", "Own time (s)"),
+    "calls": ("calls", "Calls")
+}
+
+HEAT_COLORMAP = "YlOrRd"
+
+# Above this max/min ratio the heat scale is logarithmic
+LOG_SCALE_RATIO = 100
+
+# Number of colors sampled into the legend for non-matplotlib outputs
+LEGEND_STOPS = 5
+
+
+class ProfileData:
+    """Function timings from a pstats dump, grouped by source file."""
+
+    def __init__(self, stats: Dict[Tuple[str, int, str], tuple]):
+        """
+        Group raw pstats entries by file.
+
+        Args:
+            stats: The `stats` mapping of a pstats.Stats object:
+                   (file, first line, function name) -> (primitive calls, calls, own time, cumulative time, callers)
+        """
+        self.by_file: Dict[str, List[Dict[str, Any]]] = {}
+        for (filename, lineno, name), (primitive_calls, calls, total_time, cumulative_time, _) in stats.items():
+            # Built-ins are recorded as ("~", 0, "<method ...>") and have no source
+            if filename == "~" or not lineno:
+                continue
+            # Relative and absolute spellings of one file share a group
+            path = os.path.normcase(os.path.abspath(filename))
+            self.by_file.setdefault(path, []).append({
+                "line": lineno,
+                "name": name,
+                "calls": calls,
+                "primitive_calls": primitive_calls,
+                "total_time": total_time,
+                "cumulative_time": cumulative_time
+            })
+        self._paths = PathMatcher(self.by_file)
+
+    @classmethod
+    def load(cls, path: str) -> "ProfileData":
+        """
+        Load a profile written by cProfile (`-o`) or pstats.Stats.dump_stats.
+
+        Args:
+            path: Path to the profile dump
+
+        Returns:
+            The grouped profile data
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Profile data not found: {path}")
+        return cls(pstats.Stats(path).stats)
+
+    def entries_for(self, source_file: str) -> List[Dict[str, Any]]:
+        """
+        Get the entries recorded for a source file, matched with PathMatcher.
+
+        Args:
+            source_file: Path to the charted source file
+
+        Returns:
+            The file's entries, empty if the profile does not mention it
+        """
+        filename = self._paths.match(source_file)
+        return self.by_file[filename] if filename is not None else []
+
+
+def _function_name(node: Dict[str, Any]) -> Optional[str]:
+    """Get the function name from a function node's label, or None if the label does not carry it."""
+    label = node.get("label", "")
+    if label.startswith("Function: ") and "(" in label:
+        return label[len("Function: "):label.index("(")]
+    return None
+
+
+def join_profile(graph: Dict[str, Any], entries: List[Dict[str, Any]],
+                 metric: str = "cumulative") -> Dict[Any, float]:
+    """
+    Attribute profile entries to the nodes of a parsed graph.
+
+    Each entry is keyed by the first line of its code object. Functions are
+    found by their `def` line, or for decorated functions by the next
+    function of the same name; "<module>" goes to the module node; lambdas
+    and comprehensions go to the innermost node covering their line, found
+    through the line index. Every entry is handled in O(log n).
+
+    Args:
+        graph: The PythonParser structure, with source spans
+        entries: Entries for the graph's file, from ProfileData.entries_for
+        metric: One of HEAT_METRICS
+
+    Returns:
+        Mapping of node id to the summed metric value
+    """
+    field = HEAT_METRICS[metric][0]
+    nodes = graph.get("nodes", [])
+
+    functions = sorted(
+        (node["lineno"], node["id"], _function_name(node))
+        for node in nodes
+        if node.get("type") in FUNCTION_TYPES and node.get("lineno") is not None
+    )
+    function_lines = [line for line, _, _ in functions]
+    module_id = next((node["id"] for node in nodes if node.get("type") == "module"), None)
+    line_index = None
+
+    heat: Dict[Any, float] = {}
+    for entry in entries:
+        line, name = entry["line"], entry["name"]
+        node_id = None
+        if name == "<module>":
+            node_id = module_id
+        elif not name.startswith("<"):
+            position = bisect_left(function_lines, line)
+            if position < len(functions) and (functions[position][0] == line
+                                              or functions[position][2] == name):
+                node_id = functions[position][1]
+        else:
+            if line_index is None:
+                line_index = LineIndex(graph)
+            node_id = line_index.innermost_at(line)
+        if node_id is not None:
+            heat[node_id] = heat.get(node_id, 0) + entry[field]
+    return heat
+
+
+def apply_heat_overlay(graph: Dict[str, Any], entries: List[Dict[str, Any]],
+                       metric: str = "cumulative") -> int:
+    """
+    Color the nodes of a parsed graph by profile heat.
+
+    Matched nodes get a "color" override and their "heat" value, and the
+    graph gets a "legend" describing the scale. Nodes without profile data
+    keep their theme color.
+
+    Args:
+        graph: The PythonParser structure, modified in place
+        entries: Entries for the graph's file, from ProfileData.entries_for
+        metric: One of HEAT_METRICS
+
+    Returns:
+        The number of colored nodes
+    """
+    heat = join_profile(graph, entries, metric)
+    if not heat:
+        return 0
+
+    highest = max(heat.values())
+    positive = [value for value in heat.values() if value > 0]
+    lowest = min(positive) if positive else 0
+    if lowest > 0 and highest / lowest > LOG_SCALE_RATIO:
+        norm = LogNorm(vmin=lowest, vmax=highest, clip=True)
+    else:
+        norm = Normalize(vmin=0, vmax=highest or 1, clip=True)
+    colormap = colormaps[HEAT_COLORMAP]
+
+    # Normalize and map all values in one call; per-value calls dominate on large profiles
+    node_ids = list(heat)
+    values = np.array([heat[node_id] for node_id in node_ids], dtype=float)
+    rgba = colormap(norm(np.maximum(values, norm.vmin)), bytes=True)
+    colors = {node_id: "#%02x%02x%02x" % tuple(rgba[index][:3]) for index, node_id in enumerate(node_ids)}
+
+    for node in graph["nodes"]:
+        if node["id"] in heat:
+            node["heat"] = heat[node["id"]]
+            node["color"] = colors[node["id"]]
+
+    graph["legend"] = {
+        "label": HEAT_METRICS[metric][1],
+        "colormap": HEAT_COLORMAP,
+        "min": norm.vmin,
+        "max": norm.vmax,
+        "log": isinstance(norm, LogNorm),
+        "stops": [to_hex(colormap(index / (LEGEND_STOPS - 1))) for index in range(LEGEND_STOPS)]
+    }
+    return len(heat)
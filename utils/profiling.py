@@ -0,0 +1,161 @@
+"""
+Profiling utilities for the Code to Flowchart tool.
+Records wall time, CPU time and peak memory per pipeline phase.
+"""
+
+import os
+import time
+import cProfile
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Any, Callable, Iterator, Optional
+
+from rich.table import Table
+
+
+class PhaseProfiler:
+    """Collects per-phase measurements and passes them to hook callbacks."""
+
+    def __init__(self, trace_memory: bool = True, cprofile_dir: Optional[str] = None):
+        """
+        Initialize the profiler.
+
+        Args:
+            trace_memory: Record the peak tracemalloc memory of each phase
+            cprofile_dir: Directory to write one cProfile stats file per phase into
+        """
+        self.trace_memory = trace_memory
+        self.cprofile_dir = cprofile_dir
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.metrics: Dict[str, Any] = {}
+        self.hooks: List[Callable[[str, Dict[str, Any]], None]] = []
+        self._profiles: Dict[str, cProfile.Profile] = {}
+
+    def add_hook(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """
+        Register a callback run after every phase.
+
+        Args:
+            callback: Function called with the phase name and that run's measurements
+                      (wall, cpu and, when traced, peak_memory)
+        """
+        self.hooks.append(callback)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Measure a phase. Repeated phases with the same name are accumulated.
+
+        Args:
+            name: Phase name (read_file, parse, draw, ...)
+        """
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+
+        profile = None
+        if self.cprofile_dir is not None:
+            profile = self._profiles.setdefault(name, cProfile.Profile())
+            profile.enable()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            measurement = {
+                "wall": time.perf_counter() - wall_start,
+                "cpu": time.process_time() - cpu_start
+            }
+            if profile is not None:
+                profile.disable()
+            if tracing:
+                measurement["peak_memory"] = tracemalloc.get_traced_memory()[1]
+
+            totals = self.phases.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+            totals["wall"] += measurement["wall"]
+            totals["cpu"] += measurement["cpu"]
+            totals["calls"] += 1
+            if "peak_memory" in measurement:
+                totals["peak_memory"] = max(totals.get("peak_memory", 0), measurement["peak_memory"])
+
+            for hook in self.hooks:
+                hook(name, measurement)
+
+    def add_metric(self, name: str, value: Any) -> None:
+        """
+        Record a run-level metric such as node count or output size.
+
+        Args:
+            name: Metric name
+            value: Metric value
+        """
+        self.metrics[name] = value
+
+    def dump_cprofile_stats(self) -> List[str]:
+        """
+        Write the collected cProfile stats, one file per phase.
+
+        Returns:
+            Paths of the written stats files
+        """
+        if self.cprofile_dir is None:
+            return []
+
+        os.makedirs(self.cprofile_dir, exist_ok=True)
+        paths = []
+        for name, profile in self._profiles.items():
+            path = os.path.join(self.cprofile_dir, f"{name}.prof")
+            profile.dump_stats(path)
+            paths.append(path)
+        return paths
+
+    def report_table(self) -> Table:
+        """
+        Build a rich table of the recorded phases and metrics.
+
+        Returns:
+            The table
+        """
+        table = Table(title="Profile")
+        table.add_column("Phase")
+        table.add_column("Wall (s)", justify="right")
+        table.add_column("CPU (s)", justify="right")
+        table.add_column("Peak memory (MB)", justify="right")
+        table.add_column("Calls", justify="right")
+
+        total_wall = sum(totals["wall"] for totals in self.phases.values())
+        total_cpu = sum(totals["cpu"] for totals in self.phases.values())
+        for name, totals in self.phases.items():
+            peak = totals.get("peak_memory")
+            table.add_row(
+                name,
+                f"{totals['wall']:.4f}",
+                f"{totals['cpu']:.4f}",
+                f"{peak / (1024 * 1024):.1f}" if peak is not None else "-",
+                str(totals["calls"])
+            )
+        table.add_row("[bold]total[/bold]", f"{total_wall:.4f}", f"{total_cpu:.4f}", "", "")
+
+        for name, value in self.metrics.items():
+            table.add_row(f"[italic]{name}[/italic]", str(value), "", "", "")
+
+        return table
+
+
+class NullProfiler:
+    """Profiler stand-in that records nothing, used when profiling is disabled."""
+
+    _context = nullcontext()
+
+    def add_hook(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        pass
+
+    def phase(self, name: str):
+        return self._context
+
+    def add_metric(self, name: str, value: Any) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,153 @@
+"""
+Text layout utilities for the Code to Flowchart tool.
+Measures labels with a cached glyph width table and pre-wraps them to fit their shapes.
+"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from matplotlib.font_manager import FontProperties, findfont, get_font
+
+
+# Glyph advances are measured once at this size and scaled linearly
+_REFERENCE_SIZE = 100.0
+
+ELLIPSIS = "…"
+
+
+class TextMeasurer:
+    """Measures text widths in points using a per-font table of glyph advances."""
+
+    def __init__(self, font_path: str):
+        """
+        Initialize the measurer.
+
+        Args:
+            font_path: Path to the font file used for rendering
+        """
+        self.font_path = font_path
+        self._advances: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _advance(self, char: str) -> float:
+        """
+        Return the advance width of a character at a font size of 1pt.
+
+        Args:
+            char: A single character
+
+        Returns:
+            The advance width in points
+        """
+        advance = self._advances.get(char)
+        if advance is None:
+            with self._lock:
+                font = get_font(self.font_path)
+                font.set_size(_REFERENCE_SIZE, 72)
+                glyph = font.load_char(ord(char))
+                # linearHoriAdvance is unhinted and stored as 16.16 fixed point
+                advance = glyph.linearHoriAdvance / 65536 / _REFERENCE_SIZE
+            self._advances[char] = advance
+        return advance
+
+    def width(self, text: str, font_size: float) -> float:
+        """
+        Measure the width of a single line of text.
+
+        Args:
+            text: The text to measure
+            font_size: Font size in points
+
+        Returns:
+            The width in points
+        """
+        advance = self._advance
+        return sum(advance(char) for char in text) * font_size
+
+    def wrap(self, text: str, max_width: float, font_size: float, max_lines: int = 3) -> List[str]:
+        """
+        Break text into lines that fit a width, ellipsizing what does not fit.
+
+        Words are kept whole where possible; a word wider than the whole line
+        is broken between characters.
+
+        Args:
+            text: The text to wrap
+            max_width: Available width in points
+            font_size: Font size in points
+            max_lines: Maximum number of lines
+
+        Returns:
+            The lines, at least one
+        """
+        space = self._advance(" ") * font_size
+        lines: List[str] = []
+        current = ""
+        current_width = 0.0
+
+        for paragraph in str(text).split("\n"):
+            for word in paragraph.split():
+                word_width = self.width(word, font_size)
+                if current and current_width + space + word_width <= max_width:
+                    current += " " + word
+                    current_width += space + word_width
+                    continue
+                if current:
+                    lines.append(current)
+                while word_width > max_width and len(word) > 1:
+                    head = self._fit(word, max_width, font_size)
+                    lines.append(head)
+                    word = word[len(head):]
+                    word_width = self.width(word, font_size)
+                current, current_width = word, word_width
+            if current:
+                lines.append(current)
+            current, current_width = "", 0.0
+
+        if not lines:
+            return [""]
+        if len(lines) > max_lines:
+            lines = lines[:max_lines]
+            lines[-1] = self.ellipsize(lines[-1] + ELLIPSIS, max_width, font_size)
+        return lines
+
+    def ellipsize(self, text: str, max_width: float, font_size: float) -> str:
+        """
+        Shorten a single line so that it fits, ending it with an ellipsis.
+
+        Args:
+            text: The line to shorten
+            max_width: Available width in points
+            font_size: Font size in points
+
+        Returns:
+            The line, unchanged if it already fits
+        """
+        if self.width(text, font_size) <= max_width:
+            return text
+        body = text[:-1] if text.endswith(ELLIPSIS) else text
+        return self._fit(body, max_width - self._advance(ELLIPSIS) * font_size, font_size) + ELLIPSIS
+
+    def _fit(self, text: str, max_width: float, font_size: float) -> str:
+        """Return the longest prefix of text (at least one character) that fits the width."""
+        width = 0.0
+        for index, char in enumerate(text):
+            width += self._advance(char) * font_size
+            if width > max_width:
+                return text[:max(index, 1)]
+        return text
+
+
+@lru_cache(maxsize=None)
+def get_text_measurer(font_path: Optional[str] = None) -> TextMeasurer:
+    """
+    Return the shared measurer for a font.
+
+    Args:
+        font_path: Path to the font file, defaults to matplotlib's default font
+
+    Returns:
+        The cached TextMeasurer
+    """
+    return TextMeasurer(font_path or findfont(FontProperties()))